@@ -0,0 +1,145 @@
+'''
+    Converts a folder of Pascal VOC annotations to YOLO txt files and/or a COCO json file,
+    without opening the app. The annotations are converted by a pool of processes.
+    The xml files can also be moved in and out of the SQLite database the app uses
+    when the SQLite annotation store is chosen.
+
+    Usage:
+        python convert.py <folder> --yolo <dir> --coco <file.json> [--classes classes.txt] [--workers N]\n
+        python convert.py <folder> --import-voc\n
+        python convert.py <folder> --export-voc [--yolo <dir>] [--coco <file.json>]
+'''
+import os
+import sys
+import argparse
+from time import time
+from collections import Counter
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+
+from libs.standalones.pascal_voc_io import XML_EXT, read_voc, iter_labels
+from libs.standalones.yolo_io import TXT_EXT, CLASSES_FILE, YoloWriter, read_classes, write_classes
+from libs.standalones.coco_io import CocoWriter
+from libs.standalones.AnnotationStore import SqliteStore
+from libs.standalones.FolderScanner import is_image
+
+CHUNK_SIZE = 64 # annotations sent to a process at once
+
+def count_labels(xml_paths: list[str]) -> Counter:
+    labels = Counter()
+    for xml_path in xml_paths:
+        try:
+            labels.update(iter_labels(xml_path))
+        except Exception as e:
+            print(f"Couldn't read {xml_path}: {e}", file=sys.stderr)
+    return labels
+
+def convert_chunk(xml_paths: list[str], classes: list[str], yolo_dir: str | None) -> list[tuple[str, int, int, list]]:
+    '''
+        Converts the annotations, writing their YOLO files if 'yolo_dir' is given.
+        Returns (file_name, width, height, boxes) for every annotation read, for the COCO file.
+
+        Args:
+            xml_paths (list[str]): The annotations to convert
+            classes (list[str]): The class names, the index is the class id
+            yolo_dir (str): The folder of the YOLO files, None to skip them
+    '''
+    class_ids = {name: i for i, name in enumerate(classes)}
+    converted = []
+    for xml_path in xml_paths:
+        try:
+            filename, (width, height, _), boxes = read_voc(xml_path)
+        except Exception as e:
+            print(f"Couldn't read {xml_path}: {e}", file=sys.stderr)
+            continue
+        stem = os.path.splitext(os.path.basename(xml_path))[0]
+
+        if yolo_dir is not None:
+            if width <= 0 or height <= 0:
+                print(f"Skipped {xml_path} for YOLO, the image size is missing", file=sys.stderr)
+            else:
+                writer = YoloWriter((width, height), class_ids)
+                for label, x_min, y_min, x_max, y_max in boxes:
+                    writer.add_bnd_box(x_min, y_min, x_max, y_max, label)
+                writer.save(os.path.join(yolo_dir, stem + TXT_EXT))
+
+        converted.append((filename or stem + '.jpg', width, height, boxes))
+    return converted
+
+def sync_store(folder: str, import_voc: bool, export_voc: bool) -> None:
+    '''
+        Copies the xml files of the folder into its database, or the database into the xml files.
+
+        Args:
+            folder (str): The folder of the images
+            import_voc (bool): True to import the xml files into the database
+            export_voc (bool): True to export the database as xml files
+    '''
+    store = SqliteStore(os.path.join(folder, SqliteStore.DB_NAME))
+    try:
+        if import_voc:
+            images = sorted(os.path.join(folder, name) for name in os.listdir(folder) if is_image(name))
+            print(f"Imported {store.import_voc(images)} xml files into {store.db_path}")
+        if export_voc:
+            print(f"Exported {store.export_voc()} annotations of {store.db_path} as xml files")
+    finally:
+        store.close()
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert Pascal VOC annotations to YOLO and COCO.")
+    parser.add_argument("folder", help="folder with the Pascal VOC xml files")
+    parser.add_argument("--yolo", metavar="DIR", help="folder to write a YOLO txt file per image and classes.txt")
+    parser.add_argument("--coco", metavar="FILE", help="COCO json file to write")
+    parser.add_argument("--classes", metavar="FILE", help="class names, one per line, the boxes of other classes are skipped "
+                                                          "(default: every label found, sorted)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="amount of processes (default: %(default)s)")
+    parser.add_argument("--import-voc", action="store_true",
+                        help=f"copy the xml files into the {SqliteStore.DB_NAME} database of the folder used by the SQLite store")
+    parser.add_argument("--export-voc", action="store_true",
+                        help=f"write the annotations of the {SqliteStore.DB_NAME} database as xml files, before --yolo and --coco")
+    args = parser.parse_args(argv)
+
+    if args.yolo is None and args.coco is None and not args.import_voc and not args.export_voc:
+        parser.error("nothing to do, pass --yolo, --coco, --import-voc or --export-voc")
+    if args.import_voc and args.export_voc:
+        parser.error("--import-voc and --export-voc can't be used together")
+
+    if args.import_voc or args.export_voc:
+        sync_store(args.folder, args.import_voc, args.export_voc)
+        if args.yolo is None and args.coco is None:
+            return 0
+
+    xml_paths = sorted(os.path.join(args.folder, name) for name in os.listdir(args.folder) if name.endswith(XML_EXT))
+    chunks = [xml_paths[i:i + CHUNK_SIZE] for i in range(0, len(xml_paths), CHUNK_SIZE)]
+    t0 = time()
+
+    with ProcessPoolExecutor(max(1, args.workers)) as executor:
+        if args.classes is not None:
+            classes = read_classes(args.classes)
+        else:
+            # The ids must be the same in every process, so the labels are found first
+            labels = Counter()
+            for chunk_labels in executor.map(count_labels, chunks):
+                labels.update(chunk_labels)
+            classes = sorted(labels)
+
+        if args.yolo is not None:
+            os.makedirs(args.yolo, exist_ok=True)
+            write_classes(os.path.join(args.yolo, CLASSES_FILE), classes)
+
+        files = 0
+        with CocoWriter(args.coco, classes) if args.coco is not None else nullcontext() as coco:
+            results = executor.map(convert_chunk, chunks, [classes] * len(chunks), [args.yolo] * len(chunks))
+            for converted in results:
+                files += len(converted)
+                if coco is not None:
+                    for file_name, width, height, boxes in converted:
+                        coco.add_image(file_name, width, height, boxes)
+
+    elapsed = time() - t0
+    print(f"Converted {files} of {len(xml_paths)} files in {elapsed:.2f}s, "
+          f"{files / elapsed if elapsed > 0 else 0:.1f} files/s, {len(classes)} classes")
+    return 0 if files == len(xml_paths) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
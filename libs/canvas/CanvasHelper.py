@@ -125,6 +125,14 @@ class CanvasHelper:
 
     @staticmethod
     def get_within(pos: Vector2Int, shapes: list[Shape]) -> tuple[Shape, tuple[Shape, int]]:
+        """
+        Returns the shape containing the point 'pos' and a tuple with the closest shape and vertex index.
+        'shapes' is usually narrowed down by SpatialIndex.query first.
+
+        Args:
+            pos (Vector2Int): The point to check.
+            shapes (list[Shape]): The list of shapes to check.
+        """
         found = False
         selected_shape = None
 
@@ -1,3 +1,4 @@
+import os
 from typing import overload
 from time import time
 from threading import Lock
@@ -10,9 +11,19 @@ from libs.widgets.ShapePoints import ShapePoints
 from libs.standalones.Vector import Vector2Int
 from libs.widgets.EditWidget import EditWidget
 from libs.standalones.Files_Manager import Files_Manager
-from libs.standalones.pascal_voc_io import PascalVocReader, PascalVocWriter
+from libs.standalones.ImagePrefetcher import ImagePrefetcher, decode_preview
+from libs.standalones.pascal_voc_io import shapes_from_boxes
+from libs.standalones.AnnotationSaver import AnnotationSaver
+from libs.standalones.AnnotationStore import AnnotationStore, AnnotationSnapshot
+from libs.standalones.LabelIndex import LabelIndex
+from libs.standalones.PersistentData import PersistentData, PersistentDataType
 from libs.canvas.Shape import Shape
 from libs.canvas.CanvasHelper import CanvasHelper as helper
+from libs.canvas.ImagePyramid import ImagePyramid
+from libs.canvas.TileRenderer import TileRenderer
+from libs.canvas.SpatialIndex import SpatialIndex
+from libs.canvas.ShapeRenderer import ShapeRenderer
+from libs.canvas.ShapeOverlay import ShapeOverlay
 from libs.canvas.CanvasScrollManager import CanvasScrollManager as CanvasScroll
 from libs.canvas.CoordinatesSystem import CoordinatesSystem, Transform
 from libs.handlers.MouseManager import MouseManager
@@ -82,6 +93,8 @@ class CanvasWin(QWidget):
         self.move_sensitivity = .5 # the multiplier of the mouse movement to move the viewport
 
         self.shapes: list[Shape] = [] # list of shapes
+        self.shape_index = SpatialIndex() # grid of the shapes used for hit-testing
+        self.shape_overlay = ShapeOverlay() # the shapes in their normal state, painted once
         self._painter = QPainter() # painter to draw canvas
         self.h_shapes: list[Shape] = [] # highlighted shape
         self.state = EDIT # current state of the canvas
@@ -104,7 +117,8 @@ class CanvasWin(QWidget):
         self.last_mouse_pos = Vector2Int(0, 0) # last mouse position to get the delta
         self.mouse_moved = 0. # the amount of pixels the mouse moved to allow moving the shape
 
-        self.cur_img = -1 # current image index
+        self.cur_img: str = None # path of the image the shapes belong to
+        self.loaded_boxes: tuple = () # boxes of the image as they are on disk, unchanged shapes aren't saved
 
         self.was_selected = False
         self.clicked_shape = None # the shape that was clicked
@@ -115,12 +129,15 @@ class CanvasWin(QWidget):
         self.viewport.on_move.connect(self.update_rect) # update the rect to draw when the viewport moves
         self.viewport.on_move.connect(self.scroll_manager.on_viewport_move) # update the scroll bars when the viewport moves
 
-        self.original_pixmap = QPixmap() # the original pixmap
+        self.image_size = QSize() # the size of the original image
+        self.pyramid: ImagePyramid = None # the downscaled levels of the image
+        self.tile_renderer = TileRenderer(PersistentData.instance()[PersistentDataType.tile_cache_mb]) # draws the visible part of the image
+        self.pixmap_path: str = None # the image shown, its preview until the full image is decoded
+        ImagePrefetcher.instance().OnDecoded.connect(self.on_image_decoded)
 
         self.pixmap_offset = Vector2Int(100, 100)
 
         self.rect_to_draw: QRect = QRect() # the rect to draw the pixmap
-        self.resized_pixmap: QPixmap = self.original_pixmap # the resized pixmap
 
         self.edit_widget = EditWidget()
 
@@ -138,8 +155,7 @@ class CanvasWin(QWidget):
 
         # On file load bind
         files_manager = Files_Manager.instance()
-        files_manager.OnLoadImage.connect(self.load_shapes)
-        files_manager.OnLoadImage.connect(self.load_pixmap)
+        files_manager.OnLoadImage.connect(self.load_image)
 
         self.chosing_option = False # The user is chosing an option in the menu?
 
@@ -162,11 +178,26 @@ class CanvasWin(QWidget):
         p.begin(self)
         p.setRenderHint(QPainter.Antialiasing)
 
-        p.drawPixmap(self.rect_to_draw, self.resized_pixmap)
-        
+        # Only the shapes intersecting the damaged area need to be redrawn
+        damaged = a0.rect()
+        partial = damaged != self.rect()
+        self.tile_renderer.paint(p, self.rect_to_draw, damaged, self.scale)
+        damaged = damaged.translated(-self.rect_to_draw.topLeft())
+
+        # The overlay is rebuilt on full repaints only, hovering repaints small areas
+        # and is cheaper painted live than rebuilding the whole layer
+        shapes = self.shapes
         p.translate(self.rect_to_draw.topLeft())
-        for shape in self.shapes:
-            shape.paint(p, self.scale)
+        view = self.rect().translated(-self.rect_to_draw.topLeft())
+        if self.shape_overlay.is_valid(self.scale, view) or \
+            (not partial and self.shape_overlay.build(shapes, self.scaled_size(), self.scale, view)):
+            self.shape_overlay.paint(p, damaged)
+            shapes = [shape for shape in shapes if shape.is_interactive()]
+
+        if partial:
+            shapes = [shape for shape in shapes if shape.paint_rect(self.scale).intersects(damaged)]
+
+        ShapeRenderer.paint(p, shapes, self.scale)
         if self.shape_copy is not None:
             self.shape_copy.paint(p, self.scale)
         p.translate(-self.rect_to_draw.topLeft())
@@ -176,38 +207,105 @@ class CanvasWin(QWidget):
 
         p.end()
 
+    def save_shapes(self) -> None:
+        '''
+            Queues the shapes of the current image to be saved next to it in the background
+        '''
+        if self.cur_img is None:
+            return
+
+        saver = AnnotationSaver.instance()
+        snapshot = AnnotationSnapshot(os.path.basename(os.path.dirname(self.cur_img)), os.path.basename(self.cur_img),
+                                      (self.image_size.width(), self.image_size.height(), 3),
+                                      self.cur_img, self.boxes())
+        if saver.save(snapshot, self.loaded_boxes):
+            self.loaded_boxes = snapshot.boxes
+            LabelIndex.instance().update(self.cur_img, [box[4] for box in snapshot.boxes])
+
+    def boxes(self) -> tuple[tuple[int, int, int, int, str], ...]:
+        '''
+            Returns the shapes as (x_min, y_min, x_max, y_max, name) tuples, in the order they are saved
+        '''
+        boxes = []
+        for shape in self.shapes:
+            _min, _max = Vector2Int.get_min_max(shape.get_points())
+            boxes.append((_min.x, _min.y, _max.x, _max.y, shape.name))
+        return tuple(boxes)
+
+    def load_image(self, filepath: str) -> None:
+        '''
+            Saves the shapes of the current image, then loads the image and its shapes
+
+            Args:
+                filepath: the path of the image to load
+        '''
+        self.save_shapes()
+        self.load_pixmap(filepath)
+        self.load_shapes(filepath)
+
     def load_shapes(self, filepath: str):
-        if self.cur_img != -1:
-            last_file = Files_Manager.instance().imgs()[self.cur_img]
-            last_file_name = last_file.split('/')[-1]
-            last_file_folder = last_file.split('/')[-2]
-
-            writer = PascalVocWriter(last_file_folder, last_file_name, 
-                                (self.original_pixmap.size().width(), self.original_pixmap.size().height(), 3), 
-                                local_img_path=last_file)
-            for shape in self.shapes:
-                _min, _max = Vector2Int.get_min_max(shape.get_points())
-                writer.add_bnd_box(_min.x, _min.y, _max.x, _max.y, shape.name)
-            writer.save(last_file.replace("jpg", "xml"))
-        reader = PascalVocReader(filepath)
+        # The annotation may still be queued if the user came back to it quickly
+        AnnotationSaver.instance().wait(filepath)
+        # The size of the loaded pixmap is needed by the formats with relative coordinates
+        boxes = AnnotationStore.for_image(filepath).read(filepath, (self.image_size.width(), self.image_size.height()))
 
         del self.shapes[:]
-        self.shapes = reader.get_shapes()
-        self.cur_img = Files_Manager.instance().img_index()
+        self.shape_overlay.invalidate()
+        self.shapes = shapes_from_boxes(boxes)
+        self.shape_index.rebuild(self.shapes)
+        self.cur_img = filepath
+        self.loaded_boxes = self.boxes()
         self.OnChangedShapes.emit(self.shapes)
 
+    def set_pyramid(self, pyramid: ImagePyramid) -> None:
+        if self.pyramid is not None:
+            self.pyramid.cancel()
+        self.pyramid = pyramid
+        self.pyramid.OnLevelBuilt.connect(lambda _: self.update())
+        self.tile_renderer.set_pyramid(self.pyramid)
+
     def load_pixmap(self, path: str) -> None:
         assert len(path) > 0, "Path is empty"
         t0 = time()
-        self.original_pixmap = QPixmap(QImage.fromData(open(path, "rb").read()))
-        self.resized_pixmap: QPixmap = self.original_pixmap.scaled(self.original_pixmap.size() * self.scale, Qt.KeepAspectRatio, Qt.FastTransformation)
-        print(f"Loaded image in {time() - t0}s")
+        prefetcher = ImagePrefetcher.instance()
+        self.pixmap_path = path
+
+        # A big image that isn't decoded yet is shown at the resolution of the window first,
+        # the full image replaces it when the prefetcher is done with it
+        pyramid = None
+        if prefetcher.cached(path) is None:
+            preview, full_size = decode_preview(path, self.size())
+            if not preview.isNull():
+                pyramid = ImagePyramid(preview, full_size)
+                prefetcher.prefetch([path], priority=1)
+        if pyramid is None:
+            pyramid = ImagePyramid(prefetcher.get(path))
+
+        self.set_pyramid(pyramid)
+        self.image_size = pyramid.size()
+        print(f"Loaded {'preview of ' if pyramid.is_preview() else ''}image in {time() - t0}s")
         t0 = time()
         self.update_coordinates()
         self.update_rect(None)
         self.update()
         print(f"Updated canvas in {time() - t0}s")
 
+    def on_image_decoded(self, path: str, image: QImage) -> None:
+        '''
+            Replaces the preview of the image shown by the full image, the coordinates don't change.
+            The image is sent by the prefetcher since it may be too big for its cache
+
+            Args:
+                path: the path of the image decoded
+                image: the decoded image
+        '''
+        if path != self.pixmap_path or self.pyramid is None or not self.pyramid.is_preview():
+            return
+        if image.isNull() or image.size() != self.image_size:
+            return
+        self.set_pyramid(ImagePyramid(image))
+        self.update()
+
     def add_shape(self, shape: Shape) -> None:
         '''
             Adds a shape to the canvas
@@ -216,21 +314,46 @@ class CanvasWin(QWidget):
                 shape: the shape to add
         '''
         self.shapes.append(shape)
+        self.shape_index.insert(shape)
+        self.shape_overlay.invalidate()
         self.OnAddShape.emit(shape)
         self.update()
 
+    def shape_rect(self, shape: Shape) -> QRect:
+        '''
+            Returns the area of the canvas covered by the shape
+
+            Args:
+                shape: the shape to get the area of
+        '''
+        return shape.paint_rect(self.scale).translated(self.rect_to_draw.topLeft())
+
+    def update_shapes(self, *shapes: Shape | QRect | None) -> None:
+        '''
+            Repaints only the area covered by the shapes, instead of the whole canvas
+
+            Args:
+                shapes: the shapes to repaint, rects are treated as already computed areas
+        '''
+        damaged = QRect()
+        for shape in shapes:
+            if shape is None:
+                continue
+            damaged = damaged.united(shape if isinstance(shape, QRect) else self.shape_rect(shape))
+        if not damaged.isNull():
+            self.update(damaged)
+
     def update_coordinates(self) -> None:
         '''
             Updates the coordinates system of the canvas
         '''
-        if self.original_pixmap.isNull():
+        if self.image_size.isEmpty():
             return
 
         ratio = self.size().width() / self.size().height()
-        self.cs.resize(Vector2Int(self.original_pixmap.size().width() + 50, self.original_pixmap.size().width() / ratio)* self.scale)
+        self.cs.resize(Vector2Int(self.image_size.width() + 50, self.image_size.width() / ratio)* self.scale)
 
         self.viewport.resize(Vector2Int(self.size()))
-        self.resized_pixmap: QPixmap = self.original_pixmap.scaled(self.original_pixmap.size() * self.scale, Qt.KeepAspectRatio, Qt.FastTransformation)
 
         self.scroll_manager.on_scale(self.cs.size(), self.viewport.size(), self.viewport.pos())
         #self.viewport.resize(Vector2Int(self.size()) / self.scale)
@@ -242,7 +365,8 @@ class CanvasWin(QWidget):
             Args:
                 _: the new position of the viewport
         '''
-        self.rect_to_draw.setRect(self.pixmap_rel_pos().x, self.pixmap_rel_pos().y, self.resized_pixmap.width(), self.resized_pixmap.height())
+        scaled_size = self.scaled_size()
+        self.rect_to_draw.setRect(self.pixmap_rel_pos().x, self.pixmap_rel_pos().y, scaled_size.width(), scaled_size.height())
 
     def draw_new_shape(self, painter: QPainter) -> None:
         '''
@@ -340,11 +464,17 @@ class CanvasWin(QWidget):
         self.update_rect(Vector2Int(0, 0))
         self.update()
 
+    def scaled_size(self) -> QSize:
+        '''
+            Returns the size of the image at the current scale
+        '''
+        return self.image_size * self.scale
+
     def pixmap_rel_pos(self) -> Vector2Int:
         '''
             Returns the relative position of the pixmap as Vector2Int
         '''
-        return -self.viewport.pos() + self.rect().center() - self.resized_pixmap.size() / 2
+        return -self.viewport.pos() + self.rect().center() - self.scaled_size() / 2
 
     def unhighlight_vertex(self) -> None:
         '''
@@ -369,7 +499,7 @@ class CanvasWin(QWidget):
             Returns true if the mouse is out of bounds.
         '''
         m_pos = self.get_mouse()
-        return (m_pos.x < 0 or m_pos.y < 0) or (m_pos.x > self.original_pixmap.width() or m_pos.y > self.original_pixmap.height())
+        return (m_pos.x < 0 or m_pos.y < 0) or (m_pos.x > self.image_size.width() or m_pos.y > self.image_size.height())
   
     def move_mode(self) -> None:
         '''
@@ -451,8 +581,10 @@ class CanvasWin(QWidget):
         while len(self.selected_shapes) > 0:
             shape = self.selected_shapes[0]
             shape.selected = False
+            self.shape_index.remove(shape)
             del self.shapes[self.shapes.index(shape)], self.selected_shapes[0]
         self.selected_shapes = []
+        self.shape_overlay.invalidate()
         self.update()
 
     def deselect_all(self) -> None:
@@ -473,13 +605,13 @@ class CanvasWin(QWidget):
         shape.selected = False
         self.selected_shapes.remove(shape)
         self.OnDeselectShape.emit(shape)
-        self.update()
+        self.update_shapes(shape)
 
     def __select(self, shape: Shape):
         self.selected_shapes.append(shape)
         shape.selected = True
         self.OnSelectShape.emit(shape)
-        self.update()
+        self.update_shapes(shape)
 
     def select(self, shape: Shape, force: bool = False, multi_select: bool = None) -> None:
         '''
@@ -532,11 +664,13 @@ class CanvasWin(QWidget):
             Auto fills a shape if the mouse is within a shape.
         '''
         if shape is not None:
-            if self.filled_shape:
-                self.filled_shape.unfill()
-            self.filled_shape = shape
-            shape.fill = True
-            self.update()
+            if shape is not self.filled_shape:
+                last_filled = self.filled_shape
+                if last_filled:
+                    last_filled.unfill()
+                self.filled_shape = shape
+                shape.fill = True
+                self.update_shapes(last_filled, shape)
             self.last_mouse_pos = self.get_mouse()
             return True
         return False
@@ -555,7 +689,7 @@ class CanvasWin(QWidget):
 
     def clip_to_pixmap(self, mousePos: Vector2Int, offset: Vector2Int = Vector2Int(0, 0)) -> None:
         pix_min = Vector2Int() + offset
-        pix_max = Vector2Int(self.resized_pixmap.size()) + offset
+        pix_max = Vector2Int(self.scaled_size()) + offset
 
         mousePos.clip(pix_min, pix_max)
 
@@ -567,7 +701,7 @@ class CanvasWin(QWidget):
         self.set_scale(a0.angleDelta().y() / 120 * .3 + self.scale)
 
     def OnMouseMove(self) -> None:
-        if self.original_pixmap.isNull() or self.chosing_option:
+        if self.image_size.isEmpty() or self.chosing_option:
             return
         mousePos = self.get_mouse_relative()
 
@@ -586,16 +720,19 @@ class CanvasWin(QWidget):
 
             mousePos -= self.mouse_offset
 
-            self.shape_copy.move(mousePos, Vector2Int(self.original_pixmap.size()))
-            self.update()
+            last_rect = self.shape_rect(self.shape_copy)
+            self.shape_copy.move(mousePos, Vector2Int(self.image_size))
+            self.update_shapes(last_rect, self.shape_copy)
             return
 
         # IF MOVING VERTEX
         if self.state == MOVING_VERTEX:
             self.unfill_shape()
 
-            self.selected_shapes[0].move_vertex(mousePos, self.highlighted_vertex[1])
-            self.update()
+            shape = self.selected_shapes[0]
+            last_rect = self.shape_rect(shape)
+            shape.move_vertex(mousePos, self.highlighted_vertex[1])
+            self.update_shapes(last_rect, shape)
             self.update_cursor()
             return
 
@@ -604,8 +741,10 @@ class CanvasWin(QWidget):
             self.unfill_shape()
 
             mousePos -= self.mouse_offset
-            helper.move_shapes(mousePos, self.clicked_shape, self.shape_formation, Vector2Int(self.original_pixmap.size()))
-            self.update()
+            moving = [shape for shape, _ in self.shape_formation]
+            last_rects = [self.shape_rect(shape) for shape in moving]
+            helper.move_shapes(mousePos, self.clicked_shape, self.shape_formation, Vector2Int(self.image_size))
+            self.update_shapes(*last_rects, *moving)
             self.update_cursor()
             return
 
@@ -618,26 +757,32 @@ class CanvasWin(QWidget):
             return
 
         # HIGHLIGHT VERTEX
-        closest_shape, closest_vertex = helper.get_within(mousePos, self.shapes)
+        closest_shape, closest_vertex = helper.get_within(mousePos, self.shape_index.query(mousePos, helper.MIN_DIST_HIGHLIGHT+1))
         if closest_vertex[0] is not None:
+            if closest_vertex == self.highlighted_vertex and self.filled_shape is None:
+                return
+            changed = [self.filled_shape, self.highlighted_vertex[0], closest_vertex[0]]
             self.unfill_shape()
             self.unhighlight_vertex()
             closest_vertex[0].highlighted_vertex = closest_vertex[1]
             self.highlighted_vertex = closest_vertex
-            self.update()
+            self.update_shapes(*changed)
             return
 
         # HIGHLIGHT SHAPE
+        last_highlighted = self.highlighted_vertex[0]
         if self.auto_fill_shape(closest_shape):
             self.unhighlight_vertex()
+            self.update_shapes(last_highlighted)
             return
 
         # ELSE
         if len(self.h_shapes) > 0 or self.highlighted_vertex[0] is not None or self.filled_shape is not None:
+            changed = [self.filled_shape, last_highlighted, *self.h_shapes]
             self.unhighlight_vertex()
             self.unfill_shape()
             self.h_shapes = []
-            self.update()
+            self.update_shapes(*changed)
 
     def mousePressEvent(self, a0: QMouseEvent) -> None:
         if self.chosing_option:
@@ -646,7 +791,7 @@ class CanvasWin(QWidget):
 
         if a0.button() == Qt.RightButton:
             # IF COPYING
-            closest_shape = helper.get_shape_within(mousePos, self.shapes)
+            closest_shape = helper.get_shape_within(mousePos, self.shape_index.shapes_at(mousePos))
             if closest_shape is not None:
                 self.shape_copy = closest_shape.copy()
                 self.set_state(COPY)
@@ -680,7 +825,7 @@ class CanvasWin(QWidget):
             return
 
         # MOVE VERTEX
-        closest_shape, vertex_index = helper.get_closest_shape_vertex(mousePos, self.shapes)
+        closest_shape, vertex_index = helper.get_closest_shape_vertex(mousePos, self.shape_index.shapes_near(mousePos, helper.MIN_DIST_HIGHLIGHT+1))
         if closest_shape is not None:
             self.deselect_all()
             self.select(closest_shape, True)
@@ -695,7 +840,7 @@ class CanvasWin(QWidget):
             return
         
         # MOVE SHAPE
-        closest_shape = helper.get_shape_within(mousePos, self.shapes)
+        closest_shape = helper.get_shape_within(mousePos, self.shape_index.shapes_at(mousePos))
         if closest_shape is not None:
             self.select(closest_shape, True)
             #Start moving shape
@@ -741,7 +886,8 @@ class CanvasWin(QWidget):
         if self.state == MOVING_VERTEX or self.state == MOVING_SHAPE:
             self.set_state(EDIT)
             self.clicked_shape = None
-            shape = helper.get_shape_within(self.get_mouse_relative(), self.shapes)
+            mousePos = self.get_mouse_relative()
+            shape = helper.get_shape_within(mousePos, self.shape_index.shapes_at(mousePos))
             self.auto_fill_shape(shape)
         
         self.update()
\ No newline at end of file
@@ -70,7 +70,7 @@ class CoordinatesLog(QWidget):
             canvas = CanvasWin.instance()
             viewport_size = canvas.viewport.size()
             pixmap_at =  -canvas.viewport.pos()
-            pixmap_size = canvas.original_pixmap.size() * canvas.scale
+            pixmap_size = canvas.scaled_size()
 
             self.viewport.setText(f"Viewport: {canvas.viewport.pos().x}, {canvas.viewport.pos().y}")
             self._min.setText(f"Min: {canvas.viewport.to_global(canvas.viewport.top_left()).x}, {canvas.viewport.to_global(canvas.viewport.top_left()).y}")
@@ -0,0 +1,140 @@
+from math import floor, log2
+from threading import Lock
+
+from PyQt5.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage
+
+
+class PyramidJob(QRunnable):
+    def __init__(self, pyramid: 'ImagePyramid'):
+        super().__init__()
+        self.pyramid = pyramid
+
+    def run(self):
+        self.pyramid._build_levels()
+
+class ImagePyramid(QObject):
+    '''
+        Power of two downscaled copies (mipmaps) of an image. The canvas draws the nearest
+        level to the current scale, so the painter only applies a small residual transform.
+        The levels are built lazily in a background thread the first time a scale needs them, only
+        up to the level asked for, each level is downscaled from the one before it.
+
+        A preview pyramid only has a reduced resolution decode of the image, drawn at any scale
+        until the full resolution image replaces it.
+
+        Args:
+            image (QImage): The full resolution image, level 0 of the pyramid
+            full_size (QSize): The size of the full image if 'image' is a preview of it
+    '''
+    OnLevelBuilt = pyqtSignal(int)
+
+    MIN_LEVEL_SIZE = 256 # levels smaller than this (on the bigger axis) are not built
+
+    def __init__(self, image: QImage, full_size: QSize = None):
+        super().__init__()
+        self.__levels: list[QImage] = [image]
+        self.__lock = Lock()
+        self.__building = False
+        self.__target = 0 # the coarsest level asked for, the levels are built up to it
+        self.__cancelled = False
+        self.__full_size = full_size if full_size is not None else image.size()
+
+        self.__level_count = 1
+        bigger_axis = max(image.width(), image.height())
+        while full_size is None and bigger_axis / 2 ** self.__level_count >= ImagePyramid.MIN_LEVEL_SIZE:
+            self.__level_count += 1
+
+    def size(self) -> QSize:
+        '''
+            Returns the size of the full resolution image
+        '''
+        return self.__full_size
+
+    def is_preview(self) -> bool:
+        return self.__full_size != self.__levels[0].size()
+
+    def level_count(self) -> int:
+        return self.__level_count
+
+    def built_levels(self) -> int:
+        with self.__lock:
+            return len(self.__levels)
+
+    def level(self, index: int) -> QImage:
+        with self.__lock:
+            return self.__levels[index]
+
+    def level_index(self, scale: float) -> int:
+        '''
+            Returns the smallest level with at least the resolution needed to draw the image at 'scale'.
+
+            Args:
+                scale (float): The scale the image will be drawn at
+        '''
+        if scale >= 1 or self.__level_count == 1:
+            return 0
+        return min(floor(log2(1 / scale)), self.__level_count - 1)
+
+    def nearest_level(self, scale: float) -> int:
+        '''
+            Returns the index of the level to draw the image at 'scale'. If it isn't built yet, starts
+            building the levels up to it and returns the closest finer level already built.
+
+            Args:
+                scale (float): The scale the image will be drawn at
+        '''
+        index = self.level_index(scale)
+        with self.__lock:
+            built = len(self.__levels)
+        if index >= built:
+            self.build(index)
+            index = built - 1
+        return index
+
+    def level_for(self, scale: float) -> QImage:
+        '''
+            Returns the level to draw the image at 'scale', see nearest_level.
+
+            Args:
+                scale (float): The scale the image will be drawn at
+        '''
+        return self.level(self.nearest_level(scale))
+
+    def build(self, index: int = None) -> None:
+        '''
+            Starts building the missing levels up to 'index' in the global thread pool.
+
+            Args:
+                index (int): The last level to build, all of them if None
+        '''
+        if index is None:
+            index = self.__level_count - 1
+        with self.__lock:
+            # A build already running goes on to the new level
+            self.__target = max(self.__target, min(index, self.__level_count - 1))
+            if self.__building or len(self.__levels) > self.__target:
+                return
+            self.__building = True
+        QThreadPool.globalInstance().start(PyramidJob(self))
+
+    def cancel(self) -> None:
+        '''
+            Stops building the levels, used when the image is no longer displayed.
+        '''
+        self.__cancelled = True
+
+    def _build_levels(self) -> None:
+        while True:
+            with self.__lock:
+                # Stopped in the same lock the target is raised in, so a level asked for isn't missed
+                if self.__cancelled or len(self.__levels) > self.__target:
+                    self.__building = False
+                    return
+                previous = self.__levels[-1]
+            level = previous.scaled(max(previous.width() // 2, 1), max(previous.height() // 2, 1),
+                                    Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            with self.__lock:
+                self.__levels.append(level)
+                index = len(self.__levels) - 1
+            self.OnLevelBuilt.emit(index)
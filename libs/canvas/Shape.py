@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
@@ -6,7 +8,20 @@ from libs.standalones.Vector import Vector2Int
 from libs.standalones.MyException import InvalidVertexException
 from libs.standalones.Utils import utils
 
-    
+@dataclass
+class RenderCache:
+    '''
+        Qt objects used to paint a shape, kept between frames by the shape.
+    '''
+    scale: float
+    rect: QRect
+    brush: QBrush
+    fill_color: QColor | None # color the rect is filled with, None if it isn't filled
+    line_pen: QPen
+    vertex_pen: QPen
+    vertex_brush: QBrush
+    vertex_rects: list[QRect]
+
 class Shape:
     #DEFAULT_VERTEX_COLOR = QColor(124, 252, 0, 255)
     DEFAULT_HIGHLIGHT_COLOR = QColor(242, 0, 0, 255)
@@ -17,35 +32,92 @@ class Shape:
     VERTEX_HIGHLIGHT_GROWTH = 3
 
     PEN_SIZE = 2
+
+    changes = 0 # bumped every time something drawn changes on any shape, layers of shapes compare it
     
     def __init__(self, name: str, points: ShapePoints) -> None:
         assert points is not None, "Shape.__init__(): points must not be None"
+        self.__render_cache: RenderCache = None # invalidated when anything drawn changes
+
         self.name = name
         self.__points = points
         self.isVisible = True
-        self.highlighted_vertex = -1
-        self.fill = False
-        self.selected = False
+        self.__highlighted_vertex = -1
+        self.__fill = False
+        self.__selected = False
 
-        generated_color = utils.generate_color_by_text(self.name)
-        generated_color.setAlpha(255)
-
-        self.lines_color = QColor(generated_color)
-        self.vertex_color = QColor(generated_color)
         self.highlighted_color = Shape.DEFAULT_HIGHLIGHT_COLOR
         self.selected_color = Shape.DEFAULT_SELECTED_COLOR
-        self.fill_color = QColor(generated_color)
         self.fill_pattern = Shape.DEFAULT_FILL_PATTERN
-        generated_color.setAlpha(100)
-        self.fill_pattern_color = QColor(generated_color)
+        self.__set_colors()
 
         _min, _max = Vector2Int.get_min_max(self.__points)
         self.__size = QSize(_max.x - _min.x, _max.y - _min.y)
         self.__scale = 1.0
         self.__scaled = [point.as_qpoint() for point in self.__points]
+        self.__listeners: list = [] # functions called with the shape when its points change
+
+    def __set_colors(self) -> None:
+        generated_color = utils.generate_color_by_text(self.name)
+        generated_color.setAlpha(255)
+
+        self.lines_color = QColor(generated_color)
+        self.vertex_color = QColor(generated_color)
+        self.fill_color = QColor(generated_color)
+        generated_color.setAlpha(100)
+        self.fill_pattern_color = QColor(generated_color)
+        self.__render_cache = None
+
+    def __changed(self) -> None:
+        self.__render_cache = None
+        Shape.changes += 1
+
+    @property
+    def highlighted_vertex(self) -> int:
+        return self.__highlighted_vertex
+
+    @highlighted_vertex.setter
+    def highlighted_vertex(self, index: int) -> None:
+        if index != self.__highlighted_vertex:
+            self.__highlighted_vertex = index
+            self.__changed()
+
+    @property
+    def fill(self) -> bool:
+        return self.__fill
+
+    @fill.setter
+    def fill(self, val: bool) -> None:
+        if val != self.__fill:
+            self.__fill = val
+            self.__changed()
+
+    @property
+    def selected(self) -> bool:
+        return self.__selected
+
+    @selected.setter
+    def selected(self, val: bool) -> None:
+        if val != self.__selected:
+            self.__selected = val
+            self.__changed()
+
+    def bind_on_change(self, func) -> None:
+        '''
+            Binds a function to be called with the shape every time its points change.
+
+            Args:
+                func: The function to bind
+        '''
+        self.__listeners.append(func)
+
+    def unbind_on_change(self, func) -> None:
+        self.__listeners.remove(func)
 
     def set_name(self, name: str):
         self.name = name
+        self.__set_colors()
+        self.__changed()
 
     def get_points(self) -> ShapePoints:
         return self.__points.copy()
@@ -71,6 +143,9 @@ class Shape:
     def __update(self) -> None:
         self.__update_size()
         self.__update_scale(self.__scale)
+        self.__changed()
+        for func in self.__listeners:
+            func(self)
 
     def __update_size(self) -> None:
         self.__size = QSize(abs(self.bot_right().x - self.top_left().x), abs(self.bot_right().y - self.top_left().y))
@@ -78,6 +153,7 @@ class Shape:
     def __update_scale(self, scale: float):
         self.__scale = scale
         self.__scaled = self.__scale_points(scale)
+        self.__render_cache = None
 
     def closest_vertex(self, pos: Vector2Int, limit: float) -> tuple[int, float] | tuple[None, None]:
         closest = (None, None)
@@ -155,6 +231,20 @@ class Shape:
         else:
             return False
 
+    def paint_rect(self, scale: float) -> QRect:
+        '''
+            Returns the area covered by the shape painted at 'scale', including its vertexes and pen.
+
+            Args:
+                scale (float): The scale the shape is painted at
+        '''
+        margin = int((Shape.VERTEX_SIZE + Shape.VERTEX_HIGHLIGHT_GROWTH) * max(scale, 1)) + Shape.PEN_SIZE
+        if self.__render_cache is not None and self.__render_cache.scale == scale:
+            return self.__render_cache.rect.adjusted(-margin, -margin, margin, margin)
+
+        _min, _max = Vector2Int.get_min_max(self.__points)
+        return QRect((_min * scale).as_qpoint(), (_max * scale).as_qpoint()).adjusted(-margin, -margin, margin, margin)
+
     def get_highlighted_vertex(self) -> int | None:
         if self.highlighted_vertex < 0:
             return None
@@ -172,57 +262,75 @@ class Shape:
             return int(Shape.VERTEX_SIZE * scale)
         return int((Shape.VERTEX_SIZE + Shape.VERTEX_HIGHLIGHT_GROWTH) * self.__scale)
 
-    def __draw_square(self, painter: QPainter, scale: float):
+    def is_interactive(self) -> bool:
+        '''
+            Returns true if the shape is drawn differently from its normal state,
+            i.e. it's selected, filled or has a highlighted vertex.
+        '''
+        return self.selected or self.fill or self.highlighted_vertex >= 0
+
+    def render_cache(self, scale: float) -> RenderCache:
+        '''
+            Returns the Qt objects used to paint the shape at 'scale', rebuilding them if anything changed.
+
+            Args:
+                scale (float): The scale the shape is painted at
+        '''
+        if self.__render_cache is not None and self.__render_cache.scale == scale:
+            return self.__render_cache
+
+        if scale != self.__scale:
+            self.__update_scale(scale)
 
         if self.selected:
-            painter.setBrush(QBrush(self.selected_color, self.fill_pattern))
+            brush = QBrush(self.selected_color, self.fill_pattern)
         elif self.fill:
-            painter.setBrush(QBrush(self.fill_pattern_color, self.fill_pattern))
+            brush = QBrush(self.fill_pattern_color, self.fill_pattern)
         else:
-            painter.setBrush(utils.Empty_Brush)
+            brush = utils.Empty_Brush
 
-        if self.get_highlighted_vertex() is not None:
-            painter.setPen(self.__get_pen(scale, self.highlighted_color))
+        h_vertex = self.get_highlighted_vertex()
+        if h_vertex is None:
+            line_pen = self.__get_pen(scale, self.lines_color)
+            vertex_pen = self.__get_pen(scale, self.vertex_color)
+            vertex_brush = QBrush(self.vertex_color)
         else:
-            painter.setPen(self.__get_pen(scale, self.lines_color))
-        
+            line_pen = self.__get_pen(scale, self.highlighted_color)
+            vertex_pen = line_pen
+            vertex_brush = QBrush(self.highlighted_color)
+
+        # Get the points of the shape and its vertexes
+        _min, _max = Vector2Int.get_min_max(self.__scaled)
+        vertex_rects: list[QRect] = []
+        for index, p in enumerate(self.__scaled):
+            size = self.__vertex_size(h_vertex == index)
+            vertex_rects.append(QRect(p.x() - size // 2, p.y() - size // 2, size, size))
 
-        # Get the points and draw the shape
-        points = self.__scaled
-        _min, _max = Vector2Int.get_min_max(points)
-        draw_rect = QRect(_min, _max)
+        self.__render_cache = RenderCache(scale, QRect(_min, _max), brush,
+                                          brush.color() if self.fill or self.selected else None,
+                                          line_pen, vertex_pen, vertex_brush, vertex_rects)
+        return self.__render_cache
 
-        if self.fill or self.selected:
-            painter.fillRect(draw_rect, painter.brush().color())
-        painter.drawRect(draw_rect)
+    def __draw_square(self, painter: QPainter, render: RenderCache):
+        painter.setBrush(render.brush)
+        painter.setPen(render.line_pen)
 
-        self.__draw_vertex(painter, scale, points)
+        if render.fill_color is not None:
+            painter.fillRect(render.rect, render.fill_color)
+        painter.drawRect(render.rect)
 
-    def __draw_vertex(self, painter: QPainter, scale: float, points: list[QPoint]):
-        # Get the highlighted vertex and points
-        h_vertex = self.get_highlighted_vertex()
-        # Set the pen and brush
-        if h_vertex is None:
-            painter.setPen(self.__get_pen(scale, self.vertex_color))
-            painter.setBrush(self.vertex_color)
-        else:
-            painter.setPen(self.__get_pen(scale, self.highlighted_color))
-            painter.setBrush(self.highlighted_color)
+        self.__draw_vertex(painter, render)
 
-        index = 0
-        while index < len(points):
-            p = points[index]
-            size = self.__vertex_size(h_vertex == index)
-            if h_vertex is not None and h_vertex == index:
-                painter.drawRect(p.x() - size // 2, p.y() - size // 2, size, size)
-                index += 1
+    def __draw_vertex(self, painter: QPainter, render: RenderCache):
+        painter.setPen(render.vertex_pen)
+        painter.setBrush(render.vertex_brush)
+
+        h_vertex = self.get_highlighted_vertex()
+        for index, rect in enumerate(render.vertex_rects):
+            if index == h_vertex:
+                painter.drawRect(rect)
                 continue
-            painter.drawEllipse(p.x() - size // 2, p.y() - size // 2, size, size)
-            index += 1
+            painter.drawEllipse(rect)
 
     def paint(self, painter: QPainter, scale: float):
-        
-        if scale != self.__scale:
-            self.__update_scale(scale)
-
-        self.__draw_square(painter, scale)
\ No newline at end of file
+        self.__draw_square(painter, self.render_cache(scale))
@@ -0,0 +1,98 @@
+from PyQt5.QtCore import Qt, QRect, QSize
+from PyQt5.QtGui import QPainter, QPixmap
+
+from libs.canvas.Shape import Shape
+from libs.canvas.ShapeRenderer import ShapeRenderer
+
+
+class ShapeOverlay:
+    '''
+        Offscreen layer with the shapes in their normal state painted at the current scale,
+        composited over the image so panning doesn't repaint every shape.
+        The layer covers the visible part of the image and a margin around it, so its size depends
+        on the window instead of the image, and panning only rebuilds it when leaving that area.
+        It's painted at a value of Shape.changes, any change to a shape (move, rename, selection...)
+        bumps it and makes the layer stale, adding or removing shapes must call invalidate.
+        The selected, filled and highlighted shapes are never in the layer, they are painted live.
+    '''
+    PAN_MARGIN = 0.5 # the layer extends past the visible area by this fraction of its size on each side
+    MAX_PIXELS = 4096 * 4096 # bigger layers aren't built, the shapes are painted live instead
+
+    def __init__(self):
+        self.__pixmap: QPixmap = None
+        self.__scale: float = None
+        self.__rect = QRect() # the area of the layer, relative to the image position
+        self.__bounds = QRect() # the area the shapes can be painted in, the image and the margin of the vertexes
+        self.__changes = -1 # the value of Shape.changes the layer was painted at
+
+    def invalidate(self) -> None:
+        self.__pixmap = None
+        self.__scale = None
+        self.__rect = QRect()
+        self.__changes = -1
+
+    def is_valid(self, scale: float, visible: QRect) -> bool:
+        '''
+            Returns true if the layer still matches the shapes painted at 'scale' and covers the visible area.
+
+            Args:
+                scale (float): The scale of the canvas
+                visible (QRect): The visible area, relative to the image position
+        '''
+        return self.__pixmap is not None and self.__scale == scale and self.__changes == Shape.changes \
+            and self.__rect.contains(visible.intersected(self.__bounds))
+
+    def build(self, shapes: list[Shape], size: QSize, scale: float, visible: QRect) -> bool:
+        '''
+            Paints the shapes in their normal state around the visible area into the layer, returns false
+            if the layer would be too big to keep and the shapes must be painted live.
+
+            Args:
+                shapes (list[Shape]): The shapes of the canvas
+                size (QSize): The size of the image at 'scale'
+                scale (float): The scale of the canvas
+                visible (QRect): The visible area, relative to the image position
+        '''
+        margin = int((Shape.VERTEX_SIZE + Shape.VERTEX_HIGHLIGHT_GROWTH) * max(scale, 1)) + Shape.PEN_SIZE
+        # The vertexes and pen of the shapes on the borders go past the image
+        self.__bounds = QRect(-margin, -margin, size.width() + margin * 2, size.height() + margin * 2)
+        pan_x = int(visible.width() * ShapeOverlay.PAN_MARGIN)
+        pan_y = int(visible.height() * ShapeOverlay.PAN_MARGIN)
+        rect = visible.adjusted(-pan_x, -pan_y, pan_x, pan_y).intersected(self.__bounds)
+        if rect.isEmpty() or rect.width() * rect.height() > ShapeOverlay.MAX_PIXELS:
+            rect = visible.intersected(self.__bounds)
+        if rect.isEmpty() or rect.width() * rect.height() > ShapeOverlay.MAX_PIXELS:
+            self.invalidate()
+            return False
+
+        normal = [shape for shape in shapes if not shape.is_interactive() and shape.paint_rect(scale).intersects(rect)]
+        if self.__pixmap is None or self.__pixmap.size() != rect.size():
+            self.__pixmap = QPixmap(rect.size())
+        self.__pixmap.fill(Qt.transparent)
+
+        painter = QPainter(self.__pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-rect.topLeft())
+        ShapeRenderer.paint(painter, normal, scale)
+        painter.end()
+
+        self.__scale = scale
+        self.__rect = rect
+        self.__changes = Shape.changes
+        return True
+
+    def paint(self, painter: QPainter, visible: QRect) -> None:
+        '''
+            Draws the part of the layer inside the visible area, the painter must already be
+            translated to the image position.
+
+            Args:
+                painter (QPainter): The painter to draw with
+                visible (QRect): The area to draw, relative to the image position
+        '''
+        if self.__pixmap is None:
+            return
+        target = visible.intersected(self.__rect)
+        if target.isEmpty():
+            return
+        painter.drawPixmap(target, self.__pixmap, target.translated(-self.__rect.topLeft()))
@@ -0,0 +1,77 @@
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QPainter, QPen, QBrush
+
+from libs.canvas.Shape import Shape
+from libs.standalones.Utils import utils
+from libs.standalones.MyException import InvalidInstantiation
+
+
+class ShapeBatch:
+    '''
+        Shapes in the normal state sharing the same colors, painted with a single
+        drawRects and a single pen and brush change for all of their vertexes.
+    '''
+    def __init__(self, line_pen: QPen, vertex_pen: QPen, vertex_brush: QBrush):
+        self.line_pen = line_pen
+        self.vertex_pen = vertex_pen
+        self.vertex_brush = vertex_brush
+        self.rects: list[QRect] = []
+        # A single QPainterPath with every vertex is much slower to fill on the raster
+        # engine than drawing the ellipses one by one, so only the state changes are batched
+        self.vertexes: list[QRect] = []
+
+    def add(self, rect: QRect, vertex_rects: list[QRect]) -> None:
+        self.rects.append(rect)
+        self.vertexes.extend(vertex_rects)
+
+class ShapeRenderer:
+    """
+    A data only class, paints shapes grouped by their visual state to cut the pen and brush changes.
+    The shapes in the normal state are batched by color, the selected, filled and highlighted
+    ones are few and painted on top of them one by one.
+    """
+    def __new__(cls: type['ShapeRenderer']) -> 'ShapeRenderer':
+        raise InvalidInstantiation("Tried to instantiate 'ShapeRenderer' class, a data only class.")
+
+    @staticmethod
+    def paint(painter: QPainter, shapes: list[Shape], scale: float) -> None:
+        """
+        Paints the shapes, the painter must already be translated to the image position.
+
+        Args:
+            painter (QPainter): The painter to draw with.
+            shapes (list[Shape]): The shapes to paint.
+            scale (float): The scale of the canvas.
+        """
+        batches: dict[int, ShapeBatch] = {}
+        interactive: list[Shape] = []
+
+        for shape in shapes:
+            if shape.is_interactive():
+                interactive.append(shape)
+                continue
+
+            render = shape.render_cache(scale)
+            key = render.line_pen.color().rgba()
+            batch = batches.get(key)
+            if batch is None:
+                batch = batches[key] = ShapeBatch(render.line_pen, render.vertex_pen, render.vertex_brush)
+            batch.add(render.rect, render.vertex_rects)
+
+        # Batches are painted in a fixed color order, so overlapping shapes look the same
+        # whether the whole canvas or only a damaged part of it is repainted
+        ordered = [batches[key] for key in sorted(batches)]
+
+        painter.setBrush(utils.Empty_Brush)
+        for batch in ordered:
+            painter.setPen(batch.line_pen)
+            painter.drawRects(batch.rects)
+
+        for batch in ordered:
+            painter.setPen(batch.vertex_pen)
+            painter.setBrush(batch.vertex_brush)
+            for vertex in batch.vertexes:
+                painter.drawEllipse(vertex)
+
+        for shape in interactive:
+            shape.paint(painter, scale)
@@ -0,0 +1,130 @@
+from math import floor
+
+from libs.canvas.Shape import Shape
+from libs.standalones.Vector import Vector2Int
+
+
+class SpatialIndex:
+    '''
+        Uniform grid over the image coordinates, each cell holds the shapes whose
+        bounding box overlaps it. The index follows the shapes through their change
+        listeners, so moving a shape or one of its vertexes updates it incrementally.
+
+        Args:
+            cell_size (int): The size of a cell in pixels of the image
+    '''
+    CELL_SIZE = 128
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.__cell_size = cell_size
+        self.__cells: dict[tuple[int, int], set[Shape]] = {}
+        self.__shape_cells: dict[Shape, list[tuple[int, int]]] = {}
+        self.__order: dict[Shape, int] = {} # insertion order, queries return shapes in this order
+        self.__counter = 0
+
+    def __cells_of(self, _min: Vector2Int, _max: Vector2Int) -> list[tuple[int, int]]:
+        size = self.__cell_size
+        return [(x, y)
+                for x in range(floor(_min.x / size), floor(_max.x / size) + 1)
+                for y in range(floor(_min.y / size), floor(_max.y / size) + 1)]
+
+    def __add_to_cells(self, shape: Shape) -> None:
+        _min, _max = Vector2Int.get_min_max(shape.get_points())
+        cells = self.__cells_of(_min, _max)
+        for cell in cells:
+            self.__cells.setdefault(cell, set()).add(shape)
+        self.__shape_cells[shape] = cells
+
+    def __remove_from_cells(self, shape: Shape) -> None:
+        for cell in self.__shape_cells.pop(shape, []):
+            cell_shapes = self.__cells[cell]
+            cell_shapes.discard(shape)
+            if len(cell_shapes) == 0:
+                del self.__cells[cell]
+
+    def __on_shape_change(self, shape: Shape) -> None:
+        self.__remove_from_cells(shape)
+        self.__add_to_cells(shape)
+
+    def insert(self, shape: Shape) -> None:
+        '''
+            Adds a shape to the index.
+
+            Args:
+                shape (Shape): The shape to add
+        '''
+        if shape in self.__order:
+            return
+        self.__order[shape] = self.__counter
+        self.__counter += 1
+        self.__add_to_cells(shape)
+        shape.bind_on_change(self.__on_shape_change)
+
+    def remove(self, shape: Shape) -> None:
+        '''
+            Removes a shape from the index.
+
+            Args:
+                shape (Shape): The shape to remove
+        '''
+        if shape not in self.__order:
+            return
+        shape.unbind_on_change(self.__on_shape_change)
+        self.__remove_from_cells(shape)
+        del self.__order[shape]
+
+    def clear(self) -> None:
+        for shape in list(self.__order):
+            self.remove(shape)
+        self.__counter = 0
+
+    def rebuild(self, shapes: list[Shape]) -> None:
+        '''
+            Replaces the indexed shapes, keeping the order of the list.
+
+            Args:
+                shapes (list[Shape]): The shapes to index
+        '''
+        self.clear()
+        for shape in shapes:
+            self.insert(shape)
+
+    def query(self, pos: Vector2Int, radius: float = 0) -> list[Shape]:
+        '''
+            Returns the shapes whose bounding box may be within 'radius' of 'pos', in insertion order.
+            Used to narrow down the shapes tested by CanvasHelper.
+
+            Args:
+                pos (Vector2Int): The point to check
+                radius (float): The distance from the point
+        '''
+        radius = int(radius) + 1
+        found: set[Shape] = set()
+        for cell in self.__cells_of(pos - Vector2Int(radius, radius), pos + Vector2Int(radius, radius)):
+            found.update(self.__cells.get(cell, ()))
+        return sorted(found, key=self.__order.__getitem__)
+
+    def shapes_at(self, pos: Vector2Int) -> list[Shape]:
+        '''
+            Returns the shapes containing 'pos', in insertion order.
+
+            Args:
+                pos (Vector2Int): The point to check
+        '''
+        return [shape for shape in self.query(pos) if shape.is_within(pos)]
+
+    def shapes_near(self, pos: Vector2Int, radius: float) -> list[Shape]:
+        '''
+            Returns the shapes with a vertex closer than 'radius' to 'pos', in insertion order.
+
+            Args:
+                pos (Vector2Int): The point to check
+                radius (float): The maximum distance of the vertex
+        '''
+        return [shape for shape in self.query(pos, radius) if shape.closest_vertex(pos, radius)[0] is not None]
+
+    def __len__(self) -> int:
+        return len(self.__order)
+
+    def __contains__(self, shape: Shape) -> bool:
+        return shape in self.__order
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from math import ceil
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QPainter, QPixmap
+
+from libs.canvas.ImagePyramid import ImagePyramid
+
+
+class TileRenderer:
+    '''
+        Paints the canvas image as fixed size tiles of the nearest pyramid level.
+        Only the tiles intersecting the visible area are converted to pixmaps and drawn,
+        so the paint cost depends on the window size instead of the image size.
+        The converted tiles are kept in an LRU cache bounded by memory, like ImageCache,
+        a full 512x512 tile uses 1MB.
+
+        Args:
+            budget_mb (float): The memory budget of the tile cache in MB
+    '''
+    TILE_SIZE = 512 # size of a tile in pixels of its level
+
+    def __init__(self, budget_mb: float):
+        self.__pyramid: ImagePyramid = None
+        self.__tiles: OrderedDict[tuple[int, int, int], QPixmap] = OrderedDict()
+        self.__budget = int(budget_mb * 1024 * 1024)
+        self.__used = 0
+
+    @staticmethod
+    def tile_bytes(tile: QPixmap) -> int:
+        return tile.width() * tile.height() * tile.depth() // 8
+
+    def set_pyramid(self, pyramid: ImagePyramid) -> None:
+        '''
+            Sets the image to draw, discarding the tiles of the last one.
+
+            Args:
+                pyramid (ImagePyramid): The pyramid of the image
+        '''
+        self.__pyramid = pyramid
+        self.clear()
+
+    def clear(self) -> None:
+        self.__tiles.clear()
+        self.__used = 0
+
+    def used_bytes(self) -> int:
+        return self.__used
+
+    def __tile(self, level_index: int, tx: int, ty: int) -> QPixmap:
+        key = (level_index, tx, ty)
+        tile = self.__tiles.get(key)
+        if tile is not None:
+            self.__tiles.move_to_end(key)
+            return tile
+
+        size = TileRenderer.TILE_SIZE
+        level = self.__pyramid.level(level_index)
+        tile_rect = QRect(tx * size, ty * size, size, size).intersected(level.rect())
+        tile = QPixmap.fromImage(level.copy(tile_rect))
+
+        # A tile bigger than the whole budget is drawn without being kept
+        size = TileRenderer.tile_bytes(tile)
+        if size > self.__budget:
+            return tile
+
+        self.__tiles[key] = tile
+        self.__used += size
+        while self.__used > self.__budget:
+            _, old = self.__tiles.popitem(last=False)
+            self.__used -= TileRenderer.tile_bytes(old)
+        return tile
+
+    def paint(self, painter: QPainter, target: QRect, visible: QRect, scale: float) -> None:
+        '''
+            Draws the tiles of the image intersecting the visible area.
+
+            Args:
+                painter (QPainter): The painter to draw with
+                target (QRect): The rect the whole image is drawn into
+                visible (QRect): The area of the widget that needs to be painted
+                scale (float): The scale of the canvas
+        '''
+        if self.__pyramid is None or target.isEmpty():
+            return
+
+        area = visible.intersected(target)
+        if area.isEmpty():
+            return
+
+        level_index = self.__pyramid.nearest_level(scale)
+        level = self.__pyramid.level(level_index)
+        size = TileRenderer.TILE_SIZE
+
+        # Scale from the level to the widget, the painter only applies this residual
+        factor_x = target.width() / level.width()
+        factor_y = target.height() / level.height()
+
+        # Visible area in pixels of the level
+        first_x = max(int((area.left() - target.left()) / factor_x) // size, 0)
+        first_y = max(int((area.top() - target.top()) / factor_y) // size, 0)
+        last_x = min(ceil((area.right() + 1 - target.left()) / factor_x / size), ceil(level.width() / size))
+        last_y = min(ceil((area.bottom() + 1 - target.top()) / factor_y / size), ceil(level.height() / size))
+
+        for ty in range(first_y, last_y):
+            # Rounded edges are shared by the neighbouring tiles, so there are no seams between them
+            top = target.top() + round(ty * size * factor_y)
+            bottom = target.top() + round(min((ty + 1) * size, level.height()) * factor_y)
+            for tx in range(first_x, last_x):
+                left = target.left() + round(tx * size * factor_x)
+                right = target.left() + round(min((tx + 1) * size, level.width()) * factor_x)
+
+                tile = self.__tile(level_index, tx, ty)
+                painter.drawPixmap(QRect(left, top, right - left, bottom - top), tile, tile.rect())
@@ -8,6 +8,7 @@ class ActionBind(Enum):
     multi_select = 4
     move = 5
     edit = 6
+    next_unlabelled = 7
 
     def __str__(self) -> str:
         return self.name
\ No newline at end of file
@@ -47,6 +47,19 @@ class KeyHandler:
     
     def __init__(self, mainWindow: QMainWindow) -> None: ...
 
+    @staticmethod
+    def __default_binds() -> dict[ActionBind, bind]:
+        return {
+            ActionBind.next_image: bind(Key('d'), KeyStates.KEY_DOWN, False),
+            ActionBind.prev_image: bind(Key('a'), KeyStates.KEY_DOWN, False),
+            ActionBind.create_shape: bind(Key('w'), KeyStates.KEY_DOWN, False),
+            ActionBind.delete_shape: bind(Key('delete'), KeyStates.KEY_DOWN, False),
+            ActionBind.multi_select: bind(Key('control'), KeyStates.KEY_CHANGE, True),
+            ActionBind.move: bind(Key('space'), KeyStates.KEY_DOWN, True),
+            ActionBind.edit: bind(Key('control+e'), KeyStates.KEY_DOWN, False),
+            ActionBind.next_unlabelled: bind(Key('u'), KeyStates.KEY_DOWN, False)
+            }
+
     def __load(self, mainWindow: QMainWindow) -> None:
         self.__changed_key = ""
         self.__mainWindow = mainWindow
@@ -57,15 +70,7 @@ class KeyHandler:
             os.makedirs(save_folder())
 
         if not os.path.exists(self.__keybinds_path) and not os.path.exists(self.__default_keybinds_path):
-            self.__binds: dict[str, bind] = {
-            ActionBind.next_image: bind(Key('d'), KeyStates.KEY_DOWN, False),
-            ActionBind.prev_image: bind(Key('a'), KeyStates.KEY_DOWN, False),
-            ActionBind.create_shape: bind(Key('w'), KeyStates.KEY_DOWN, False),
-            ActionBind.delete_shape: bind(Key('delete'), KeyStates.KEY_DOWN, False),
-            ActionBind.multi_select: bind(Key('control'), KeyStates.KEY_CHANGE, True),
-            ActionBind.move: bind(Key('space'), KeyStates.KEY_DOWN, True),
-            ActionBind.edit: bind(Key('control+e'), KeyStates.KEY_DOWN, False)
-            }
+            self.__binds: dict[str, bind] = self.__default_binds()
             self.save()
         if os.path.exists(self.__keybinds_path):
             with open(self.__keybinds_path, 'r') as f:
@@ -79,6 +84,10 @@ class KeyHandler:
         for key, val in binds.items():
             self.__binds[ActionBind[key]] = bind(Key(val['key']), KeyStates[val['state_type']], val['toggle'])
 
+        # Keybinds saved by older versions may miss some actions
+        for action, default in self.__default_binds().items():
+            self.__binds.setdefault(action, default)
+
         keyboard.hook(self.__hook)
 
     # TODO: Change name of this function
@@ -0,0 +1,123 @@
+from threading import Lock, Event
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool
+
+from libs.standalones.AnnotationStore import AnnotationStore, AnnotationSnapshot
+
+
+class SaveJob(QRunnable):
+    def __init__(self, saver: 'AnnotationSaver', img_path: str):
+        super().__init__()
+        self.saver = saver
+        self.img_path = img_path
+
+    def run(self):
+        self.saver._write(self.img_path)
+
+class AnnotationSaver(QObject):
+    '''
+        Writes the annotations in a background thread, so a slow disk doesn't stall the navigation.
+        Saving the same file again before it's written only keeps the latest snapshot, and
+        annotations with the same boxes they were loaded with aren't written at all.
+
+        Usage:
+            AnnotationSaver.instance().save(snapshot, loaded_boxes)\n
+            AnnotationSaver.instance().wait(img_path)\n
+            AnnotationSaver.instance().flush()
+    '''
+    __instance = None
+
+    @classmethod
+    def instance(cls) -> 'AnnotationSaver':
+        return cls.__instance
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.__queued: dict[str, AnnotationSnapshot] = {} # image path -> latest snapshot not written yet
+        self.__pending: dict[str, Event] = {} # images queued or being written
+        self.__lock = Lock()
+
+        self.written = 0 # annotations written to disk
+        self.skipped = 0 # annotations not written because they didn't change
+        self.failed = 0 # annotations that couldn't be written
+
+        # A single thread, the files are written in the order they were saved
+        self.__pool = QThreadPool(self)
+        self.__pool.setMaxThreadCount(1)
+
+        AnnotationSaver.__instance = self
+
+    def _write(self, img_path: str) -> None:
+        with self.__lock:
+            snapshot = self.__queued.pop(img_path, None)
+        try:
+            if snapshot is not None:
+                AnnotationStore.for_image(img_path).write(snapshot)
+                with self.__lock:
+                    self.written += 1
+        except Exception as e:
+            # Whatever failed, the waiters of the image mustn't wait forever
+            print(f"Couldn't save the annotation of {img_path}: {e}")
+            with self.__lock:
+                self.failed += 1
+        finally:
+            with self.__lock:
+                # Saved again while writing, the job scheduled for it will set the event
+                event = None if img_path in self.__queued else self.__pending.pop(img_path, None)
+            if event is not None:
+                event.set()
+
+    def save(self, snapshot: AnnotationSnapshot, loaded_boxes: tuple = None) -> bool:
+        '''
+            Queues the snapshot to be written to the store of its image, replacing the one queued
+            for it if any. Returns false if the boxes are the same as 'loaded_boxes' and the
+            annotation was left untouched.
+
+            Args:
+                snapshot (AnnotationSnapshot): The annotation to write
+                loaded_boxes (tuple): The boxes the annotation had when it was loaded, None to always write it
+        '''
+        img_path = snapshot.local_img_path
+        if loaded_boxes is not None and snapshot.boxes == loaded_boxes:
+            with self.__lock:
+                self.skipped += 1
+            return False
+
+        with self.__lock:
+            scheduled = img_path in self.__queued
+            self.__queued[img_path] = snapshot
+            self.__pending.setdefault(img_path, Event())
+        if not scheduled:
+            self.__pool.start(SaveJob(self, img_path))
+        return True
+
+    def wait(self, img_path: str) -> None:
+        '''
+            Waits until the annotation queued for the image is written, so reading it doesn't
+            return the old content.
+
+            Args:
+                img_path (str): The path of the image
+        '''
+        with self.__lock:
+            event = self.__pending.get(img_path)
+        if event is not None:
+            event.wait()
+
+    def stats(self) -> dict[str, int]:
+        '''
+            Returns the counters of the saver, used for instrumentation.
+        '''
+        with self.__lock:
+            return {
+                "written": self.written,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "queued": len(self.__queued),
+            }
+
+    def flush(self) -> None:
+        '''
+            Waits until every queued annotation is written.
+        '''
+        self.__pool.waitForDone()
@@ -0,0 +1,270 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from threading import Lock
+
+from lxml import etree
+
+from libs.standalones.pascal_voc_io import PascalVocReader, PascalVocWriter, xml_path_for
+from libs.standalones.FormatReaders import FormatReaders
+
+
+@dataclass(frozen=True)
+class AnnotationSnapshot:
+    '''
+        Everything needed to write the annotation of an image, copied from the canvas
+        so the shapes can keep changing while it's being written.
+    '''
+    folder_name: str
+    filename: str
+    img_size: tuple[int, int, int]
+    local_img_path: str
+    boxes: tuple[tuple[int, int, int, int, str], ...] # (x_min, y_min, x_max, y_max, name)
+
+class StoreType(Enum):
+    voc = 0 # a Pascal VOC xml file next to every image
+    sqlite = 1 # a single SQLite database per folder
+
+    def __str__(self):
+        return self.name
+
+class AnnotationStore(ABC):
+    '''
+        Where the annotations of the images are read from and written to.
+        There's a store per folder, of the type chosen in the settings.
+
+        Usage:
+            AnnotationStore.for_image(img_path).read(img_path) -> list[tuple]\n
+            AnnotationStore.for_image(img_path).write(snapshot)
+    '''
+    __type = StoreType.voc
+    __stores: dict[str, 'AnnotationStore'] = {} # folder -> store
+    __lock = Lock()
+
+    @classmethod
+    def use(cls, store_type: StoreType) -> None:
+        '''
+            Sets the type of the stores, the stores already open are closed.
+
+            Args:
+                store_type (StoreType): The type of store to use
+        '''
+        AnnotationStore.close_all()
+        AnnotationStore.__type = store_type
+
+    @classmethod
+    def for_image(cls, img_path: str) -> 'AnnotationStore':
+        '''
+            Returns the store of the folder of the image, opening it if needed.
+
+            Args:
+                img_path (str): The path of the image
+        '''
+        folder = os.path.dirname(os.path.abspath(img_path))
+        with AnnotationStore.__lock:
+            store = AnnotationStore.__stores.get(folder)
+            if store is None:
+                if AnnotationStore.__type == StoreType.sqlite:
+                    store = SqliteStore(os.path.join(folder, SqliteStore.DB_NAME))
+                else:
+                    store = VocStore()
+                AnnotationStore.__stores[folder] = store
+            return store
+
+    @classmethod
+    def close_all(cls) -> None:
+        with AnnotationStore.__lock:
+            for store in AnnotationStore.__stores.values():
+                store.close()
+            AnnotationStore.__stores.clear()
+
+    @abstractmethod
+    def read(self, img_path: str, img_size: tuple[int, int] = (0, 0)) -> list[tuple[str, int, int, int, int]]:
+        '''
+            Returns the boxes of the image as (label, x_min, y_min, x_max, y_max) tuples.
+
+            Args:
+                img_path (str): The path of the image
+                img_size (tuple): The (width, height) of the decoded image, needed by relative formats like YOLO
+        '''
+
+    @abstractmethod
+    def write(self, snapshot: AnnotationSnapshot) -> None:
+        '''
+            Replaces the annotation of the image of the snapshot.
+
+            Args:
+                snapshot (AnnotationSnapshot): The annotation to write
+        '''
+
+    def label_counts(self, images: list[str]) -> dict[str, dict[str, int]]:
+        '''
+            Returns the amount of boxes of each label of the images the store can count
+            without reading their files, the others must be scanned.
+
+            Args:
+                images (list[str]): The paths of the images
+        '''
+        return {}
+
+    def close(self) -> None:
+        pass
+
+class VocStore(AnnotationStore):
+    '''
+        A Pascal VOC xml file next to every image, the format used by the other tools.
+        Images without one are read from the other registered formats, and saved as xml once edited.
+    '''
+    def read(self, img_path: str, img_size: tuple[int, int] = (0, 0)) -> list[tuple[str, int, int, int, int]]:
+        return FormatReaders.read(img_path, img_size)
+
+    def write(self, snapshot: AnnotationSnapshot) -> None:
+        writer = PascalVocWriter(snapshot.folder_name, snapshot.filename, snapshot.img_size,
+                                 local_img_path=snapshot.local_img_path)
+        for box in snapshot.boxes:
+            writer.add_bnd_box(*box)
+        writer.save(xml_path_for(snapshot.local_img_path))
+
+class SqliteStore(AnnotationStore):
+    '''
+        Every annotation of a folder in a single SQLite database, indexed by image and label.
+        Images that aren't in the database yet are read from their annotation files, so switching
+        stores doesn't hide the annotations made before. import_voc and export_voc move the
+        annotations between the database and the xml files, run by convert.py --import-voc and --export-voc.
+
+        Args:
+            db_path (str): The path of the database, created if it doesn't exist
+    '''
+    DB_NAME = 'annotations.sqlite'
+
+    __schema = '''
+        CREATE TABLE IF NOT EXISTS images (
+            id INTEGER PRIMARY KEY,
+            filename TEXT NOT NULL UNIQUE,
+            folder TEXT NOT NULL,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            depth INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS boxes (
+            image_id INTEGER NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            xmin INTEGER NOT NULL,
+            ymin INTEGER NOT NULL,
+            xmax INTEGER NOT NULL,
+            ymax INTEGER NOT NULL,
+            PRIMARY KEY (image_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS boxes_label ON boxes(label);
+    '''
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.__folder = os.path.dirname(os.path.abspath(db_path))
+        # Used by the saver, the label index and the GUI threads, one at a time
+        self.__lock = Lock()
+        self.__db = sqlite3.connect(db_path, check_same_thread=False)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute("PRAGMA synchronous=NORMAL")
+        self.__db.execute("PRAGMA foreign_keys=ON")
+        self.__db.executescript(SqliteStore.__schema)
+
+    def __image_id(self, img_path: str) -> int | None:
+        row = self.__db.execute("SELECT id FROM images WHERE filename = ?", (os.path.basename(img_path),)).fetchone()
+        return None if row is None else row[0]
+
+    def __contains__(self, img_path: str) -> bool:
+        with self.__lock:
+            return self.__image_id(img_path) is not None
+
+    def read(self, img_path: str, img_size: tuple[int, int] = (0, 0)) -> list[tuple[str, int, int, int, int]]:
+        with self.__lock:
+            image_id = self.__image_id(img_path)
+            if image_id is not None:
+                return self.__db.execute("SELECT label, xmin, ymin, xmax, ymax FROM boxes WHERE image_id = ? ORDER BY position",
+                                         (image_id,)).fetchall()
+        return FormatReaders.read(img_path, img_size)
+
+    def __write(self, snapshot: AnnotationSnapshot) -> None:
+        width, height, depth = snapshot.img_size
+        self.__db.execute('''INSERT INTO images (filename, folder, width, height, depth) VALUES (?, ?, ?, ?, ?)
+                             ON CONFLICT(filename) DO UPDATE SET folder = excluded.folder, width = excluded.width,
+                             height = excluded.height, depth = excluded.depth''',
+                          (snapshot.filename, snapshot.folder_name, width, height, depth))
+        image_id = self.__image_id(snapshot.filename)
+        self.__db.execute("DELETE FROM boxes WHERE image_id = ?", (image_id,))
+        self.__db.executemany("INSERT INTO boxes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              [(image_id, i, name, x_min, y_min, x_max, y_max)
+                               for i, (x_min, y_min, x_max, y_max, name) in enumerate(snapshot.boxes)])
+
+    def write(self, snapshot: AnnotationSnapshot) -> None:
+        with self.__lock, self.__db:
+            self.__write(snapshot)
+
+    def label_counts(self, images: list[str]) -> dict[str, dict[str, int]]:
+        with self.__lock:
+            rows = self.__db.execute('''SELECT images.filename, boxes.label, COUNT(boxes.label) FROM images
+                                        LEFT JOIN boxes ON boxes.image_id = images.id
+                                        GROUP BY images.id, boxes.label''').fetchall()
+        known: dict[str, dict[str, int]] = {}
+        for filename, label, count in rows:
+            file_counts = known.setdefault(filename, {})
+            if label is not None:
+                file_counts[label] = count
+        return {image: known[os.path.basename(image)] for image in images if os.path.basename(image) in known}
+
+    def import_voc(self, images: list[str]) -> int:
+        '''
+            Copies the xml annotations of the images into the database, in a single transaction.
+            Returns the amount of annotations imported.
+
+            Args:
+                images (list[str]): The paths of the images
+        '''
+        imported = 0
+        with self.__lock, self.__db:
+            for image in images:
+                xml_path = xml_path_for(image)
+                if not os.path.exists(xml_path):
+                    continue
+                try:
+                    size = etree.parse(xml_path).find('size')
+                    img_size = tuple(int(size.findtext(key, '0')) for key in ('width', 'height', 'depth')) \
+                        if size is not None else (0, 0, 3)
+                    boxes = tuple((x_min, y_min, x_max, y_max, label)
+                                  for label, x_min, y_min, x_max, y_max in PascalVocReader(xml_path).get_boxes())
+                except (etree.LxmlError, OSError, ValueError) as e:
+                    print(f"Couldn't import {xml_path}: {e}")
+                    continue
+                self.__write(AnnotationSnapshot(os.path.basename(os.path.dirname(image)), os.path.basename(image),
+                                                img_size, image, boxes))
+                imported += 1
+        return imported
+
+    def export_voc(self) -> int:
+        '''
+            Writes the annotations in the database as xml files next to their images.
+            Returns the amount of annotations exported.
+        '''
+        with self.__lock:
+            images = self.__db.execute("SELECT id, filename, folder, width, height, depth FROM images").fetchall()
+            boxes = self.__db.execute("SELECT image_id, xmin, ymin, xmax, ymax, label FROM boxes ORDER BY image_id, position").fetchall()
+
+        image_boxes: dict[int, list] = {}
+        for image_id, *box in boxes:
+            image_boxes.setdefault(image_id, []).append(tuple(box))
+
+        voc = VocStore()
+        for image_id, filename, folder, width, height, depth in images:
+            img_path = os.path.join(self.__folder, filename)
+            voc.write(AnnotationSnapshot(folder, filename, (width, height, depth), img_path,
+                                         tuple(image_boxes.get(image_id, ()))))
+        return len(images)
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__db.close()
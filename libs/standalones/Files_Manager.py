@@ -1,17 +1,27 @@
-import os
+from bisect import bisect_left, bisect_right
 
 from PyQt5.QtWidgets import QFileDialog
 from PyQt5.QtCore import pyqtSignal, QObject
 
-from libs.standalones.Utils import utils as utils
 from libs.widgets.MenuBar import MenuBar, actions, fileMenu
 from libs.handlers.keyboard.KeyHandler import KeyHandler, ActionBind
 from libs.standalones.PersistentData import PersistentData, PersistentDataType
+from libs.standalones.ImagePrefetcher import ImagePrefetcher
+from libs.standalones.LabelIndex import LabelIndex, ImageStatus
+from libs.standalones.FolderScanner import FolderScanner
+from libs.standalones.ImageList import ImageList
+from libs.standalones.FolderWatcher import FolderWatcher
+from libs.standalones.ThumbnailCache import ThumbnailCache
+from libs.standalones.FormatReaders import FormatReaders
 
 
 class Files_Manager(QObject):
     OnLoadDir = pyqtSignal(list)
+    OnFilesFound = pyqtSignal(list) # images found while the folder is being scanned, not sorted yet
     OnLoadImage = pyqtSignal(str)
+    OnAddImages = pyqtSignal(list) # indexes of the images inserted in the opened folder, ascending
+    OnRemoveImages = pyqtSignal(list) # indexes the images removed from the opened folder were at, ascending
+    OnStatusChanged = pyqtSignal(list) # images whose annotation status changed, empty if all of them did
 
     __instance = None
     @classmethod
@@ -21,54 +31,280 @@ class Files_Manager(QObject):
     def __init__(self, parent=None):
         assert Files_Manager.__instance is None, "Files_Manager is a singleton class, use Files_Manager.instance() instead"
         super().__init__(parent=parent)
-        self.__images = []
+        self.__images = ImageList()
         self.__cur_img = -1
         self.__folder_size = 0
         self.window = parent
 
         MenuBar.instance().actions_dict[actions.file][fileMenu.open].triggered.connect(self.open_folder)
+        watch_action = MenuBar.instance().actions_dict[actions.file][fileMenu.watch]
 
         kh = KeyHandler.instance()
         kh.bind_to(ActionBind.next_image, self.next_img)
         kh.bind_to(ActionBind.prev_image, self.prev_img)
+        kh.bind_to(ActionBind.next_unlabelled, self.next_unlabelled)
 
         self.__settings = PersistentData.instance()
+        self.prefetcher = ImagePrefetcher(self, self.__settings[PersistentDataType.image_cache_mb])
+        self.thumbnails = ThumbnailCache(self)
+        self.label_index = LabelIndex(self)
+        self.label_index.OnIndexed.connect(self.__on_indexed)
+        self.label_index.OnUpdated.connect(self.__on_annotation_saved)
+        self.label_index.OnAdded.connect(self.__on_images_indexed)
+        # (sort key, path) of the images without boxes, sorted like the folder
+        self.__unlabelled: list[tuple[list, str]] = []
+        self.scanner = FolderScanner(self)
+        self.scanner.OnBatch.connect(self.__on_batch)
+        self.scanner.OnScanned.connect(self.__on_scanned)
+        self.__scanning = ""
+        self.__folder = ""
+        self.watcher = FolderWatcher(self)
+        self.watcher.OnChanged.connect(self.__on_folder_changed)
+
+        watch_action.setChecked(self.__settings[PersistentDataType.watch_folder])
+        watch_action.toggled.connect(self.set_watch)
 
         Files_Manager.__instance = self
 
     def __load(self, index: int):
         self.__cur_img = index
+        self.__prefetch(index)
         self.OnLoadImage.emit(self.__images[index])
 
+    def __prefetch(self, index: int):
+        # The current image goes first, so the canvas waits for it instead of decoding it twice
+        _next = range(index, min(index + ImagePrefetcher.PREFETCH_NEXT + 1, self.__folder_size))
+        _prev = range(index - 1, max(index - ImagePrefetcher.PREFETCH_PREV - 1, -1), -1)
+        self.prefetcher.prefetch([self.__images[i] for i in [*_next, *_prev]])
+
     def open_folder(self, path):
         path = QFileDialog.getExistingDirectory(None, "Select Workfolder", \
             self.__settings[PersistentDataType.last_folder], QFileDialog.ShowDirsOnly | \
             QFileDialog.DontUseNativeDialog)
         if len(path) == 0:
             return
-        self.__images = [os.path.join(path, img) for img in os.listdir(path) if img.endswith(".jpg") or img.endswith(".png")]
-        if len(self.__images) <= 0:
+        self.load_folder(path)
+
+    def load_folder(self, path: str) -> None:
+        '''
+            Lists the images of the folder in the background, the first one is loaded once they are sorted.
+
+            Args:
+                path (str): The folder to open
+        '''
+        self.__scanning = path
+        # The annotations and images of the folder may have been edited since it was last opened
+        FormatReaders.clear()
+        self.thumbnails.clear()
+        self.scanner.scan(path)
+
+    def __on_batch(self, folder: str, images: list[str]):
+        if folder == self.__scanning:
+            self.OnFilesFound.emit(images)
+
+    def __on_scanned(self, folder: str, images: list[str], keys: list):
+        if folder != self.__scanning:
+            return
+        self.__scanning = ""
+        if len(images) <= 0:
             return
-        utils.natural_sort(self.__images, key=lambda s: s.lower())
+        self.__images = ImageList(images, keys)
         self.__folder_size = len(self.__images)
         self.__cur_img = 0
-        
-        self.OnLoadDir.emit(self.__images)
+        self.__folder = folder
+        # Nothing is known until the label index is built
+        self.__unlabelled = list(zip(self.__images.keys(), self.__images.paths()))
+        self.label_index.build(folder, self.__images.paths())
+        if self.__settings[PersistentDataType.watch_folder]:
+            self.watcher.watch(folder, self.__images.paths())
+
+        self.OnLoadDir.emit(self.__images.paths())
         self.__load(self.__cur_img)
 
-        PersistentData.instance()[PersistentDataType.last_folder] = path
+        PersistentData.instance()[PersistentDataType.last_folder] = folder
 
     def close_folder(self):
-        self.__images = []
+        self.__scanning = ""
+        self.__folder = ""
+        self.scanner.cancel()
+        self.watcher.stop()
+        self.prefetcher.clear()
+        self.thumbnails.clear()
+        FormatReaders.clear()
+        self.__images = ImageList()
+        self.__unlabelled = []
         self.__cur_img = -1
         self.__folder_size = 0
 
     def load_img(self, img: str | int):
         if type(img) == str:
-            self.__load(self.__images.index(img))
+            index = self.__images.index(img)
+            if index < 0:
+                return
+            self.__load(index)
             return
         self.__load(img)
 
+    def add_images(self, images: list[str]) -> list[int]:
+        '''
+            Inserts new images of the opened folder in their sorted position, keeping the current one.
+            Returns the indexes they were inserted at, ascending.
+
+            Args:
+                images (list[str]): The paths of the new images
+        '''
+        current = self.cur_img()
+        indexes = self.__images.add(images)
+        if not indexes:
+            return indexes
+        self.__folder_size = len(self.__images)
+        for index in indexes:
+            self.__set_labelled(self.__images[index], self.__images.keys()[index])
+        if current is not None:
+            self.__cur_img = self.__images.index(current)
+        # Their annotations may have been added with them, the status is sent once they are read
+        self.label_index.add([self.__images[index] for index in indexes])
+        self.OnAddImages.emit(indexes)
+        return indexes
+
+    def remove_images(self, images: list[str]) -> list[int]:
+        '''
+            Removes images of the opened folder. If the current image is removed
+            the one that takes its place is loaded.
+            Returns the indexes they were at, ascending.
+
+            Args:
+                images (list[str]): The paths of the removed images
+        '''
+        current = self.cur_img()
+        for image in images:
+            index = self.__images.index(image)
+            if index >= 0:
+                self.__set_labelled(image, self.__images.keys()[index], True)
+        indexes = self.__images.remove(images)
+        if not indexes:
+            return indexes
+        self.__folder_size = len(self.__images)
+        self.OnRemoveImages.emit(indexes)
+
+        if current is None:
+            return indexes
+        index = self.__images.index(current)
+        if index >= 0:
+            self.__cur_img = index
+        elif self.__folder_size > 0:
+            # The images before the removed one moved back by the amount removed before it
+            self.__load(min(self.__cur_img - sum(1 for i in indexes if i < self.__cur_img), self.__folder_size - 1))
+        else:
+            self.__cur_img = -1
+        return indexes
+
+    def __set_labelled(self, image: str, key: list, labelled: bool = None) -> None:
+        # Keeps the image in the unlabelled images if it has no boxes, a binary search instead of a walk
+        if labelled is None:
+            labelled = self.label_index.status(image)[1] > 0
+        item = (key, image)
+        i = bisect_left(self.__unlabelled, item)
+        listed = i < len(self.__unlabelled) and self.__unlabelled[i] == item
+        if labelled and listed:
+            del self.__unlabelled[i]
+        elif not labelled and not listed:
+            self.__unlabelled.insert(i, item)
+
+    def __on_indexed(self, folder: str):
+        if folder != self.__folder:
+            return
+        # In folder order, so the unlabelled images are already sorted
+        paths = self.__images.paths()
+        self.__unlabelled = [(key, image) for key, image, unlabelled
+                             in zip(self.__images.keys(), paths, self.label_index.unlabelled(paths)) if unlabelled]
+        self.OnStatusChanged.emit([])
+
+    def __on_annotation_saved(self, image: str):
+        index = self.__images.index(image)
+        if index < 0:
+            return
+        self.__set_labelled(image, self.__images.keys()[index])
+        self.OnStatusChanged.emit([image])
+
+    def __on_images_indexed(self, images: list[str]):
+        changed = []
+        for image in images:
+            index = self.__images.index(image)
+            if index >= 0:
+                self.__set_labelled(image, self.__images.keys()[index])
+                changed.append(image)
+        if changed:
+            self.OnStatusChanged.emit(changed)
+
+    def reindex(self) -> None:
+        '''
+            Builds the label index of the opened folder again, when the annotations are read from another store.
+        '''
+        if self.__folder:
+            self.label_index.build(self.__folder, self.__images.paths())
+
+    def next_unlabelled(self) -> str | None:
+        '''
+            Loads the next image without boxes after the current one, starting over from the first one.
+            Returns the image loaded, None if every image has boxes.
+        '''
+        if not self.__unlabelled:
+            return None
+        current = self.cur_img()
+        i = 0
+        if current is not None:
+            i = bisect_right(self.__unlabelled, (self.__images.keys()[self.__cur_img], current))
+        _, image = self.__unlabelled[i % len(self.__unlabelled)]
+        if image == current:
+            return None
+        self.__load(self.__images.index(image))
+        return image
+
+    def status(self, image: str) -> tuple[ImageStatus, int, bool]:
+        '''
+            Returns the annotation status of the image, its amount of boxes and if it was saved since the app was opened.
+
+            Args:
+                image (str): The path of the image
+        '''
+        return self.label_index.status(image)
+
+    def progress(self) -> dict[str, int]:
+        '''
+            Returns the amount of images of the folder, with boxes, without boxes and saved since the app was opened.
+        '''
+        unlabelled = len(self.__unlabelled)
+        return {"images": self.__folder_size, "labelled": self.__folder_size - unlabelled,
+                "unlabelled": unlabelled, "modified": self.label_index.modified_count(self.__folder)}
+
+    def index_of(self, image: str) -> int:
+        '''
+            Returns the index of the image in the folder, -1 if it isn't in it.
+        '''
+        return self.__images.index(image)
+
+    def __on_folder_changed(self, added: list[str], removed: list[str]):
+        self.thumbnails.forget(added + removed)
+        self.remove_images(removed)
+        self.add_images(added)
+
+    def set_watch(self, watch: bool) -> None:
+        '''
+            Starts or stops updating the images of the opened folder when other programs change it.
+
+            Args:
+                watch (bool): True to watch the folder
+        '''
+        self.__settings[PersistentDataType.watch_folder] = watch
+        if not watch:
+            self.watcher.stop()
+        elif self.__folder and not self.watcher.watching():
+            # The images changed while not watching aren't known, the folder is listed again and
+            # only the difference is added and removed, so the current image stays loaded
+            self.watcher.watch(self.__folder, self.__images.paths())
+            self.watcher.refresh()
+
     def next_img(self) -> str | None:
         if self.__cur_img + 1 >= self.__folder_size:
             return None
@@ -94,5 +330,16 @@ class Files_Manager(QObject):
     def img_index(self):
         return self.__cur_img
 
-    def imgs(self) -> list[str]:
-        return self.__images
\ No newline at end of file
+    def imgs(self, label: str = None) -> list[str]:
+        '''
+            Returns the images of the folder, only the ones with a box of 'label' if given.
+            'any' returns the images with any box and 'none' the ones without boxes.
+            Doesn't wait for the label index, the images not indexed yet are left out and
+            OnStatusChanged is emitted with an empty list once it's built.
+
+            Args:
+                label (str): The label to filter the images by
+        '''
+        if label is None:
+            return self.__images.paths()
+        return self.label_index.filter(self.__images.paths(), label)
\ No newline at end of file
@@ -0,0 +1,178 @@
+import os
+import json
+import hashlib
+from time import time
+from threading import Lock, Event
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from libs.standalones.Utils import utils
+
+
+IMAGE_EXTS = ('.jpg', '.png')
+
+def save_folder() -> str:
+    return './Settings/FolderManifest'
+
+def is_image(name: str) -> bool:
+    return name.endswith(IMAGE_EXTS)
+
+class ScanFolderJob(QRunnable):
+    def __init__(self, scanner: 'FolderScanner', folder: str):
+        super().__init__()
+        self.scanner = scanner
+        self.folder = folder
+
+    def run(self):
+        self.scanner._scan(self.folder)
+
+class FolderScanner(QObject):
+    '''
+        Lists the images of a folder in the background with os.scandir, sending them in batches
+        as they are found and the whole naturally sorted list at the end.
+        The images are saved in a manifest in the settings folder with their sort key, if the folder
+        didn't change since then it isn't listed again, else only the new images get a sort key computed.
+        The files aren't stat'ed, only the folder is, so slow network folders are listed without a request per image.
+
+        Usage:
+            FolderScanner.instance().scan(folder)\n
+            FolderScanner.instance().OnScanned.connect(slot) # slot(folder, images, keys)
+    '''
+    OnBatch = pyqtSignal(str, list) # folder, images found since the last batch
+    OnScanned = pyqtSignal(str, list, list) # folder, every image sorted, their sort keys
+
+    BATCH_SIZE = 2000
+    # Folders with coarse timestamps may not change their mtime when a file is added right after
+    # the scan, so the manifest of a folder changed this close to its scan isn't trusted
+    MTIME_MARGIN = 2
+    MANIFEST_VERSION = 2 # manifests of another version are listed again
+
+    __instance = None
+
+    @classmethod
+    def instance(cls) -> 'FolderScanner':
+        return cls.__instance
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.__lock = Lock()
+        self.__ready = Event()
+        self.__ready.set()
+        self.__folder = ""
+
+        self.listed = 0 # entries read from the folder by the last scan, 0 if the manifest was up to date
+        self.reused = 0 # images of the last scan found in the manifest
+
+        FolderScanner.__instance = self
+
+    @staticmethod
+    def manifest_path(folder: str) -> str:
+        name = hashlib.sha1(os.path.abspath(folder).encode('utf-8')).hexdigest()
+        return os.path.join(save_folder(), f"{name}.json")
+
+    def __load_manifest(self, folder: str) -> dict:
+        try:
+            with open(FolderScanner.manifest_path(folder), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def __save_manifest(self, folder: str, manifest: dict) -> None:
+        os.makedirs(save_folder(), exist_ok=True)
+        path = FolderScanner.manifest_path(folder)
+        try:
+            # dumps uses the C encoder, dump encodes in Python and is a lot slower for big folders
+            with open(path + '.tmp', 'w') as f:
+                f.write(json.dumps(manifest))
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"Couldn't save the manifest of {folder}: {e}")
+
+    def __cancelled(self, folder: str) -> bool:
+        with self.__lock:
+            return folder != self.__folder
+
+    def _scan(self, folder: str) -> list[str]:
+        t0 = time()
+        manifest = self.__load_manifest(folder)
+        if manifest.get("version") != FolderScanner.MANIFEST_VERSION:
+            manifest = {}
+        # [name, sort key] of every image, sorted
+        entries: list[list] = manifest.get("entries", [])
+        try:
+            dir_mtime = os.stat(folder).st_mtime_ns
+        except OSError as e:
+            print(f"Couldn't open {folder}: {e}")
+            dir_mtime = None
+
+        listed = 0
+        reused = 0
+        if dir_mtime is not None and dir_mtime == manifest.get("mtime_ns") and manifest.get("trusted", False):
+            found = entries
+            reused = len(entries)
+        else:
+            known = {entry[0]: entry[1] for entry in entries}
+            found: list[list] = []
+            batch: list[str] = []
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        listed += 1
+                        if not is_image(entry.name):
+                            continue
+                        sort_key = known.get(entry.name)
+                        if sort_key is None:
+                            sort_key = utils.natural_key(entry.name.lower())
+                        else:
+                            reused += 1
+                        found.append([entry.name, sort_key])
+
+                        batch.append(entry.path)
+                        if len(batch) >= FolderScanner.BATCH_SIZE:
+                            if self.__cancelled(folder):
+                                return []
+                            self.OnBatch.emit(folder, batch)
+                            batch = []
+            except OSError as e:
+                print(f"Couldn't list {folder}: {e}")
+            if batch and not self.__cancelled(folder):
+                self.OnBatch.emit(folder, batch)
+            found.sort(key=lambda entry: entry[1])
+
+            if dir_mtime is not None:
+                self.__save_manifest(folder, {"version": FolderScanner.MANIFEST_VERSION, "mtime_ns": dir_mtime,
+                                              "trusted": dir_mtime < (t0 - FolderScanner.MTIME_MARGIN) * 1e9,
+                                              "entries": found})
+
+        images = [os.path.join(folder, entry[0]) for entry in found]
+        print(f"Scanned {folder} in {time() - t0:.3f}s: {len(images)} images, {listed} entries listed, {reused} from the manifest")
+
+        with self.__lock:
+            # Another folder was opened while scanning, its own job sets the scanner ready
+            if folder != self.__folder:
+                return images
+            self.listed = listed
+            self.reused = reused
+        self.OnScanned.emit(folder, images, [entry[1] for entry in found])
+        self.__ready.set()
+        return images
+
+    def scan(self, folder: str) -> None:
+        '''
+            Lists the images of the folder in the background, the scan of the last folder is cancelled.
+
+            Args:
+                folder (str): The folder to scan
+        '''
+        with self.__lock:
+            self.__folder = folder
+        self.__ready.clear()
+        QThreadPool.globalInstance().start(ScanFolderJob(self, folder))
+
+    def cancel(self) -> None:
+        with self.__lock:
+            self.__folder = ""
+        self.__ready.set()
+
+    def wait(self) -> None:
+        self.__ready.wait()
@@ -0,0 +1,141 @@
+import os
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, pyqtSignal
+
+from libs.standalones.FolderScanner import is_image
+
+
+def list_images(folder: str) -> set[str] | None:
+    '''
+        Returns the names of the images of the folder, None if it can't be listed.
+        Only the names are read, the entries aren't stat'ed.
+
+        Args:
+            folder (str): The folder to list
+    '''
+    try:
+        with os.scandir(folder) as it:
+            return {entry.name for entry in it if is_image(entry.name)}
+    except OSError as e:
+        print(f"Couldn't list {folder}: {e}")
+        return None
+
+class DiffJob(QRunnable):
+    def __init__(self, watcher: 'FolderWatcher', folder: str, known: set[str]):
+        super().__init__()
+        self.watcher = watcher
+        self.folder = folder
+        self.known = known
+
+    def run(self):
+        names = list_images(self.folder)
+        if names is None:
+            self.watcher._Listed.emit(self.folder, [], [])
+            return
+        self.watcher._Listed.emit(self.folder, sorted(names - self.known), sorted(self.known - names))
+
+class FolderWatcher(QObject):
+    '''
+        Watches the opened folder for images added or removed by other programs.
+        The changes are collected for a moment, then the folder is listed in the background
+        and compared with the known images, so only the difference is sent.
+
+        Usage:
+            FolderWatcher.instance().watch(folder, images)\n
+            FolderWatcher.instance().OnChanged.connect(slot) # slot(added, removed)
+    '''
+    OnChanged = pyqtSignal(list, list) # paths of the images added, paths of the images removed
+    _Listed = pyqtSignal(str, list, list) # sent by the diff job, folder, names added, names removed
+
+    DEBOUNCE_MS = 500 # a program copying many files changes the folder many times
+
+    __instance = None
+
+    @classmethod
+    def instance(cls) -> 'FolderWatcher':
+        return cls.__instance
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.__watcher = QFileSystemWatcher(self)
+        self.__watcher.directoryChanged.connect(self.__changed)
+        self.__timer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(FolderWatcher.DEBOUNCE_MS)
+        self.__timer.timeout.connect(self.__diff)
+        self._Listed.connect(self.__listed)
+
+        self.__folder = ""
+        self.__known: set[str] = set() # names of the images of the folder
+        self.__listing = False
+        self.__dirty = False # changed while being listed
+
+        FolderWatcher.__instance = self
+
+    def watch(self, folder: str, images: list[str]) -> None:
+        '''
+            Starts watching the folder instead of the last one.
+
+            Args:
+                folder (str): The folder to watch
+                images (list[str]): The paths of the images already known
+        '''
+        self.stop()
+        if not self.__watcher.addPath(folder):
+            print(f"Couldn't watch {folder}")
+            return
+        self.__folder = folder
+        self.__known = {os.path.basename(image) for image in images}
+
+    def stop(self) -> None:
+        if self.__folder:
+            self.__watcher.removePath(self.__folder)
+        self.__timer.stop()
+        self.__folder = ""
+        self.__known = set()
+        self.__dirty = False
+
+    def watching(self) -> str:
+        return self.__folder
+
+    def refresh(self) -> None:
+        '''
+            Lists the watched folder now instead of waiting for a change, used when the changes
+            made while not watching aren't known. The difference is sent like any other change.
+        '''
+        if not self.__folder:
+            return
+        if self.__listing:
+            self.__dirty = True
+            return
+        self.__timer.stop()
+        self.__diff()
+
+    def __changed(self, folder: str):
+        if folder != self.__folder:
+            return
+        if self.__listing:
+            self.__dirty = True
+            return
+        self.__timer.start()
+
+    def __diff(self):
+        if not self.__folder:
+            return
+        self.__listing = True
+        self.__dirty = False
+        QThreadPool.globalInstance().start(DiffJob(self, self.__folder, set(self.__known)))
+
+    def __listed(self, folder: str, added: list[str], removed: list[str]):
+        self.__listing = False
+        if self.__dirty and self.__folder:
+            self.__timer.start()
+        # Stopped or another folder was opened while listing
+        if folder != self.__folder:
+            return
+
+        self.__known.difference_update(removed)
+        self.__known.update(added)
+        if added or removed:
+            self.OnChanged.emit([os.path.join(folder, name) for name in added],
+                                [os.path.join(folder, name) for name in removed])
@@ -0,0 +1,227 @@
+import os
+from abc import ABC, abstractmethod
+
+from libs.standalones.MyException import InvalidInstantiation
+from libs.standalones.pascal_voc_io import PascalVocReader, xml_path_for
+from libs.standalones.yolo_io import TXT_EXT, CLASSES_FILE, read_yolo, read_classes
+from libs.standalones.coco_io import JSON_EXT, CocoIndex
+
+
+class FormatReader(ABC):
+    '''
+        A format the boxes of an image can be read from, found next to the image.
+    '''
+    name = ""
+
+    @abstractmethod
+    def has_annotation(self, img_path: str) -> bool:
+        '''
+            Returns true if the image has an annotation in this format.
+
+            Args:
+                img_path (str): The path of the image
+        '''
+
+    @abstractmethod
+    def read(self, img_path: str, img_size: tuple[int, int]) -> list[tuple[str, int, int, int, int]]:
+        '''
+            Returns the boxes of the image as (label, x_min, y_min, x_max, y_max) tuples in pixels.
+
+            Args:
+                img_path (str): The path of the image
+                img_size (tuple): The (width, height) of the decoded image
+        '''
+
+    def clear(self) -> None:
+        '''
+            Forgets what the format cached about the folders read, their files may have changed.
+        '''
+        pass
+
+class VocFormat(FormatReader):
+    '''
+        A Pascal VOC xml file next to the image.
+    '''
+    name = "voc"
+
+    def has_annotation(self, img_path: str) -> bool:
+        return os.path.exists(xml_path_for(img_path))
+
+    def read(self, img_path: str, img_size: tuple[int, int]) -> list[tuple[str, int, int, int, int]]:
+        return PascalVocReader(img_path).get_boxes()
+
+class YoloFormat(FormatReader):
+    '''
+        A YOLO txt file next to the image or in the 'labels' folder next to its 'images' folder,
+        with the class names in a classes.txt file of that folder or its parent.
+    '''
+    name = "yolo"
+
+    def __init__(self):
+        self.__classes: dict[str, list[str] | None] = {} # folder of the txt files -> class names
+
+    @staticmethod
+    def txt_paths(img_path: str) -> list[str]:
+        folder, filename = os.path.split(os.path.abspath(img_path))
+        txt_name = os.path.splitext(filename)[0] + TXT_EXT
+        paths = [os.path.join(folder, txt_name)]
+        parent, images = os.path.split(folder)
+        if images == 'images':
+            paths.append(os.path.join(parent, 'labels', txt_name))
+        return paths
+
+    def __txt_path(self, img_path: str) -> str | None:
+        for path in YoloFormat.txt_paths(img_path):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def classes(self, folder: str) -> list[str] | None:
+        if folder not in self.__classes:
+            self.__classes[folder] = None
+            for classes_path in (os.path.join(folder, CLASSES_FILE), os.path.join(os.path.dirname(folder), CLASSES_FILE)):
+                if os.path.exists(classes_path):
+                    self.__classes[folder] = read_classes(classes_path)
+                    break
+        return self.__classes[folder]
+
+    def has_annotation(self, img_path: str) -> bool:
+        return self.__txt_path(img_path) is not None
+
+    def read(self, img_path: str, img_size: tuple[int, int]) -> list[tuple[str, int, int, int, int]]:
+        txt_path = self.__txt_path(img_path)
+        if txt_path is None:
+            return []
+        if img_size[0] <= 0 or img_size[1] <= 0:
+            print(f"Couldn't read {txt_path}, the size of the image is unknown")
+            return []
+        return read_yolo(txt_path, img_size, self.classes(os.path.dirname(txt_path)))
+
+    def clear(self) -> None:
+        self.__classes.clear()
+
+class CocoFormat(FormatReader):
+    '''
+        A COCO json file in the folder of the image or its parent. Every json file of a folder
+        is parsed once and indexed by image file name, later images are a dict lookup.
+        The json files of a folder are parsed again when one of them is edited.
+    '''
+    name = "coco"
+
+    def __init__(self):
+        self.__indexes: dict[str, list[CocoIndex]] = {} # folder -> datasets found in it
+        self.__mtimes: dict[str, int] = {} # json path -> mtime it was parsed at
+
+    @staticmethod
+    def __mtime(json_path: str) -> int:
+        try:
+            return os.stat(json_path).st_mtime_ns
+        except OSError:
+            return -1
+
+    def __folder_indexes(self, folder: str) -> list[CocoIndex]:
+        indexes = self.__indexes.get(folder)
+        if indexes is not None:
+            if all(CocoFormat.__mtime(index.json_path) == self.__mtimes.get(index.json_path) for index in indexes):
+                return indexes
+            for index in indexes:
+                self.__mtimes.pop(index.json_path, None)
+        indexes = []
+        try:
+            names = sorted(name for name in os.listdir(folder) if name.endswith(JSON_EXT))
+        except OSError:
+            names = []
+        for name in names:
+            json_path = os.path.join(folder, name)
+            if not CocoIndex.is_coco(json_path):
+                continue
+            try:
+                mtime = CocoFormat.__mtime(json_path)
+                indexes.append(CocoIndex(json_path))
+                self.__mtimes[json_path] = mtime
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Couldn't read {json_path}: {e}")
+        self.__indexes[folder] = indexes
+        return indexes
+
+    def __index(self, img_path: str) -> CocoIndex | None:
+        folder = os.path.dirname(os.path.abspath(img_path))
+        for search in (folder, os.path.dirname(folder)):
+            for index in self.__folder_indexes(search):
+                if img_path in index:
+                    return index
+        return None
+
+    def has_annotation(self, img_path: str) -> bool:
+        return self.__index(img_path) is not None
+
+    def read(self, img_path: str, img_size: tuple[int, int]) -> list[tuple[str, int, int, int, int]]:
+        index = self.__index(img_path)
+        return [] if index is None else index.get(img_path)
+
+    def clear(self) -> None:
+        self.__indexes.clear()
+        self.__mtimes.clear()
+
+class FormatReaders:
+    '''
+        A data only class, the registry of the formats the annotations are read from.
+        The first registered format with an annotation of the image is used, Pascal VOC first
+        since the edited annotations are saved in it.
+
+        Usage:
+            FormatReaders.register(reader)\n
+            FormatReaders.read(img_path, img_size) -> list[tuple]
+    '''
+    __readers: list[FormatReader] = [VocFormat(), YoloFormat(), CocoFormat()]
+
+    def __new__(cls: type['FormatReaders']) -> 'FormatReaders':
+        raise InvalidInstantiation("Tried to instantiate 'FormatReaders' class, a data only class.")
+
+    @staticmethod
+    def register(reader: FormatReader) -> None:
+        '''
+            Adds a format, read when none of the formats registered before has an annotation.
+
+            Args:
+                reader (FormatReader): The reader of the format
+        '''
+        FormatReaders.__readers.append(reader)
+
+    @staticmethod
+    def readers() -> list[FormatReader]:
+        return list(FormatReaders.__readers)
+
+    @staticmethod
+    def clear() -> None:
+        '''
+            Clears the caches of the formats, done when a folder is opened or closed.
+        '''
+        for reader in FormatReaders.__readers:
+            reader.clear()
+
+    @staticmethod
+    def reader_for(img_path: str) -> FormatReader | None:
+        '''
+            Returns the reader of the first format with an annotation of the image, None if there's none.
+
+            Args:
+                img_path (str): The path of the image
+        '''
+        for reader in FormatReaders.__readers:
+            if reader.has_annotation(img_path):
+                return reader
+        return None
+
+    @staticmethod
+    def read(img_path: str, img_size: tuple[int, int]) -> list[tuple[str, int, int, int, int]]:
+        '''
+            Returns the boxes of the image as (label, x_min, y_min, x_max, y_max) tuples,
+            an empty list if it isn't annotated in any format.
+
+            Args:
+                img_path (str): The path of the image
+                img_size (tuple): The (width, height) of the decoded image
+        '''
+        reader = FormatReaders.reader_for(img_path)
+        return [] if reader is None else reader.read(img_path, img_size)
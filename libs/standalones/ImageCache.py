@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable
+
+from PyQt5.QtGui import QImage
+
+
+class ImageCache:
+    '''
+        LRU cache of decoded images bounded by memory instead of entry count.
+        Each image is accounted as width * height * depth bytes, the least recently
+        used images are evicted when the budget is exceeded.
+
+        Args:
+            budget_mb (float): The memory budget of the cache in MB
+    '''
+    def __init__(self, budget_mb: float):
+        self.__images: OrderedDict[Hashable, QImage] = OrderedDict()
+        self.__budget = ImageCache.__to_bytes(budget_mb)
+        self.__used = 0
+        self.__lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def __to_bytes(mb: float) -> int:
+        return int(mb * 1024 * 1024)
+
+    @staticmethod
+    def image_bytes(image: QImage) -> int:
+        '''
+            Returns the memory used by the decoded image in bytes.
+
+            Args:
+                image (QImage): The image to account
+        '''
+        return image.width() * image.height() * image.depth() // 8
+
+    def __evict(self) -> None:
+        while self.__used > self.__budget and len(self.__images) > 0:
+            _, image = self.__images.popitem(last=False)
+            self.__used -= ImageCache.image_bytes(image)
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> QImage | None:
+        '''
+            Returns the cached image and marks it as the most recently used, None if it isn't cached.
+
+            Args:
+                key (Hashable): The key of the image
+        '''
+        with self.__lock:
+            image = self.__images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__images.move_to_end(key)
+            return image
+
+    def peek(self, key: Hashable) -> QImage | None:
+        '''
+            Returns the cached image without counting a hit or a miss or marking it as used,
+            None if it isn't cached.
+
+            Args:
+                key (Hashable): The key of the image
+        '''
+        with self.__lock:
+            return self.__images.get(key)
+
+    def put(self, key: Hashable, image: QImage) -> None:
+        '''
+            Stores the image, evicting the least recently used ones if the budget is exceeded.
+            Images bigger than the whole budget are not stored.
+
+            Args:
+                key (Hashable): The key of the image
+                image (QImage): The decoded image
+        '''
+        size = ImageCache.image_bytes(image)
+        if size > self.__budget:
+            return
+
+        with self.__lock:
+            old = self.__images.pop(key, None)
+            if old is not None:
+                self.__used -= ImageCache.image_bytes(old)
+            self.__images[key] = image
+            self.__used += size
+            self.__evict()
+
+    def set_budget(self, budget_mb: float) -> None:
+        with self.__lock:
+            self.__budget = ImageCache.__to_bytes(budget_mb)
+            self.__evict()
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__images.clear()
+            self.__used = 0
+
+    def used_bytes(self) -> int:
+        return self.__used
+
+    def budget_bytes(self) -> int:
+        return self.__budget
+
+    def stats(self) -> dict[str, int]:
+        '''
+            Returns the counters of the cache, used for instrumentation.
+        '''
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.__images),
+                "used_bytes": self.__used,
+                "budget_bytes": self.__budget,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.__lock:
+            return key in self.__images
+
+    def __len__(self) -> int:
+        return len(self.__images)
@@ -0,0 +1,123 @@
+import os
+from bisect import bisect_right
+
+from libs.standalones.Utils import utils
+
+
+class ImageList:
+    '''
+        The images of the opened folder in natural order, with their sort keys computed once
+        and a path -> index dict, so finding an image is a dict lookup and a new image is
+        inserted with a binary search instead of sorting the folder again.
+
+        Usage:
+            images = ImageList(paths, keys)\n
+            images.index(path) -> int\n
+            images.add(new_paths) -> list[int]
+
+        Args:
+            paths (list[str]): The paths of the images, sorted
+            keys (list): Their sort keys, computed if None
+    '''
+    MERGE_MIN = 64 # from this amount of new images they are merged in a single pass instead of inserted one by one
+
+    def __init__(self, paths: list[str] = None, keys: list = None):
+        self.reset(paths or [], keys)
+
+    @staticmethod
+    def sort_key(path: str) -> list[str | int]:
+        return utils.natural_key(os.path.basename(path).lower())
+
+    def reset(self, paths: list[str], keys: list = None) -> None:
+        '''
+            Replaces the images, they must already be sorted.
+
+            Args:
+                paths (list[str]): The paths of the images, sorted
+                keys (list): Their sort keys, computed if None
+        '''
+        self.__paths = list(paths)
+        self.__keys = list(keys) if keys is not None else [ImageList.sort_key(path) for path in self.__paths]
+        assert len(self.__keys) == len(self.__paths), "There must be a key per image"
+        self.__indexes: dict[str, int] = {}
+        self.__valid = 0 # the indexes of the images before this position are up to date
+
+    def __len__(self) -> int:
+        return len(self.__paths)
+
+    def __getitem__(self, index: int) -> str:
+        return self.__paths[index]
+
+    def __contains__(self, path: str) -> bool:
+        return self.index(path) >= 0
+
+    def paths(self) -> list[str]:
+        return self.__paths
+
+    def keys(self) -> list:
+        return self.__keys
+
+    def __update_indexes(self) -> None:
+        # Inserting shifts the images after it, their indexes are updated once when needed
+        for i in range(self.__valid, len(self.__paths)):
+            self.__indexes[self.__paths[i]] = i
+        self.__valid = len(self.__paths)
+
+    def index(self, path: str) -> int:
+        '''
+            Returns the index of the image, -1 if it isn't in the list.
+
+            Args:
+                path (str): The path of the image
+        '''
+        if self.__valid < len(self.__paths):
+            self.__update_indexes()
+        return self.__indexes.get(path, -1)
+
+    def add(self, paths: list[str]) -> list[int]:
+        '''
+            Inserts the images that aren't in the list yet in their sorted position.
+            Returns the indexes they ended up at, ascending.
+
+            Args:
+                paths (list[str]): The paths of the images
+        '''
+        new = sorted(dict.fromkeys(path for path in paths if path not in self), key=ImageList.sort_key)
+        if not new:
+            return []
+
+        if len(new) >= ImageList.MERGE_MIN:
+            # Both lists are sorted, so sorting them together is a single merge of two runs
+            merged = sorted(zip(self.__keys + [ImageList.sort_key(path) for path in new], self.__paths + new),
+                            key=lambda item: item[0])
+            self.__keys = [key for key, _ in merged]
+            self.__paths = [path for _, path in merged]
+            self.__valid = 0
+        else:
+            for path in new:
+                key = ImageList.sort_key(path)
+                i = bisect_right(self.__keys, key)
+                self.__keys.insert(i, key)
+                self.__paths.insert(i, path)
+                self.__valid = min(self.__valid, i)
+        return [self.index(path) for path in new]
+
+    def remove(self, paths: list[str]) -> list[int]:
+        '''
+            Removes the images that are in the list.
+            Returns the indexes they were at before being removed, ascending.
+
+            Args:
+                paths (list[str]): The paths of the images
+        '''
+        indexes = sorted({i for i in (self.index(path) for path in paths) if i >= 0})
+        if not indexes:
+            return []
+
+        for i in indexes:
+            del self.__indexes[self.__paths[i]]
+        removed = set(indexes)
+        self.__keys = [key for i, key in enumerate(self.__keys) if i not in removed]
+        self.__paths = [path for i, path in enumerate(self.__paths) if i not in removed]
+        self.__valid = indexes[0]
+        return indexes
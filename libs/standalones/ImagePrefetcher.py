@@ -0,0 +1,168 @@
+import os
+from threading import Lock, Event
+
+from PyQt5.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QImageIOHandler
+
+from libs.standalones.ImageCache import ImageCache
+
+
+PREVIEW_FORMATS = (b'jpeg', b'jpg') # formats decoding a reduced resolution faster than the full one
+PREVIEW_MIN_PIXELS = 8_000_000 # smaller images are decoded fast enough at full resolution
+
+def decode_image(path: str) -> QImage:
+    '''
+        Reads and decodes the image at 'path', returns a null QImage if the file can't be read.
+        The file is read by Qt while decoding, so its encoded bytes are never copied into a Python bytes object.
+
+        Args:
+            path (str): The path of the image
+    '''
+    reader = QImageReader(path)
+    # Like QImage.fromData, images with the wrong extension are still decoded
+    reader.setDecideFormatFromContent(True)
+    image = reader.read()
+    if image.isNull():
+        print(f"Couldn't read {path}: {reader.errorString()}")
+    return image
+
+def decode_preview(path: str, max_size: QSize) -> tuple[QImage, QSize]:
+    '''
+        Decodes the image at 'path' at a resolution fitting in 'max_size', returns it with the size
+        of the full image. Only done for big images in formats decoding scaled images faster,
+        like JPEG which skips the detail of its blocks, else returns a null QImage.
+
+        Args:
+            path (str): The path of the image
+            max_size (QSize): The size the preview must fit in
+    '''
+    reader = QImageReader(path)
+    reader.setDecideFormatFromContent(True)
+    size = reader.size()
+    if not size.isValid() or max_size.isEmpty():
+        return QImage(), size
+    if bytes(reader.format()).lower() not in PREVIEW_FORMATS or not reader.supportsOption(QImageIOHandler.ScaledSize):
+        return QImage(), size
+    preview_size = size.scaled(max_size, Qt.KeepAspectRatio)
+    # A preview of more than half the width isn't decoded faster enough to be worth a second decode
+    if size.width() * size.height() < PREVIEW_MIN_PIXELS or preview_size.width() * 2 > size.width():
+        return QImage(), size
+
+    reader.setScaledSize(preview_size)
+    image = reader.read()
+    if image.isNull():
+        print(f"Couldn't read {path}: {reader.errorString()}")
+    return image, size
+
+class DecodeJob(QRunnable):
+    def __init__(self, prefetcher: 'ImagePrefetcher', key: tuple[str, int]):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.key = key
+
+    def run(self):
+        self.prefetcher._decode(self.key)
+
+class ImagePrefetcher(QObject):
+    '''
+        Decodes the images around the current one in a worker pool, so flipping
+        images is a cache hit instead of a disk read plus a decode.
+        The decoded images are kept in an ImageCache keyed by path and mtime.
+
+        Usage:
+            ImagePrefetcher.instance().prefetch(paths)\n
+            ImagePrefetcher.instance().get(path) -> QImage
+    '''
+    # The path and image decoded by the pool, sent even if the image was too big to be cached
+    OnDecoded = pyqtSignal(str, QImage)
+
+    PREFETCH_NEXT = 3 # amount of images decoded ahead of the current one
+    PREFETCH_PREV = 1 # amount of images decoded behind the current one
+    MAX_THREADS = 2
+
+    __instance = None
+
+    @classmethod
+    def instance(cls) -> 'ImagePrefetcher':
+        return cls.__instance
+
+    def __init__(self, parent: QObject = None, budget_mb: float = 512):
+        super().__init__(parent)
+        self.cache = ImageCache(budget_mb)
+        self.__pending: dict[tuple[str, int], Event] = {} # images being decoded by the pool
+        self.__lock = Lock()
+
+        self.__pool = QThreadPool(self)
+        self.__pool.setMaxThreadCount(ImagePrefetcher.MAX_THREADS)
+
+        ImagePrefetcher.__instance = self
+
+    @staticmethod
+    def __key(path: str) -> tuple[str, int]:
+        try:
+            return (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return (path, -1)
+
+    def _decode(self, key: tuple[str, int]) -> None:
+        image = decode_image(key[0])
+        if not image.isNull():
+            self.cache.put(key, image)
+
+        with self.__lock:
+            event = self.__pending.pop(key, None)
+        if event is not None:
+            event.set()
+        self.OnDecoded.emit(key[0], image)
+
+    def prefetch(self, paths: list[str], priority: int = 0) -> None:
+        '''
+            Schedules the decoding of the images that aren't cached or already being decoded.
+
+            Args:
+                paths (list[str]): The paths to decode, in order of priority
+                priority (int): Jobs of a higher priority run before the ones already queued
+        '''
+        for path in paths:
+            key = self.__key(path)
+            with self.__lock:
+                if key in self.__pending or key in self.cache:
+                    continue
+                self.__pending[key] = Event()
+            self.__pool.start(DecodeJob(self, key), priority)
+
+    def get(self, path: str) -> QImage:
+        '''
+            Returns the decoded image, waits for it if it's being prefetched and
+            decodes it in the calling thread if it isn't cached.
+
+            Args:
+                path (str): The path of the image
+        '''
+        key = self.__key(path)
+        with self.__lock:
+            event = self.__pending.get(key)
+        if event is not None:
+            event.wait()
+
+        image = self.cache.get(key)
+        if image is not None:
+            return image
+
+        image = decode_image(path)
+        if not image.isNull():
+            self.cache.put(key, image)
+        return image
+
+    def cached(self, path: str) -> QImage | None:
+        '''
+            Returns the decoded image if it's cached, without waiting or decoding it.
+            Not counted in the statistics of the cache, the image is expected to be read with get.
+
+            Args:
+                path (str): The path of the image
+        '''
+        return self.cache.peek(self.__key(path))
+
+    def clear(self) -> None:
+        self.cache.clear()
@@ -0,0 +1,348 @@
+import os
+import json
+import hashlib
+import multiprocessing
+from enum import Enum
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock, Event
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from libs.standalones.pascal_voc_io import iter_labels, xml_path_for
+from libs.standalones.AnnotationStore import AnnotationStore
+
+
+def save_folder() -> str:
+    return './Settings/LabelIndex'
+
+def scan_files(xml_paths: list[str]) -> list[tuple[str, int, int, dict[str, int]]]:
+    '''
+        Counts the labels of the annotations, runs in the worker processes of the scan.
+        Returns (xml_path, mtime_ns, size, counts) for every file, missing files aren't returned.
+
+        Args:
+            xml_paths (list[str]): The annotations to read
+    '''
+    scanned = []
+    for xml_path in xml_paths:
+        try:
+            stat = os.stat(xml_path)
+        except OSError:
+            continue
+        try:
+            counts = dict(Counter(iter_labels(xml_path)))
+        except Exception as e:
+            print(f"Couldn't read {xml_path}: {e}")
+            counts = {}
+        scanned.append((xml_path, stat.st_mtime_ns, stat.st_size, counts))
+    return scanned
+
+class ImageStatus(Enum):
+    unknown = 0 # not indexed yet
+    not_annotated = 1 # no annotation file
+    empty = 2 # annotated without boxes
+    labelled = 3 # annotated with boxes
+
+    def __str__(self):
+        return self.name
+
+class ScanJob(QRunnable):
+    def __init__(self, index: 'LabelIndex', folder: str, images: list[str]):
+        super().__init__()
+        self.index = index
+        self.folder = folder
+        self.images = images
+
+    def run(self):
+        self.index._build(self.folder, self.images)
+
+class AddJob(QRunnable):
+    def __init__(self, index: 'LabelIndex', folder: str, images: list[str]):
+        super().__init__()
+        self.index = index
+        self.folder = folder
+        self.images = images
+
+    def run(self):
+        self.index._add(self.folder, self.images)
+
+class LabelIndex(QObject):
+    '''
+        Label counts of every annotation of the opened folder, used to filter the images by label.
+        The annotations are read by a pool of processes and the counts are cached in the settings
+        folder by mtime and size, so opening the folder again only reads the files that changed.
+
+        Usage:
+            LabelIndex.instance().build(folder, images)\n
+            LabelIndex.instance().add(images) # images added to the folder since
+            LabelIndex.instance().filter(images, label) -> list[str]
+    '''
+    OnIndexed = pyqtSignal(str)
+    OnUpdated = pyqtSignal(str) # the image saved
+    OnAdded = pyqtSignal(list) # the images added to the index after it was built
+
+    PARALLEL_MIN_FILES = 256 # below this the files are read in the calling thread, starting processes costs more
+    CHUNK_SIZE = 64 # files sent to a process at once
+    MAX_PROCESSES = max(1, min(8, (os.cpu_count() or 1) - 1))
+
+    __instance = None
+
+    @classmethod
+    def instance(cls) -> 'LabelIndex':
+        return cls.__instance
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.__counts: dict[str, dict[str, int]] = {} # image path -> label counts, empty if it has no boxes
+        self.__annotated: set[str] = set() # images with an annotation, even without boxes
+        self.__modified: set[str] = set() # images saved since the app was opened
+        self.__lock = Lock()
+        self.__ready = Event()
+        self.__ready.set()
+        self.__folder = ""
+
+        self.scanned = 0 # files read by the last build
+        self.cached = 0 # files reused from the cache by the last build
+
+        LabelIndex.__instance = self
+
+    @staticmethod
+    def cache_path(folder: str) -> str:
+        name = hashlib.sha1(os.path.abspath(folder).encode('utf-8')).hexdigest()
+        return os.path.join(save_folder(), f"{name}.json")
+
+    def __load_cache(self, folder: str) -> dict[str, list]:
+        try:
+            with open(LabelIndex.cache_path(folder), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def __save_cache(self, folder: str, cache: dict[str, list]) -> None:
+        os.makedirs(save_folder(), exist_ok=True)
+        path = LabelIndex.cache_path(folder)
+        try:
+            with open(path + '.tmp', 'w') as f:
+                json.dump(cache, f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"Couldn't save the label index: {e}")
+
+    def __scan(self, xml_paths: list[str]) -> list[tuple[str, int, int, dict[str, int]]]:
+        if len(xml_paths) < LabelIndex.PARALLEL_MIN_FILES:
+            return scan_files(xml_paths)
+
+        chunks = [xml_paths[i:i + LabelIndex.CHUNK_SIZE] for i in range(0, len(xml_paths), LabelIndex.CHUNK_SIZE)]
+        # Spawned instead of forked, forking a process running Qt threads isn't safe
+        context = multiprocessing.get_context('spawn')
+        try:
+            with ProcessPoolExecutor(LabelIndex.MAX_PROCESSES, mp_context=context) as executor:
+                return [scanned for chunk in executor.map(scan_files, chunks) for scanned in chunk]
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Couldn't scan the annotations in parallel, scanning them in this thread: {e}")
+            return scan_files(xml_paths)
+
+    def _build(self, folder: str, images: list[str]) -> None:
+        cache = self.__load_cache(folder)
+        counts: dict[str, dict[str, int]] = {}
+        new_cache: dict[str, list] = {}
+        to_scan: list[str] = []
+        xml_images: dict[str, str] = {}
+
+        # The images in a database are counted by it, only the xml files are read
+        if images:
+            counts = AnnotationStore.for_image(images[0]).label_counts(images)
+        annotated = set(counts)
+
+        for image in images:
+            if image in counts:
+                continue
+            xml_path = xml_path_for(image)
+            xml_images[xml_path] = image
+            try:
+                stat = os.stat(xml_path)
+            except OSError:
+                counts[image] = {} # not annotated
+                continue
+            entry = cache.get(xml_path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                counts[image] = entry[2]
+                new_cache[xml_path] = entry
+            else:
+                to_scan.append(xml_path)
+
+        annotated.update(xml_images[xml_path] for xml_path in new_cache)
+        for xml_path, mtime, size, file_counts in self.__scan(to_scan):
+            counts[xml_images[xml_path]] = file_counts
+            new_cache[xml_path] = [mtime, size, file_counts]
+            annotated.add(xml_images[xml_path])
+        # Deleted between the stat and the scan
+        for xml_path in to_scan:
+            counts.setdefault(xml_images[xml_path], {})
+
+        if to_scan or len(new_cache) != len(cache):
+            self.__save_cache(folder, new_cache)
+
+        print(f"Label index of {folder}: {len(to_scan)} files read, {len(new_cache) - len(to_scan)} from the cache")
+        with self.__lock:
+            # Another folder was opened while scanning, its own job sets the index ready
+            if folder != self.__folder:
+                return
+            # Annotations saved while scanning are more recent than what was read
+            counts.update(self.__counts)
+            self.__counts = counts
+            self.__annotated = annotated | self.__annotated
+            self.scanned = len(to_scan)
+            self.cached = len(new_cache) - len(to_scan)
+        self.__ready.set()
+        self.OnIndexed.emit(folder)
+
+    def build(self, folder: str, images: list[str]) -> None:
+        '''
+            Indexes the annotations of the images in the background, replacing the last folder.
+
+            Args:
+                folder (str): The folder of the images, used as the key of the cache
+                images (list[str]): The paths of the images
+        '''
+        with self.__lock:
+            self.__folder = folder
+            self.__counts = {}
+            self.__annotated = set()
+        self.__ready.clear()
+        QThreadPool.globalInstance().start(ScanJob(self, folder, list(images)))
+
+    def add(self, images: list[str]) -> None:
+        '''
+            Reads the annotations of images added to the folder in the background, OnAdded is sent
+            once they are indexed.
+
+            Args:
+                images (list[str]): The paths of the new images
+        '''
+        if not images:
+            return
+        with self.__lock:
+            folder = self.__folder
+        QThreadPool.globalInstance().start(AddJob(self, folder, list(images)))
+
+    def _add(self, folder: str, images: list[str]) -> None:
+        # A few images at a time, read in this thread without the cache of the folder
+        counts = AnnotationStore.for_image(images[0]).label_counts(images)
+        annotated = set(counts)
+        xml_images = {xml_path_for(image): image for image in images if image not in counts}
+        for xml_path, _, _, file_counts in scan_files(list(xml_images)):
+            counts[xml_images[xml_path]] = file_counts
+            annotated.add(xml_images[xml_path])
+        for image in xml_images.values():
+            counts.setdefault(image, {}) # not annotated
+
+        with self.__lock:
+            if folder != self.__folder:
+                return
+            for image, file_counts in counts.items():
+                # Saved while reading, what was saved is more recent
+                if image not in self.__modified:
+                    self.__counts[image] = file_counts
+            self.__annotated |= annotated
+        self.OnAdded.emit(images)
+
+    def wait(self) -> None:
+        self.__ready.wait()
+
+    def update(self, image: str, labels: list[str]) -> None:
+        '''
+            Replaces the labels of an image, called when its annotation is saved.
+
+            Args:
+                image (str): The path of the image
+                labels (list[str]): The label of every box of the image
+        '''
+        with self.__lock:
+            self.__counts[image] = dict(Counter(labels))
+            self.__annotated.add(image)
+            self.__modified.add(image)
+        self.OnUpdated.emit(image)
+
+    def status(self, image: str) -> tuple[ImageStatus, int, bool]:
+        '''
+            Returns the status of the image, its amount of boxes and if it was saved since the app was opened.
+            Doesn't wait for the index to be built, the images not indexed yet are unknown.
+
+            Args:
+                image (str): The path of the image
+        '''
+        with self.__lock:
+            modified = image in self.__modified
+            counts = self.__counts.get(image)
+            if counts is None:
+                return ImageStatus.unknown, 0, modified
+            boxes = sum(counts.values())
+            if boxes > 0:
+                return ImageStatus.labelled, boxes, modified
+            return (ImageStatus.empty if image in self.__annotated else ImageStatus.not_annotated), 0, modified
+
+    def unlabelled(self, images: list[str]) -> list[bool]:
+        '''
+            Returns true for every image without boxes, in a single pass instead of asking the status of each one.
+
+            Args:
+                images (list[str]): The paths of the images
+        '''
+        with self.__lock:
+            counts = self.__counts
+            return [not counts.get(image) for image in images]
+
+    def is_ready(self) -> bool:
+        return self.__ready.is_set()
+
+    def modified_count(self, folder: str) -> int:
+        '''
+            Returns the amount of images of the folder saved since the app was opened.
+        '''
+        folder = os.path.abspath(folder)
+        with self.__lock:
+            return sum(1 for image in self.__modified if os.path.dirname(os.path.abspath(image)) == folder)
+
+    def counts(self, image: str) -> dict[str, int]:
+        '''
+            Returns the amount of boxes of each label in the image, waits for the index to be built.
+
+            Args:
+                image (str): The path of the image
+        '''
+        self.wait()
+        with self.__lock:
+            return dict(self.__counts.get(image, {}))
+
+    def labels(self) -> dict[str, int]:
+        '''
+            Returns the amount of boxes of each label in the whole folder.
+            Doesn't wait for the index to be built, only the images indexed yet are counted.
+        '''
+        total = Counter()
+        with self.__lock:
+            for file_counts in self.__counts.values():
+                total.update(file_counts)
+        return dict(total)
+
+    def filter(self, images: list[str], label: str) -> list[str]:
+        '''
+            Returns the images with a box of the label, keeping their order.
+            'any' or '*' match the images with any box, 'none' or 'null' the images without boxes.
+            Doesn't wait for the index to be built, the images not indexed yet are left out
+            until OnIndexed is emitted.
+
+            Args:
+                images (list[str]): The images to filter
+                label (str): The label to look for
+        '''
+        with self.__lock:
+            counts = self.__counts
+            if label == 'any' or label == '*':
+                return [image for image in images if counts.get(image)]
+            if label == 'none' or label == 'null':
+                return [image for image in images if image in counts and not counts[image]]
+            return [image for image in images if label in counts.get(image, ())]
@@ -4,6 +4,11 @@ from enum import Enum
 
 class PersistentDataType(Enum):
     last_folder = 0
+    image_cache_mb = 1
+    annotation_store = 2
+    watch_folder = 3
+    show_thumbnails = 4
+    tile_cache_mb = 5
 
     def __str__(self):
         return self.name
@@ -14,6 +19,15 @@ class PersistentData:
     _save_folder = "./Settings"
     _save_path = "./Settings/PersistentData.stg"
 
+    _default_values = {
+        PersistentDataType.last_folder: "",
+        PersistentDataType.image_cache_mb: 512,
+        PersistentDataType.annotation_store: "voc", # a StoreType name, 'voc' or 'sqlite'
+        PersistentDataType.watch_folder: True, # add and remove the images changed by other programs
+        PersistentDataType.show_thumbnails: True,
+        PersistentDataType.tile_cache_mb: 64, # pixmaps of the canvas tiles, on top of the image cache
+    }
+
     @classmethod
     def instance(cls) -> 'PersistentData':
         return cls.__instance
@@ -42,13 +56,8 @@ class PersistentData:
     def __save_default(self):
         os.makedirs(PersistentData._save_folder, exist_ok=True)
 
-        default_values = \
-        {
-            str(PersistentDataType.last_folder): ""
-        }
-
         with open(PersistentData._save_path, 'w') as f:
-            json.dump(default_values, f, indent=4)
+            json.dump(self.__json_friendly(PersistentData._default_values), f, indent=4)
 
     def __json_friendly(self, settings: dict[PersistentDataType, any] = None) -> dict[str, any]:
         if settings is None:
@@ -68,6 +77,10 @@ class PersistentData:
         with open(PersistentData._save_path, 'r') as f:
             settings: dict[str, any] = json.load(f)
         
+        # Settings files saved by older versions may miss some keys
+        for key, val in PersistentData._default_values.items():
+            self.__settings.setdefault(key, val)
+
         for key, val in settings.items():
             self.__settings[PersistentDataType[key]] = val
         
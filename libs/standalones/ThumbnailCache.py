@@ -0,0 +1,283 @@
+import os
+import hashlib
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt5.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QImageIOHandler, QPainter
+
+from libs.standalones.ImageCache import ImageCache
+
+
+THUMBNAIL_SIZE = 96 # the thumbnails fit in a square of this size
+THUMBNAIL_QUALITY = 85
+
+def save_folder() -> str:
+    return './Settings/Thumbnails'
+
+def thumbnail_key(path: str) -> str | None:
+    '''
+        Returns the name of the thumbnail of the image, the hash of its path, size and mtime,
+        so an edited image gets a new thumbnail. None if the image can't be stat'ed.
+
+        Args:
+            path (str): The path of the image
+    '''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return hashlib.sha1(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode('utf-8')).hexdigest()
+
+def thumbnail_path(key: str) -> str:
+    # Split in subfolders, a single folder of every thumbnail gets slow to list
+    return os.path.join(save_folder(), key[:2], f"{key}.jpg")
+
+def make_thumbnail(path: str, thumb_path: str, size: int) -> bool:
+    '''
+        Decodes the image at 'path' scaled to fit in 'size' and saves it as a JPEG at 'thumb_path'.
+        Runs in the processes of the thumbnail cache, returns true if the thumbnail was saved and
+        false if the image can't be read. Raises OSError if it can't be saved, which can be tried again.
+
+        Args:
+            path (str): The path of the image
+            thumb_path (str): The path of the thumbnail
+            size (int): The size of the square the thumbnail fits in
+    '''
+    reader = QImageReader(path)
+    reader.setDecideFormatFromContent(True)
+    full_size = reader.size()
+    max_size = QSize(size, size)
+    # JPEGs decode a reduced resolution directly, the other formats are scaled after decoding
+    scaled = full_size.isValid() and reader.supportsOption(QImageIOHandler.ScaledSize)
+    if scaled:
+        reader.setScaledSize(full_size.scaled(max_size, Qt.KeepAspectRatio).expandedTo(QSize(1, 1)))
+    image = reader.read()
+    if image.isNull():
+        print(f"Couldn't read {path}: {reader.errorString()}")
+        return False
+    if not scaled:
+        image = image.scaled(max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    if image.hasAlphaChannel():
+        # JPEG has no transparency, it's drawn over white instead of black
+        background = QImage(image.size(), QImage.Format_RGB32)
+        background.fill(Qt.white)
+        painter = QPainter(background)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        image = background
+
+    os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+    if not image.save(thumb_path + '.tmp', 'JPG', THUMBNAIL_QUALITY):
+        raise OSError(f"Couldn't save the thumbnail of {path}")
+    os.replace(thumb_path + '.tmp', thumb_path)
+    return True
+
+class LoadJob(QRunnable):
+    def __init__(self, cache: 'ThumbnailCache', path: str):
+        super().__init__()
+        self.cache = cache
+        self.path = path
+        self.cancelled = False # set by the cache when the thumbnail is no longer needed
+
+    def run(self):
+        if not self.cancelled:
+            self.cache._load(self.path)
+
+class ThumbnailCache(QObject):
+    '''
+        Small thumbnails of the images, generated in a pool of processes so decoding big images
+        doesn't compete with the GUI for the GIL. They are saved in the settings folder by the hash
+        of the path, size and mtime of the image, so they are generated once, and the ones shown
+        are kept in memory. Only the thumbnails asked for are generated, the ones no longer
+        needed can be cancelled before their process starts them.
+        The key of an image is computed once and the thumbnails saved are read from the disk by
+        the thread pool, so asking for a thumbnail on every repaint only reads a dict.
+
+        Usage:
+            ThumbnailCache.instance().get(path) -> QImage | None\n
+            ThumbnailCache.instance().OnThumbnail.connect(slot) # slot(path), get(path) is ready
+    '''
+    OnThumbnail = pyqtSignal(str) # the path of an image whose thumbnail was generated
+    _Loaded = pyqtSignal(str, str, QImage) # sent by the thread pool, path, thumbnail key, empty if the image is missing, thumbnail
+    _Generated = pyqtSignal(str, str) # sent by the process pool, path, thumbnail key
+
+    MAX_PROCESSES = 4
+    MEMORY_MB = 64 # a 96x96 thumbnail is 36KB, this keeps about 1800 of them
+    MAX_RETRIES = 2 # a thumbnail that failed without being unreadable is generated again this many times
+
+    __instance = None
+
+    @classmethod
+    def instance(cls) -> 'ThumbnailCache':
+        return cls.__instance
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.images = ImageCache(ThumbnailCache.MEMORY_MB)
+        self.__executor: ProcessPoolExecutor = None
+        self.__pending: dict[str, Future] = {} # path -> generation of its thumbnail
+        self.__loading: dict[str, LoadJob] = {} # path -> read of its key and thumbnail
+        self.__keys: dict[str, str | None] = {} # path -> thumbnail key, None if the image is missing
+        self.__retries: dict[str, int] = {} # path -> times its generation failed and was started again
+        self.__failed: set[str] = set() # keys of the images that can't be read, not tried again
+        self._Loaded.connect(self.__loaded)
+        self._Generated.connect(self.__generated)
+
+        self.generated = 0 # thumbnails generated by the pool
+        self.loaded = 0 # thumbnails read from the disk
+
+        ThumbnailCache.__instance = self
+
+    def __start_executor(self) -> ProcessPoolExecutor:
+        if self.__executor is None:
+            # Spawned, forking a process with the Qt threads running isn't safe
+            workers = max(1, min(ThumbnailCache.MAX_PROCESSES, (os.cpu_count() or 2) - 1))
+            self.__executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+        return self.__executor
+
+    def __reset_executor(self) -> None:
+        # A process died, the pool can't be used anymore and a new one is started when needed
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+
+    def get(self, path: str) -> QImage | None:
+        '''
+            Returns the thumbnail of the image if it's in memory, else starts reading it from the disk
+            or generating it and returns None, OnThumbnail is sent once it's ready.
+
+            Args:
+                path (str): The path of the image
+        '''
+        if path in self.__keys:
+            key = self.__keys[path]
+            if key is None or key in self.__failed:
+                return None
+            image = self.images.get(key)
+            if image is not None:
+                return image
+        if path not in self.__loading and path not in self.__pending:
+            job = LoadJob(self, path)
+            self.__loading[path] = job
+            QThreadPool.globalInstance().start(job)
+        return None
+
+    def _load(self, path: str) -> None:
+        # Called in the thread pool, the stat, hash and read of the thumbnail are kept out of the repaints
+        key = thumbnail_key(path)
+        image = QImage()
+        if key is not None:
+            thumb_path = thumbnail_path(key)
+            if os.path.exists(thumb_path):
+                image = QImage(thumb_path)
+        self._Loaded.emit(path, key or "", image)
+
+    def __loaded(self, path: str, key: str, image: QImage):
+        # Cancelled or cleared while reading
+        if self.__loading.pop(path, None) is None:
+            return
+        self.__keys[path] = key or None
+        if not key or key in self.__failed:
+            return
+        if image.isNull():
+            self.__generate(path, key, thumbnail_path(key))
+            return
+        self.loaded += 1
+        self.images.put(key, image)
+        self.OnThumbnail.emit(path)
+
+    def __generate(self, path: str, key: str, thumb_path: str) -> None:
+        if path in self.__pending:
+            return
+        for _ in range(2):
+            try:
+                future = self.__start_executor().submit(make_thumbnail, path, os.path.abspath(thumb_path), THUMBNAIL_SIZE)
+                break
+            except (BrokenProcessPool, RuntimeError) as e:
+                print(f"Couldn't generate the thumbnail of {path}, starting the processes again: {e}")
+                self.__reset_executor()
+        else:
+            return
+        self.__pending[path] = future
+        # Called in a thread of the executor, the signal is queued to the GUI thread
+        future.add_done_callback(lambda future: self._Generated.emit(path, key))
+
+    def __generated(self, path: str, key: str):
+        future = self.__pending.pop(path, None)
+        if future is None or future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            # The process died or the disk is full, the image may still be readable
+            print(f"Couldn't generate the thumbnail of {path}: {error}")
+            if isinstance(error, BrokenProcessPool):
+                self.__reset_executor()
+            retries = self.__retries.get(path, 0)
+            if retries < ThumbnailCache.MAX_RETRIES:
+                self.__retries[path] = retries + 1
+                self.__generate(path, key, thumbnail_path(key))
+            else:
+                # Tried again the next time it's asked for
+                self.__retries.pop(path, None)
+            return
+        self.__retries.pop(path, None)
+        if not future.result():
+            self.__failed.add(key)
+            return
+        image = QImage(thumbnail_path(key))
+        if image.isNull():
+            return
+        self.generated += 1
+        self.images.put(key, image)
+        self.OnThumbnail.emit(path)
+
+    def keep(self, paths: list[str]) -> None:
+        '''
+            Cancels the thumbnails being read or generated that aren't of the images given,
+            the ones a process already started are finished.
+
+            Args:
+                paths (list[str]): The paths of the images still needed
+        '''
+        needed = set(paths)
+        for path, job in list(self.__loading.items()):
+            # Forgotten, so a read already started is ignored
+            if path not in needed:
+                job.cancelled = True
+                del self.__loading[path]
+        for path, future in list(self.__pending.items()):
+            # Cancelling calls the done callback right away, which forgets the future
+            if path not in needed:
+                future.cancel()
+
+    def pending(self) -> int:
+        return len(self.__pending) + len(self.__loading)
+
+    def forget(self, paths: list[str]) -> None:
+        '''
+            Computes the key of the images again the next time they are asked for, called when
+            the folder watcher reports them as added or removed.
+
+            Args:
+                paths (list[str]): The paths of the images
+        '''
+        for path in paths:
+            self.__keys.pop(path, None)
+
+    def clear(self) -> None:
+        self.keep([])
+        self.images.clear()
+        self.__keys.clear()
+        self.__retries.clear()
+        self.__failed.clear()
+
+    def shutdown(self) -> None:
+        '''
+            Stops the processes, the thumbnails not started yet are cancelled.
+        '''
+        self.keep([])
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
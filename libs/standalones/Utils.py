@@ -7,6 +7,7 @@ from libs.standalones.MyException import InvalidInstantiation
 
 class utils:
     Empty_Brush = QBrush(QColor(0, 0, 0, 0))
+    __digits = re.compile('([0-9]+)')
 
     def __new__(cls: type['utils']) -> 'utils':
         raise InvalidInstantiation("Tried to instantiate 'Utils' class, a data only class.")
@@ -20,13 +21,17 @@ class utils:
         b = int((hash_code / 16581375) % 255)
         return QColor(r, g, b, 100)
 
+    @staticmethod
+    def natural_key(s: str) -> list[str | int]:
+        """
+        Returns the key of the string in natural alphanumeric order, the numbers are compared as numbers.
+        The text and the numbers alternate starting with text, so the keys of any two strings can be compared.
+        """
+        return [int(c) if i % 2 else c for i, c in enumerate(utils.__digits.split(s))]
+
     @staticmethod
     def natural_sort(list, key=lambda s:s):
         """
         Sort the list into natural alphanumeric order.
         """
-        def get_alphanum_key_func(key):
-            convert = lambda text: int(text) if text.isdigit() else text
-            return lambda s: [convert(c) for c in re.split('([0-9]+)', key(s))]
-        sort_key = get_alphanum_key_func(key)
-        list.sort(key=sort_key)
\ No newline at end of file
+        list.sort(key=lambda s: utils.natural_key(key(s)))
\ No newline at end of file
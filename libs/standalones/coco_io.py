@@ -0,0 +1,128 @@
+import os
+import json
+import tempfile
+
+JSON_EXT = '.json'
+
+class CocoIndex:
+    '''
+        The boxes of a COCO detection dataset indexed by image file name, the file is parsed once
+        so finding the boxes of an image is a dict lookup.
+
+        Args:
+            json_path (str): The path of the json file
+    '''
+    def __init__(self, json_path: str):
+        self.json_path = json_path
+        with open(json_path, 'r', encoding='utf-8') as f:
+            dataset = json.load(f)
+
+        categories = {category["id"]: category["name"] for category in dataset.get("categories", [])}
+        image_names = {image["id"]: os.path.basename(image["file_name"]) for image in dataset.get("images", [])}
+
+        self.__boxes: dict[str, list[tuple[str, int, int, int, int]]] = {name: [] for name in image_names.values()}
+        for annotation in dataset.get("annotations", []):
+            name = image_names.get(annotation["image_id"])
+            if name is None:
+                continue
+            x, y, w, h = annotation["bbox"]
+            label = categories.get(annotation["category_id"], str(annotation["category_id"]))
+            self.__boxes[name].append((label, round(x), round(y), round(x + w), round(y + h)))
+
+    @staticmethod
+    def is_coco(json_path: str) -> bool:
+        '''
+            Returns true if the json file looks like a COCO dataset, without parsing all of it.
+        '''
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                head = f.read(4096)
+        except OSError:
+            return False
+        return '"images"' in head or '"annotations"' in head or '"categories"' in head
+
+    def __contains__(self, file_name: str) -> bool:
+        return os.path.basename(file_name) in self.__boxes
+
+    def __len__(self) -> int:
+        return len(self.__boxes)
+
+    def get(self, file_name: str) -> list[tuple[str, int, int, int, int]] | None:
+        '''
+            Returns the (label, x_min, y_min, x_max, y_max) boxes of the image, None if it isn't in the dataset.
+
+            Args:
+                file_name (str): The name or path of the image
+        '''
+        boxes = self.__boxes.get(os.path.basename(file_name))
+        return None if boxes is None else list(boxes)
+
+class CocoWriter:
+    '''
+        Writes a COCO detection dataset incrementally, so it never holds the whole dataset.
+        The images are written as they are added, their annotations are spooled to a temporary
+        file and copied after them when the writer is closed.
+
+        Usage:
+            with CocoWriter(path, classes) as writer:\n
+                writer.add_image(file_name, width, height, boxes)
+
+        Args:
+            target_file (str): The path of the json file
+            classes (list[str]): The category names, their ids start at 1
+    '''
+    def __init__(self, target_file: str, classes: list[str]):
+        self.target_file = target_file
+        self.classes = {name: i + 1 for i, name in enumerate(classes)}
+        self.images = 0
+        self.annotations = 0
+
+        self.__out = open(target_file + '.tmp', 'w', encoding='utf-8')
+        self.__spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self.__out.write('{"images": [')
+
+    def add_image(self, file_name: str, width: int, height: int, boxes: list[tuple[str, int, int, int, int]]) -> int:
+        '''
+            Writes an image and its (label, x_min, y_min, x_max, y_max) boxes, returns the id of the image.
+            Boxes with an unknown label are skipped.
+        '''
+        self.images += 1
+        image = {"id": self.images, "file_name": file_name, "width": width, "height": height}
+        self.__out.write((',' if self.images > 1 else '') + json.dumps(image))
+
+        for label, x_min, y_min, x_max, y_max in boxes:
+            category = self.classes.get(label)
+            if category is None:
+                continue
+            self.annotations += 1
+            w, h = x_max - x_min, y_max - y_min
+            annotation = {"id": self.annotations, "image_id": self.images, "category_id": category,
+                          "bbox": [x_min, y_min, w, h], "area": w * h, "iscrowd": 0}
+            self.__spool.write((',' if self.annotations > 1 else '') + json.dumps(annotation))
+        return self.images
+
+    def close(self) -> None:
+        '''
+            Writes the annotations and the categories, then renames the file to its target.
+        '''
+        self.__out.write('], "annotations": [')
+        self.__spool.seek(0)
+        while chunk := self.__spool.read(1 << 20):
+            self.__out.write(chunk)
+        self.__spool.close()
+
+        categories = [{"id": i, "name": name, "supercategory": "none"} for name, i in self.classes.items()]
+        self.__out.write('], "categories": ' + json.dumps(categories) + '}\n')
+        self.__out.close()
+        os.replace(self.target_file + '.tmp', self.target_file)
+
+    def __enter__(self) -> 'CocoWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        self.__spool.close()
+        self.__out.close()
+        os.remove(self.target_file + '.tmp')
@@ -2,18 +2,25 @@
 # -*- coding: utf8 -*-
 import os
 import sys
-from xml.etree import ElementTree
-from xml.etree.ElementTree import Element, SubElement
+from typing import Iterator
 from lxml import etree
-import codecs
 from time import sleep
 
-from libs.canvas.Shape import Shape, ShapePoints
+from libs.canvas.Shape import Shape
 from libs.standalones.Vector import Vector2Int
 
 XML_EXT = '.xml'
 JPG_EXT = '.jpg'
 
+def xml_path_for(img_path: str) -> str:
+    '''
+        Returns the path of the annotation file of an image, next to it with the xml extension.
+
+        Args:
+            img_path (str): The path of the image
+    '''
+    return os.path.splitext(img_path)[0] + XML_EXT
+
 class PascalVocWriter:
 
     def __init__(self, folder_name, filename, img_size, database_src='Unknown', local_img_path=None):
@@ -27,14 +34,20 @@ class PascalVocWriter:
 
     def prettify(self, elem):
         """
-            Return a pretty-printed XML string for the Element.
+            Return a pretty-printed XML string for the Element, indented with tabs.
+        """
+        etree.indent(elem, space="\t")
+        return etree.tostring(elem, pretty_print=True, encoding='utf-8')
+
+    @staticmethod
+    def sub_element(parent, tag, text=None):
+        """
+            Return a new child of 'parent', empty texts are written as self-closing tags.
         """
-        rough_string = ElementTree.tostring(elem, 'utf8')
-        root = etree.fromstring(rough_string)
-        return etree.tostring(root, pretty_print=True, encoding='utf-8').replace("  ".encode(), "\t".encode())
-        # minidom does not support UTF-8
-        # reparsed = minidom.parseString(rough_string)
-        # return reparsed.toprettyxml(indent="\t", encoding='utf-8')
+        element = etree.SubElement(parent, tag)
+        if text:
+            element.text = text
+        return element
 
     def gen_xml(self):
         """
@@ -46,35 +59,27 @@ class PascalVocWriter:
                 self.img_size is None:
             return None
 
-        top = Element('annotation')
-
-        folder = SubElement(top, 'folder')
-        folder.text = self.folder_name
+        sub = PascalVocWriter.sub_element
+        top = etree.Element('annotation')
 
-        filename = SubElement(top, 'filename')
-        filename.text = self.filename
+        sub(top, 'folder', self.folder_name)
+        sub(top, 'filename', self.filename)
 
         if self.local_img_path is not None:
-            local_img_path = SubElement(top, 'path')
-            local_img_path.text = self.local_img_path
-
-        source = SubElement(top, 'source')
-        database = SubElement(source, 'database')
-        database.text = self.database_src
-
-        size_part = SubElement(top, 'size')
-        width = SubElement(size_part, 'width')
-        height = SubElement(size_part, 'height')
-        depth = SubElement(size_part, 'depth')
-        width.text = str(self.img_size[0])
-        height.text = str(self.img_size[1])
+            sub(top, 'path', self.local_img_path)
+
+        source = sub(top, 'source')
+        sub(source, 'database', self.database_src)
+
+        size_part = sub(top, 'size')
+        sub(size_part, 'width', str(self.img_size[0]))
+        sub(size_part, 'height', str(self.img_size[1]))
         if len(self.img_size) == 3:
-            depth.text = str(self.img_size[2])
+            sub(size_part, 'depth', str(self.img_size[2]))
         else:
-            depth.text = '1'
+            sub(size_part, 'depth', '1')
 
-        segmented = SubElement(top, 'segmented')
-        segmented.text = '0'
+        sub(top, 'segmented', '0')
         return top
 
     def add_bnd_box(self, x_min, y_min, x_max, y_max, name):
@@ -83,108 +88,175 @@ class PascalVocWriter:
         self.box_list.append(bnd_box)
 
     def append_objects(self, top):
+        sub = PascalVocWriter.sub_element
         for each_object in self.box_list:
-            object_item = SubElement(top, 'object')
-            name = SubElement(object_item, 'name')
-            name.text = each_object['name']
-            pose = SubElement(object_item, 'pose')
-            pose.text = "Unspecified"
-            truncated = SubElement(object_item, 'truncated')
+            object_item = sub(top, 'object')
+            sub(object_item, 'name', each_object['name'])
+            sub(object_item, 'pose', "Unspecified")
             if int(float(each_object['ymax'])) == int(float(self.img_size[0])) or (int(float(each_object['ymin'])) == 1):
-                truncated.text = "1"  # max == height or min
+                sub(object_item, 'truncated', "1")  # max == height or min
             elif (int(float(each_object['xmax'])) == int(float(self.img_size[1]))) or (int(float(each_object['xmin'])) == 1):
-                truncated.text = "1"  # max == width or min
+                sub(object_item, 'truncated', "1")  # max == width or min
             else:
-                truncated.text = "0"
-            difficult = SubElement(object_item, 'difficult')
-            difficult.text = "0"
-            bnd_box = SubElement(object_item, 'bndbox')
-            x_min = SubElement(bnd_box, 'xmin')
-            x_min.text = str(each_object['xmin'])
-            y_min = SubElement(bnd_box, 'ymin')
-            y_min.text = str(each_object['ymin'])
-            x_max = SubElement(bnd_box, 'xmax')
-            x_max.text = str(each_object['xmax'])
-            y_max = SubElement(bnd_box, 'ymax')
-            y_max.text = str(each_object['ymax'])
+                sub(object_item, 'truncated', "0")
+            sub(object_item, 'difficult', "0")
+            bnd_box = sub(object_item, 'bndbox')
+            sub(bnd_box, 'xmin', str(each_object['xmin']))
+            sub(bnd_box, 'ymin', str(each_object['ymin']))
+            sub(bnd_box, 'xmax', str(each_object['xmax']))
+            sub(bnd_box, 'ymax', str(each_object['ymax']))
 
     def save(self, target_file=None):
         root = self.gen_xml()
         self.append_objects(root)
-        out_file = None
         if target_file is None:
-            out_file = codecs.open(
-                self.filename + XML_EXT, 'w', encoding='utf-8')
-        else:
-            out_file = codecs.open(target_file, 'w', encoding='utf-8')
+            target_file = self.filename + XML_EXT
 
         prettify_result = self.prettify(root)
-        out_file.write(prettify_result.decode('utf8'))
-        out_file.close()
 
+        # Written next to the target and then renamed over it, a crash mid-write
+        # leaves the old file untouched instead of a truncated one
+        tmp_path = target_file + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as out_file:
+                out_file.write(prettify_result)
+            os.replace(tmp_path, target_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def _iter_objects(xml_path: str):
+    '''
+        Yields the object elements of an annotation while it's being parsed, the elements
+        are freed once the caller moves to the next one.
+    '''
+    for _, object_iter in etree.iterparse(xml_path, events=('end',), tag='object'):
+        yield object_iter
+        object_iter.clear(keep_tail=True)
+        while object_iter.getprevious() is not None:
+            del object_iter.getparent()[0]
+
+def iter_boxes(xml_path: str) -> Iterator[tuple[str, int, int, int, int]]:
+    '''
+        Yields the boxes of an annotation as (label, x_min, y_min, x_max, y_max) tuples,
+        without building the whole tree nor any Shape.
+
+        Args:
+            xml_path (str): The path of the annotation file
+    '''
+    for object_iter in _iter_objects(xml_path):
+        if len(object_iter) == 0:
+            continue
+        bnd_box = object_iter.find('bndbox')
+        yield (object_iter.findtext('name'),
+               int(float(bnd_box.findtext('xmin'))), int(float(bnd_box.findtext('ymin'))),
+               int(float(bnd_box.findtext('xmax'))), int(float(bnd_box.findtext('ymax'))))
+
+def iter_labels(xml_path: str) -> Iterator[str]:
+    '''
+        Yields the label of every box of an annotation, without reading the coordinates.
+
+        Args:
+            xml_path (str): The path of the annotation file
+    '''
+    for object_iter in _iter_objects(xml_path):
+        if len(object_iter) != 0:
+            yield object_iter.findtext('name')
+
+def read_voc(xml_path: str) -> tuple[str, tuple[int, int, int], list[tuple[str, int, int, int, int]]]:
+    '''
+        Reads an annotation in a single streaming pass, used by the converters.
+        Returns its image file name, its (width, height, depth) size and its boxes as
+        (label, x_min, y_min, x_max, y_max) tuples.
+
+        Args:
+            xml_path (str): The path of the annotation file
+    '''
+    filename = None
+    size = (0, 0, 3)
+    boxes = []
+    for _, element in etree.iterparse(xml_path, events=('end',), tag=('filename', 'size', 'object')):
+        if element.tag == 'filename':
+            filename = element.text
+        elif element.tag == 'size':
+            size = tuple(int(float(element.findtext(key, default))) for key, default in (('width', '0'), ('height', '0'), ('depth', '3')))
+        elif len(element) != 0:
+            bnd_box = element.find('bndbox')
+            boxes.append((element.findtext('name'),
+                          int(float(bnd_box.findtext('xmin'))), int(float(bnd_box.findtext('ymin'))),
+                          int(float(bnd_box.findtext('xmax'))), int(float(bnd_box.findtext('ymax')))))
+        element.clear(keep_tail=True)
+    return filename, size, boxes
+
+def shapes_from_boxes(boxes: list[tuple[str, int, int, int, int]]) -> list[Shape]:
+    '''
+        Returns new shapes built from (label, x_min, y_min, x_max, y_max) boxes, only needed
+        when they are displayed.
+
+        Args:
+            boxes (list[tuple]): The boxes to build the shapes of
+    '''
+    shapes = []
+    for label, x_min, y_min, x_max, y_max in boxes:
+        points = [Vector2Int(x_min, y_min), Vector2Int(x_max, y_min), Vector2Int(x_max, y_max), Vector2Int(x_min, y_max)]
+        shapes.append(Shape(label, points))
+    return shapes
 
 class PascalVocReader:
 
     def __init__(self, file_path: str):
-        if file_path.endswith(JPG_EXT):
-            file_path = file_path.replace(JPG_EXT, XML_EXT)
-        self.shapes: list[Shape] = []
+        if not file_path.endswith(XML_EXT):
+            file_path = xml_path_for(file_path)
         self.file_path = file_path
         self.verified = False
+        self.__boxes: list[tuple[str, int, int, int, int]] = None # parsed on first use
 
-        if not os.path.exists(file_path):
-            return
-        try:
-            self.parse_xml()
-        except:
-            pass
-
-    def get_shapes(self):
-        return [shape.copy() for shape in self.shapes] if self.shapes else []
-
-    def get_labels(self):
-        return self.box_quantity
-            
-
-    def add_shape(self, label, bnd_box):
-        x_min = int(float(bnd_box.find('xmin').text))
-        y_min = int(float(bnd_box.find('ymin').text))
-        x_max = int(float(bnd_box.find('xmax').text))
-        y_max = int(float(bnd_box.find('ymax').text))
-        points = [Vector2Int(x_min, y_min), Vector2Int(x_max, y_min), Vector2Int(x_max, y_max), Vector2Int(x_min, y_max)]
-        self.shapes.append(Shape(label, points))
+    def get_boxes(self) -> list[tuple[str, int, int, int, int]]:
+        '''
+            Returns the boxes of the annotation as (label, x_min, y_min, x_max, y_max) tuples,
+            an empty list if the file doesn't exist or can't be parsed.
+        '''
+        if self.__boxes is None:
+            self.__boxes = []
+            if os.path.exists(self.file_path):
+                try:
+                    self.parse_xml()
+                except Exception:
+                    pass
+        return self.__boxes
+
+    def get_shapes(self) -> list[Shape]:
+        '''
+            Returns new shapes built from the boxes, only needed when they are displayed.
+        '''
+        return shapes_from_boxes(self.get_boxes())
+
+    def get_labels(self) -> list[str]:
+        return [box[0] for box in self.get_boxes()]
 
     #japa
     def find_label(self, label):
+        '''
+            Returns true if the annotation has an object with the label, stops reading at the first match.
+            'any' or '*' match any object, 'none' or 'null' match an empty object.
+        '''
         assert self.file_path.endswith(XML_EXT), "Unsupported file format"
-        parser = etree.XMLParser(encoding='utf-8')
-        try: 
-            xml_tree = ElementTree.parse(self.file_path, parser=parser).getroot()
+        try:
+            for object_iter in _iter_objects(self.file_path):
+                if len(object_iter) == 0:
+                    if label == 'none' or label == 'null':
+                        return True
+                    continue
+                _label = object_iter.findtext('name')
+                if _label == label or label == 'any' or label == '*':
+                    return True
         except FileNotFoundError as e:
             return False
-
-        filename = xml_tree.find('filename').text
-        for object_iter in xml_tree.findall('object'):
-            if len(object_iter) == 0:
-                if label == 'none' or label == 'null':
-                    return True
-                continue
-            _label = object_iter.find('name').text
-            if _label == label or label == 'any' or label == '*':
-                return True
         return False
 
     def parse_xml(self):
         assert self.file_path.endswith(XML_EXT), "Unsupported file format"
-        parser = etree.XMLParser(encoding='utf-8')
-        xml_tree = ElementTree.parse(self.file_path, parser=parser).getroot()
-
-        self.shapes = []
-
-        for object_iter in xml_tree.findall('object'):
-            if len(object_iter) == 0:
-                continue
-            bnd_box = object_iter.find("bndbox")
-            label = object_iter.find('name').text
-            self.add_shape(label, bnd_box)
+        self.__boxes = list(iter_boxes(self.file_path))
         return True
@@ -0,0 +1,80 @@
+import os
+
+TXT_EXT = '.txt'
+CLASSES_FILE = 'classes.txt'
+
+def read_classes(path: str) -> list[str]:
+    '''
+        Returns the class names of a YOLO dataset, one per line, the line number is the class id.
+
+        Args:
+            path (str): The path of the classes file
+    '''
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def write_classes(path: str, classes: list[str]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{name}\n" for name in classes)
+
+def read_yolo(txt_path: str, img_size: tuple[int, int], classes: list[str] = None) -> list[tuple[str, int, int, int, int]]:
+    '''
+        Returns the boxes of a YOLO txt file as (label, x_min, y_min, x_max, y_max) tuples in pixels.
+        The coordinates are relative to the image, so its size is needed to read them.
+
+        Args:
+            txt_path (str): The path of the txt file
+            img_size (tuple): The (width, height) of the image
+            classes (list[str]): The class names, the ids are used as labels if None or unknown
+    '''
+    width, height = img_size[0], img_size[1]
+    boxes = []
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            values = line.split()
+            if len(values) < 5:
+                continue
+            class_id = int(values[0])
+            x_center, y_center, w, h = (float(value) for value in values[1:5])
+            label = classes[class_id] if classes is not None and 0 <= class_id < len(classes) else str(class_id)
+            boxes.append((label,
+                          max(0, round((x_center - w / 2) * width)), max(0, round((y_center - h / 2) * height)),
+                          min(width, round((x_center + w / 2) * width)), min(height, round((y_center + h / 2) * height))))
+    return boxes
+
+class YoloWriter:
+    '''
+        Writes the boxes of an image as a YOLO txt file, a 'class x_center y_center width height'
+        line per box with the coordinates relative to the size of the image.
+
+        Args:
+            img_size (tuple): The (width, height) of the image
+            classes (dict[str, int]): The id of every class name
+    '''
+    def __init__(self, img_size: tuple[int, int], classes: dict[str, int]):
+        self.img_size = img_size
+        self.classes = classes
+        self.box_list: list[tuple[int, float, float, float, float]] = []
+
+    def add_bnd_box(self, x_min, y_min, x_max, y_max, name) -> bool:
+        '''
+            Adds a box, returns false if its class isn't known and it was skipped.
+        '''
+        class_id = self.classes.get(name)
+        if class_id is None:
+            return False
+        width, height = self.img_size[0], self.img_size[1]
+        self.box_list.append((class_id,
+                              (x_min + x_max) / 2 / width, (y_min + y_max) / 2 / height,
+                              (x_max - x_min) / width, (y_max - y_min) / height))
+        return True
+
+    def to_string(self) -> str:
+        return "".join(f"{box[0]} {box[1]:.6f} {box[2]:.6f} {box[3]:.6f} {box[4]:.6f}\n" for box in self.box_list)
+
+    def save(self, target_file: str) -> None:
+        # Same as the xml files, renamed over the target so a crash doesn't leave it truncated
+        tmp_path = target_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as out_file:
+            out_file.write(self.to_string())
+        os.replace(tmp_path, target_file)
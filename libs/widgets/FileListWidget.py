@@ -3,6 +3,91 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
 from libs.standalones.Files_Manager import Files_Manager
+from libs.standalones.LabelIndex import ImageStatus
+
+class FileListModel(QAbstractTableModel):
+    '''
+        The paths of the images of the folder and their annotation status, the view only asks for the rows
+        it shows, so a folder of any size is a single list of strings instead of an item per image.
+
+        Args:
+            status: returns the (ImageStatus, boxes, modified) of an image
+    '''
+    PATH_COLUMN = 0
+    STATUS_COLUMN = 1
+
+    def __init__(self, parent=None, status=None):
+        super().__init__(parent)
+        self.__images: list[str] = []
+        self.__status = status
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.__images)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else 2
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.__images):
+            return None
+        image = self.__images[index.row()]
+        if index.column() == FileListModel.PATH_COLUMN:
+            if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+                return image
+            return None
+
+        if self.__status is None:
+            return None
+        if role == Qt.DisplayRole:
+            status, boxes, modified = self.__status(image)
+            text = str(boxes) if status == ImageStatus.labelled or status == ImageStatus.empty else ""
+            return text + " *" if modified else text
+        if role == Qt.ToolTipRole:
+            status, boxes, modified = self.__status(image)
+            return f"{status}, {boxes} boxes" + (", modified" if modified else "")
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def status_changed(self, row: int = None) -> None:
+        '''
+            Repaints the status of the row, of every row if None.
+        '''
+        if not self.__images:
+            return
+        first, last = (0, len(self.__images) - 1) if row is None else (row, row)
+        self.dataChanged.emit(self.index(first, FileListModel.STATUS_COLUMN), self.index(last, FileListModel.STATUS_COLUMN))
+
+    def set_images(self, images: list[str]) -> None:
+        # Copied, the list of the files manager is changed before the rows are inserted
+        self.beginResetModel()
+        self.__images = list(images)
+        self.endResetModel()
+
+    def append(self, images: list[str]) -> None:
+        if not images:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.__images), len(self.__images) + len(images) - 1)
+        self.__images.extend(images)
+        self.endInsertRows()
+
+    def insert(self, row: int, image: str) -> None:
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.__images.insert(row, image)
+        self.endInsertRows()
+
+    def remove(self, row: int) -> None:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.__images[row]
+        self.endRemoveRows()
+
+    def row_of(self, image: str) -> int:
+        # Only used while filtered, the rows are the indexes of the folder otherwise
+        try:
+            return self.__images.index(image)
+        except ValueError:
+            return -1
+
 
 class FileListWidget(QWidget):
     def __init__(self, parent=None):
@@ -11,16 +96,50 @@ class FileListWidget(QWidget):
 
         # Loading flag
         self.from_inside = False
+        # The list shows the images found by a scan that isn't done yet
+        self.scanning = False
+        # Only the images with a box of this label are listed, all of them if None
+        self.label_filter: str = None
 
         # Layout
         self.v_layout = QVBoxLayout()
         
         # Widgets
         self.label = QLabel("File list", self)
-        self.__list = QListWidget(self)
+        # The progress of big folders doesn't fit the width of the panel
+        self.label.setWordWrap(True)
+        # Editable, so a label not in the index yet can be typed
+        self.filter = QComboBox(self)
+        self.filter.setEditable(True)
+        self.filter.setInsertPolicy(QComboBox.NoInsert)
+        self.filter.lineEdit().setPlaceholderText("Filter by label, 'any' or 'none'")
+        # File Manager configuration
+        self.fm = Files_Manager.instance()
+        self.update_labels()
+        self.__model = FileListModel(self, self.fm.status)
+        # A table instead of a QListView, which asks the model for an index of every row
+        # when laid out, while the rows of a table are only read when shown
+        self.__list = QTableView(self)
+        self.__list.setModel(self.__model)
+        self.__list.horizontalHeader().hide()
+        self.__list.horizontalHeader().setSectionResizeMode(FileListModel.PATH_COLUMN, QHeaderView.Stretch)
+        # Fixed, sizing it to its contents would read the status of every image
+        self.__list.horizontalHeader().setSectionResizeMode(FileListModel.STATUS_COLUMN, QHeaderView.Fixed)
+        self.__list.horizontalHeader().resizeSection(FileListModel.STATUS_COLUMN, self.fontMetrics().horizontalAdvance("0000 *") + 8)
+        # Every row has the same height, so the view doesn't measure the rows to scroll
+        self.__list.verticalHeader().hide()
+        self.__list.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.__list.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 4)
+        self.__list.setShowGrid(False)
+        self.__list.setWordWrap(False)
+        self.__list.setTextElideMode(Qt.ElideLeft)
+        self.__list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.__list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.__list.setEditTriggers(QAbstractItemView.NoEditTriggers)
 
         # Add to layout
         self.v_layout.addWidget(self.label)
+        self.v_layout.addWidget(self.filter)
         self.v_layout.addWidget(self.__list)
         
         # Set layout 
@@ -32,29 +151,125 @@ class FileListWidget(QWidget):
         cm = self.contentsMargins()
         self.setContentsMargins(cm.left(), cm.top(), cm.right(), 50)
 
-        # File Manager configuration
-        self.fm = Files_Manager.instance()
         self.fm.OnLoadDir.connect(self.OnLoadDir)
+        self.fm.OnFilesFound.connect(self.OnFilesFound)
+        self.fm.OnAddImages.connect(self.OnAddImages)
+        self.fm.OnRemoveImages.connect(self.OnRemoveImages)
+        self.fm.OnStatusChanged.connect(self.OnStatusChanged)
         self.fm.OnLoadImage.connect(self.OnLoadImg)
-        self.__list.itemPressed.connect(self.OnClickItem)
+        self.__list.pressed.connect(self.OnClickItem)
+        self.filter.activated[str].connect(self.set_filter)
+        self.filter.lineEdit().editingFinished.connect(lambda: self.set_filter(self.filter.currentText()))
+
+    def set_filter(self, label: str) -> None:
+        '''
+            Lists only the images with a box of the label, all of them if empty.
 
-    @pyqtSlot(QListWidgetItem)
-    def OnClickItem(self, item: QListWidgetItem):
+            Args:
+                label (str): The label, 'any' for the images with any box and 'none' for the ones without boxes
+        '''
+        label = label.strip() or None
+        if label == self.label_filter:
+            return
+        self.label_filter = label
+        self.show_images()
+
+    def show_images(self) -> None:
+        # The images not indexed yet are left out, listed again once the index is built
+        if self.scanning:
+            return
+        self.__model.set_images(self.fm.imgs(self.label_filter))
+        self.select_current()
+
+    def update_labels(self) -> None:
+        text = self.filter.currentText()
+        self.filter.blockSignals(True)
+        self.filter.clear()
+        self.filter.addItems(["", "any", "none", *sorted(self.fm.label_index.labels())])
+        self.filter.setEditText(text)
+        self.filter.blockSignals(False)
+
+    @pyqtSlot(QModelIndex)
+    def OnClickItem(self, index: QModelIndex):
+        # By path, the rows of a folder being scanned aren't sorted yet
         self.from_inside = True
-        self.fm.load_img(item.text())
+        self.fm.load_img(self.__model.index(index.row(), FileListModel.PATH_COLUMN).data())
+        self.from_inside = False
+
+    @pyqtSlot(list)
+    def OnFilesFound(self, images: list[str]):
+        # Shown while the folder is scanned, replaced by the sorted list once it's done
+        if not self.scanning:
+            self.scanning = True
+            self.__model.set_images([])
+        self.__model.append(images)
 
     @pyqtSlot(list)
     def OnLoadDir(self, images: list[str]):
-        self.__list.clear()
+        self.scanning = False
+        self.__model.set_images(images if self.label_filter is None else self.fm.imgs(self.label_filter))
+        self.update_progress()
+
+    @pyqtSlot(list)
+    def OnAddImages(self, indexes: list[int]):
+        if self.label_filter is not None:
+            self.show_images()
+            self.update_progress()
+            return
+        # Ascending, so every row is inserted after the ones before it
+        images = self.fm.imgs()
+        for index in indexes:
+            self.__model.insert(index, images[index])
+        self.update_progress()
+
+    @pyqtSlot(list)
+    def OnRemoveImages(self, indexes: list[int]):
+        if self.label_filter is not None:
+            self.show_images()
+            self.update_progress()
+            return
+        # Descending, so the rows before the removed one don't move
+        for index in reversed(indexes):
+            self.__model.remove(index)
+        self.update_progress()
+
+    @pyqtSlot(list)
+    def OnStatusChanged(self, images: list[str]):
+        if not images:
+            # The label index was built
+            self.update_labels()
+        if self.label_filter is not None:
+            # A saved image can match the filter or stop matching it
+            self.show_images()
+        elif not self.scanning:
+            if not images:
+                self.__model.status_changed()
+            for image in images:
+                row = self.fm.index_of(image)
+                if row >= 0:
+                    self.__model.status_changed(row)
+        self.update_progress()
 
-        for img in images:
-            self.__list.addItem(img)
+    def update_progress(self) -> None:
+        progress = self.fm.progress()
+        if progress["images"] == 0:
+            self.label.setText("File list")
+            return
+        self.label.setText(f"File list\n{progress['labelled']}/{progress['images']} labelled, "
+                           f"{progress['modified']} modified")
 
     @pyqtSlot(str)
     def OnLoadImg(self, img: str):
         if self.from_inside:
             self.from_inside = False
             return
-        
-        self.__list.clearSelection()
-        self.__list.item(self.fm.img_index()).setSelected(True)
\ No newline at end of file
+        self.select_current()
+
+    def select_current(self) -> None:
+        row = self.fm.img_index() if self.label_filter is None else self.__model.row_of(self.fm.cur_img())
+        if row < 0:
+            self.__list.clearSelection()
+            return
+        index = self.__model.index(row, FileListModel.PATH_COLUMN)
+        self.__list.selectionModel().select(index, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+        self.__list.scrollTo(index)
\ No newline at end of file
@@ -1,14 +1,19 @@
 from enum import Enum
 
-from PyQt5.QtWidgets import QWidget, QAction, QMenu, QMenuBar
+from PyQt5.QtWidgets import QWidget, QAction, QActionGroup, QMenu, QMenuBar
+
+from libs.standalones.AnnotationStore import StoreType
 
 class actions(Enum):
     file = 0
     edit = 1
+    store = 2 # keyed by StoreType
 
 class fileMenu(Enum):
     open = 0
     exit = 1
+    watch = 2
+    thumbnails = 3
 
 class editMenu(Enum):
     create = 0
@@ -24,12 +29,30 @@ class MenuBar(QMenuBar):
 
         open_action = QAction("Open", parent)
         exit_action = QAction("Exit", parent)
+        watch_action = QAction("Watch folder", parent)
+        watch_action.setCheckable(True)
+        thumbnails_action = QAction("Show thumbnails", parent)
+        thumbnails_action.setCheckable(True)
 
         self.actions_dict = {
-            actions.file: {fileMenu.open: open_action, fileMenu.exit: exit_action},
+            actions.file: {fileMenu.open: open_action, fileMenu.watch: watch_action,
+                           fileMenu.thumbnails: thumbnails_action, fileMenu.exit: exit_action},
             }
 
+        # Only one store is used at a time
+        self.store_menu = QMenu("Annotation store", parent)
+        store_group = QActionGroup(parent)
+        store_names = {StoreType.voc: "Pascal VOC files", StoreType.sqlite: "SQLite database"}
+        self.actions_dict[actions.store] = {}
+        for store_type in StoreType:
+            store_action = QAction(store_names[store_type], parent)
+            store_action.setCheckable(True)
+            store_group.addAction(store_action)
+            self.actions_dict[actions.store][store_type] = store_action
+        self.store_menu.addActions(self.actions_dict[actions.store].values())
+
         self.file_menu.addActions(self.actions_dict[actions.file].values())
+        self.file_menu.insertMenu(self.actions_dict[actions.file][fileMenu.exit], self.store_menu)
 
         self.addMenu(self.file_menu)
 
@@ -20,14 +20,14 @@ class ShapesListItem(QListWidgetItem):
             return
         self.shape.selected = True
         self.canvas.selected_shapes.append(self.shape)
-        self.canvas.update()
+        self.canvas.update_shapes(self.shape)
 
     def OnDeselected(self):
         if self.shape not in self.canvas.selected_shapes:
             return
         self.shape.selected = False
         self.canvas.selected_shapes.remove(self.shape)
-        self.canvas.update()
+        self.canvas.update_shapes(self.shape)
 
     def OnNameEdit(self, name: str):
         self.setText(self.shape.name)
@@ -0,0 +1,206 @@
+from math import ceil
+
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+from libs.widgets.MenuBar import MenuBar, actions, fileMenu
+from libs.standalones.Files_Manager import Files_Manager
+from libs.standalones.ThumbnailCache import ThumbnailCache, THUMBNAIL_SIZE
+from libs.standalones.PersistentData import PersistentData, PersistentDataType
+
+class ThumbnailModel(QAbstractTableModel):
+    '''
+        The images of the folder as a grid of thumbnails, image i is at row i // columns.
+        The thumbnails are only asked for when the view shows their cell, so only the visible
+        ones are generated.
+
+        Args:
+            thumbnails (ThumbnailCache): Where the thumbnails are read from
+    '''
+    def __init__(self, parent=None, thumbnails: ThumbnailCache = None):
+        super().__init__(parent)
+        self.__images: list[str] = []
+        self.__columns = 1
+        self.__thumbnails = thumbnails
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else ceil(len(self.__images) / self.__columns)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.__columns
+
+    def image_at(self, index: QModelIndex) -> str | None:
+        i = index.row() * self.__columns + index.column()
+        if not index.isValid() or i >= len(self.__images):
+            return None
+        return self.__images[i]
+
+    def index_of(self, i: int) -> QModelIndex:
+        return self.index(i // self.__columns, i % self.__columns)
+
+    def images(self, first_row: int, last_row: int) -> list[str]:
+        return self.__images[first_row * self.__columns:(last_row + 1) * self.__columns]
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        image = self.image_at(index)
+        if image is None:
+            return None
+        if role == Qt.DecorationRole and self.__thumbnails is not None:
+            return self.__thumbnails.get(image)
+        if role == Qt.ToolTipRole:
+            return image
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if self.image_at(index) is None:
+            return Qt.NoItemFlags
+        return super().flags(index)
+
+    def thumbnail_changed(self, i: int) -> None:
+        index = self.index_of(i)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def set_columns(self, columns: int) -> None:
+        columns = max(columns, 1)
+        if columns == self.__columns:
+            return
+        self.beginResetModel()
+        self.__columns = columns
+        self.endResetModel()
+
+    def set_images(self, images: list[str]) -> None:
+        # Copied, the list of the files manager is changed before the cells are moved.
+        # Inserting an image moves every cell after it, so the grid is reset instead
+        self.beginResetModel()
+        self.__images = list(images)
+        self.endResetModel()
+
+class ThumbnailWidget(QWidget):
+    CELL_MARGIN = 6
+    ROWS = 2 # rows shown without scrolling
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+        # Loading flag
+        self.from_inside = False
+
+        # Layout
+        self.v_layout = QVBoxLayout()
+
+        # Widgets
+        self.label = QLabel("Thumbnails", self)
+        self.fm = Files_Manager.instance()
+        self.thumbnails = ThumbnailCache.instance()
+        self.__model = ThumbnailModel(self, self.thumbnails)
+        # A table like the file list, the cells of a grid of any size are only read when shown
+        cell = THUMBNAIL_SIZE + ThumbnailWidget.CELL_MARGIN
+        self.__grid = QTableView(self)
+        self.__grid.setModel(self.__model)
+        self.__grid.horizontalHeader().hide()
+        self.__grid.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.__grid.horizontalHeader().setDefaultSectionSize(cell)
+        self.__grid.verticalHeader().hide()
+        self.__grid.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.__grid.verticalHeader().setDefaultSectionSize(cell)
+        self.__grid.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.__grid.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.__grid.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.__grid.setShowGrid(False)
+        self.__grid.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.__grid.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.__grid.setFixedHeight(cell * ThumbnailWidget.ROWS + 2 * self.__grid.frameWidth())
+
+        # Add to layout
+        self.v_layout.addWidget(self.label)
+        self.v_layout.addWidget(self.__grid)
+
+        # Set layout
+        self.setLayout(self.v_layout)
+
+        show_action = MenuBar.instance().actions_dict[actions.file][fileMenu.thumbnails]
+        show_action.setChecked(PersistentData.instance()[PersistentDataType.show_thumbnails])
+        show_action.toggled.connect(self.set_shown)
+        self.setVisible(show_action.isChecked())
+
+        self.fm.OnLoadDir.connect(self.OnImagesChanged)
+        self.fm.OnAddImages.connect(self.OnImagesChanged)
+        self.fm.OnRemoveImages.connect(self.OnImagesChanged)
+        self.fm.OnLoadImage.connect(self.OnLoadImg)
+        self.thumbnails.OnThumbnail.connect(self.OnThumbnail)
+        self.__grid.pressed.connect(self.OnClickItem)
+        self.__grid.verticalScrollBar().valueChanged.connect(self.__cancel_hidden)
+
+    def set_shown(self, shown: bool) -> None:
+        PersistentData.instance()[PersistentDataType.show_thumbnails] = shown
+        self.setVisible(shown)
+        if shown:
+            self.OnImagesChanged()
+        else:
+            self.thumbnails.keep([])
+
+    def __visible_images(self) -> list[str]:
+        if not self.isVisible():
+            return []
+        first = self.__grid.rowAt(0)
+        last = self.__grid.rowAt(self.__grid.viewport().height() - 1)
+        if first < 0:
+            return []
+        return self.__model.images(first, last if last >= 0 else self.__model.rowCount() - 1)
+
+    def __cancel_hidden(self, *_):
+        # The thumbnails scrolled past before their process started them aren't generated
+        self.thumbnails.keep(self.__visible_images())
+
+    def __update_columns(self) -> None:
+        columns = self.__grid.viewport().width() // self.__grid.horizontalHeader().defaultSectionSize()
+        if max(columns, 1) != self.__model.columnCount():
+            self.__model.set_columns(columns)
+            self.__select_current()
+
+    def resizeEvent(self, a0: QResizeEvent) -> None:
+        super().resizeEvent(a0)
+        self.__update_columns()
+        self.__cancel_hidden()
+
+    @pyqtSlot(QModelIndex)
+    def OnClickItem(self, index: QModelIndex):
+        image = self.__model.image_at(index)
+        if image is None:
+            return
+        self.from_inside = True
+        self.fm.load_img(image)
+        self.from_inside = False
+
+    @pyqtSlot()
+    @pyqtSlot(list)
+    def OnImagesChanged(self, *_):
+        if not self.isVisible():
+            return
+        self.__model.set_images(self.fm.imgs())
+        self.__update_columns()
+        self.__select_current()
+
+    @pyqtSlot(str)
+    def OnThumbnail(self, image: str):
+        i = self.fm.index_of(image)
+        if i >= 0:
+            self.__model.thumbnail_changed(i)
+
+    def __select_current(self) -> None:
+        if self.fm.img_index() < 0 or self.__model.rowCount() == 0:
+            return
+        index = self.__model.index_of(self.fm.img_index())
+        self.__grid.selectionModel().select(index, QItemSelectionModel.ClearAndSelect)
+        self.__grid.scrollTo(index)
+
+    @pyqtSlot(str)
+    def OnLoadImg(self, img: str):
+        if self.from_inside:
+            self.from_inside = False
+            return
+        if not self.isVisible():
+            return
+        self.__select_current()
@@ -8,14 +8,17 @@ from PyQt5.QtGui import *
 from libs.canvas.CanvasWin import CanvasWin as Canvas
 from libs.widgets.setScale import setScale
 from libs.widgets.MainWindowManager import MainWindowManager
-from libs.widgets.MenuBar import MenuBar
+from libs.widgets.MenuBar import MenuBar, actions
 from libs.widgets.InfoWidget import InfoWidget
 from libs.widgets.ShapesList import ShapeList
 from libs.widgets.FileListWidget import FileListWidget
+from libs.widgets.ThumbnailWidget import ThumbnailWidget
 from libs.handlers.MouseManager import MouseManager
 from libs.handlers.keyboard.KeyHandler import KeyHandler
-from libs.standalones.PersistentData import PersistentData
+from libs.standalones.PersistentData import PersistentData, PersistentDataType
 from libs.standalones.Files_Manager import Files_Manager
+from libs.standalones.AnnotationSaver import AnnotationSaver
+from libs.standalones.AnnotationStore import AnnotationStore, StoreType
 
 __appname__ = "labelImg"
         
@@ -41,7 +44,15 @@ class MainWindow(QMainWindow):
         # Standalones
         self.keyHandler = KeyHandler(self)
         self.__settings = PersistentData()
+        try:
+            store_type = StoreType[self.__settings[PersistentDataType.annotation_store]]
+        except KeyError:
+            # A hand edited or outdated setting, the default store is used instead
+            print(f"Unknown annotation store '{self.__settings[PersistentDataType.annotation_store]}', using '{StoreType.voc}'")
+            store_type = StoreType.voc
+        AnnotationStore.use(store_type)
         self.files_manager = Files_Manager(self)
+        self.annotation_saver = AnnotationSaver(self)
 
         # Main widget
         self.mainWidget = MainWindowManager(parent=self)
@@ -57,6 +68,7 @@ class MainWindow(QMainWindow):
         # Utiliies
         self.shapes_list = ShapeList(self.info_widget)
         self.filelist = FileListWidget(self.info_widget)
+        self.thumbnail_list = ThumbnailWidget(self.info_widget)
         self.set_scale = setScale(self.canvas)
         #self.mouseTracker = MousePos()
         #self.viewportLogger = CoordinatesLog()
@@ -68,15 +80,43 @@ class MainWindow(QMainWindow):
         self.info_widget.v_layout.addWidget(self.set_scale)
         self.info_widget.v_layout.addWidget(self.shapes_list)
         self.info_widget.v_layout.addWidget(self.filelist)
+        self.info_widget.v_layout.addWidget(self.thumbnail_list)
         #self.win1.v_layout.addWidget(self.mouseTracker)
         #self.win1.v_layout.addWidget(self.viewportLogger)
 
+        store_actions = MenuBar.instance().actions_dict[actions.store]
+        store_actions[store_type].setChecked(True)
+        for action_type, action in store_actions.items():
+            action.triggered.connect(lambda _, action_type=action_type: self.set_store(action_type))
+
         super().resize(800, 600)
         self.showMaximized()
 
+    def set_store(self, store_type: StoreType) -> None:
+        '''
+            Reads and writes the annotations with another store, the current image is reloaded from it.
+
+            Args:
+                store_type (StoreType): The store to use
+        '''
+        if self.__settings[PersistentDataType.annotation_store] == store_type.name:
+            return
+        # The shapes being edited are written to the store they were loaded from
+        self.canvas.save_shapes()
+        self.annotation_saver.flush()
+        AnnotationStore.use(store_type)
+        self.__settings[PersistentDataType.annotation_store] = store_type.name
+        if self.canvas.cur_img is not None:
+            self.canvas.load_shapes(self.canvas.cur_img)
+        self.files_manager.reindex()
+
     def closeEvent(self, a0: QCloseEvent) -> None:
         self.keyHandler.save()
         self.__settings.save()
+        self.canvas.save_shapes()
+        self.annotation_saver.flush()
+        AnnotationStore.close_all()
+        self.files_manager.thumbnails.shutdown()
         return super().closeEvent(a0)
 
     def resizeEvent(self, a0: QResizeEvent) -> None:
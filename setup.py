@@ -249,6 +249,7 @@ def Setup():
         entry_points={
             "console_scripts": [
                 "labelapp=FromAlias:main",
+                "labelapp-convert=convert:main",
             ]
         },
         # install_requires=[
@@ -0,0 +1,50 @@
+import sys
+import os
+import subprocess
+import tempfile
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from PyQt5.QtGui import QImage
+
+# Run in a new process per loader, the peak RSS of a process never goes down
+MEASURE = '''
+import sys, resource
+sys.path.append({parent_dir!r})
+from PyQt5.QtGui import QImage
+from libs.standalones.ImagePrefetcher import decode_image
+
+def legacy_decode(path):
+    # The loader used before decode_image read the files with QImageReader
+    return QImage.fromData(open(path, "rb").read())
+
+# The current RSS, the peak one may come from the imports
+with open('/proc/self/status') as f:
+    before = next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+image = {loader}({path!r})
+assert not image.isNull()
+print(before, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+def make_png(path: str, width: int, height: int) -> None:
+    # Noise doesn't compress, so the file is about as big as the pixels
+    image = QImage(os.urandom(width * height * 4), width, height, width * 4, QImage.Format_ARGB32)
+    assert image.save(path, "PNG", 0)
+
+def peak_rss_mb(loader: str, path: str) -> tuple[float, float]:
+    code = MEASURE.format(parent_dir=parent_dir, loader=loader, path=path)
+    before, after = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+    return int(before) / 1024, int(after) / 1024
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "big.png")
+        make_png(path, 3600, 3600)
+        print(f"{os.path.getsize(path) / 2**20:.1f}MB png, {3600 * 3600 * 4 / 2**20:.1f}MB decoded")
+        for loader in ("legacy_decode", "decode_image"):
+            before, after = peak_rss_mb(loader, path)
+            print(f"{loader:>14}: peak RSS {after:.1f}MB, {after - before:.1f}MB over the RSS before decoding")
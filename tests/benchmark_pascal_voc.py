@@ -0,0 +1,81 @@
+import sys
+import os
+import tempfile
+from timeit import timeit
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element, SubElement
+from lxml import etree
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.pascal_voc_io import PascalVocWriter
+
+def legacy_xml(writer: PascalVocWriter) -> bytes:
+    '''
+        The serializer PascalVocWriter used before writing with lxml in a single pass:
+        ElementTree tree, re-parsed by lxml, pretty-printed and indented by replacing spaces.
+    '''
+    top = Element('annotation')
+    SubElement(top, 'folder').text = writer.folder_name
+    SubElement(top, 'filename').text = writer.filename
+    if writer.local_img_path is not None:
+        SubElement(top, 'path').text = writer.local_img_path
+    source = SubElement(top, 'source')
+    SubElement(source, 'database').text = writer.database_src
+    size_part = SubElement(top, 'size')
+    SubElement(size_part, 'width').text = str(writer.img_size[0])
+    SubElement(size_part, 'height').text = str(writer.img_size[1])
+    SubElement(size_part, 'depth').text = str(writer.img_size[2]) if len(writer.img_size) == 3 else '1'
+    SubElement(top, 'segmented').text = '0'
+
+    for each_object in writer.box_list:
+        object_item = SubElement(top, 'object')
+        SubElement(object_item, 'name').text = each_object['name']
+        SubElement(object_item, 'pose').text = "Unspecified"
+        truncated = SubElement(object_item, 'truncated')
+        if int(float(each_object['ymax'])) == int(float(writer.img_size[0])) or (int(float(each_object['ymin'])) == 1):
+            truncated.text = "1"
+        elif (int(float(each_object['xmax'])) == int(float(writer.img_size[1]))) or (int(float(each_object['xmin'])) == 1):
+            truncated.text = "1"
+        else:
+            truncated.text = "0"
+        SubElement(object_item, 'difficult').text = "0"
+        bnd_box = SubElement(object_item, 'bndbox')
+        for key in ('xmin', 'ymin', 'xmax', 'ymax'):
+            SubElement(bnd_box, key).text = str(each_object[key])
+
+    rough_string = ElementTree.tostring(top, 'utf8')
+    root = etree.fromstring(rough_string)
+    return etree.tostring(root, pretty_print=True, encoding='utf-8').replace("  ".encode(), "\t".encode())
+
+def new_writer(objects: int) -> PascalVocWriter:
+    writer = PascalVocWriter("imgs", "img.jpg", (1920, 1080, 3), local_img_path="/data/imgs/img.jpg")
+    for i in range(objects):
+        writer.add_bnd_box(i % 1900, i % 1000, i % 1900 + 20, i % 1000 + 80, f"label{i % 7}")
+    return writer
+
+def new_xml(writer: PascalVocWriter) -> bytes:
+    root = writer.gen_xml()
+    writer.append_objects(root)
+    return writer.prettify(root)
+
+def legacy_save(writer: PascalVocWriter, path: str) -> None:
+    # The old save decoded the bytes and encoded them again through codecs
+    import codecs
+    with codecs.open(path, 'w', encoding='utf-8') as out_file:
+        out_file.write(legacy_xml(writer).decode('utf8'))
+
+if __name__ == '__main__':
+    runs = 200
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "img.xml")
+        for objects in (1, 100, 1000):
+            writer = new_writer(objects)
+            assert legacy_xml(writer) == new_xml(writer)
+            old = timeit(lambda: legacy_save(writer, path), number=runs) / runs
+            new = timeit(lambda: writer.save(path), number=runs) / runs
+            print(f"{objects:>5} objects: old {old * 1000:.3f}ms, new {new * 1000:.3f}ms, {old / new:.2f}x")
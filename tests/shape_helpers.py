@@ -0,0 +1,7 @@
+from libs.canvas.Shape import Shape
+from libs.widgets.ShapePoints import ShapePoints
+from libs.standalones.Vector import Vector2Int
+
+def new_shape(x_min: int, y_min: int, x_max: int, y_max: int, name: str = "test") -> Shape:
+    # A box shape from its corners, shared by the canvas tests
+    return Shape(name, ShapePoints.square(Vector2Int(x_min, y_min), Vector2Int(x_max, y_max)))
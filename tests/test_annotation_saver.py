@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from unittest import mock
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.AnnotationSaver import AnnotationSaver, AnnotationSnapshot
+from libs.standalones.AnnotationStore import VocStore
+from libs.standalones.pascal_voc_io import PascalVocReader, xml_path_for
+
+class TestAnnotationSaver(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.img_path = os.path.join(self.dir.name, "img.jpg")
+        self.xml_path = os.path.join(self.dir.name, "img.xml")
+        self.saver = AnnotationSaver()
+
+    def new_snapshot(self, *boxes: tuple[int, int, int, int, str]) -> AnnotationSnapshot:
+        return AnnotationSnapshot("imgs", "img.jpg", (100, 100, 3), self.img_path, tuple(boxes))
+
+    def tearDown(self):
+        self.saver.flush()
+        self.dir.cleanup()
+
+    def test_save(self):
+        # Test the snapshot is written and can be read back
+        self.saver.save(self.new_snapshot((10, 10, 50, 50, "cat")))
+        self.saver.wait(self.img_path)
+
+        shapes = PascalVocReader(self.xml_path).get_shapes()
+        self.assertEqual([(shape.name, shape.top_left().x, shape.bot_right().y) for shape in shapes], [("cat", 10, 50)])
+        self.assertEqual(os.listdir(self.dir.name), ["img.xml"])
+
+    def test_latest_wins(self):
+        # Test saving the same file repeatedly leaves the latest snapshot on disk
+        for i in range(20):
+            self.saver.save(self.new_snapshot((i, i, 50, 50, f"label{i}")))
+        self.saver.flush()
+
+        shapes = PascalVocReader(self.xml_path).get_shapes()
+        self.assertEqual([shape.name for shape in shapes], ["label19"])
+
+    def test_skip_unchanged(self):
+        # Test the file isn't written when the boxes are the ones it was loaded with
+        boxes = ((10, 10, 50, 50, "cat"),)
+        self.assertFalse(self.saver.save(self.new_snapshot(*boxes), boxes))
+        self.assertTrue(self.saver.save(self.new_snapshot((0, 0, 5, 5, "dog")), boxes))
+        self.saver.flush()
+
+        self.assertEqual(self.saver.stats()["skipped"], 1)
+        self.assertEqual(self.saver.stats()["written"], 1)
+
+    def test_write_error(self):
+        # Test an annotation that can't be written doesn't leave the waiters of the image blocked
+        with mock.patch.object(VocStore, 'write', side_effect=ValueError("All strings must be XML compatible")):
+            self.saver.save(self.new_snapshot((10, 10, 50, 50, "bad\x01label")))
+            waiter = threading.Thread(target=self.saver.wait, args=(self.img_path,))
+            waiter.start()
+            waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(self.saver.stats()["failed"], 1)
+
+        # The next save of the image is written
+        self.saver.save(self.new_snapshot((10, 10, 50, 50, "cat")))
+        self.saver.wait(self.img_path)
+        self.assertTrue(os.path.exists(self.xml_path))
+
+    def test_xml_path_for(self):
+        # Test only the extension is replaced
+        self.assertEqual(xml_path_for("/data/jpg_images/a.jpg"), "/data/jpg_images/a.xml")
+        self.assertEqual(xml_path_for("/data/b.png"), "/data/b.xml")
+
+if __name__ == '__main__':
+    unittest.main()
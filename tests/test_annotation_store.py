@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.AnnotationStore import AnnotationStore, AnnotationSnapshot, SqliteStore, VocStore, StoreType
+from libs.standalones.pascal_voc_io import PascalVocReader, xml_path_for
+
+class TestSqliteStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.images = [os.path.join(self.dir.name, f"img{i}.jpg") for i in range(3)]
+        self.store = SqliteStore(os.path.join(self.dir.name, SqliteStore.DB_NAME))
+
+    def tearDown(self):
+        self.store.close()
+        AnnotationStore.use(StoreType.voc)
+        self.dir.cleanup()
+
+    def snapshot(self, image: str, *boxes: tuple[int, int, int, int, str]) -> AnnotationSnapshot:
+        return AnnotationSnapshot("imgs", os.path.basename(image), (100, 80, 3), image, tuple(boxes))
+
+    def test_write_read(self):
+        # Test the boxes are read back in order and replaced by the next write
+        self.store.write(self.snapshot(self.images[0], (1, 2, 3, 4, "cat"), (5, 6, 7, 8, "dog")))
+        self.assertEqual(self.store.read(self.images[0]), [("cat", 1, 2, 3, 4), ("dog", 5, 6, 7, 8)])
+
+        self.store.write(self.snapshot(self.images[0], (9, 9, 9, 9, "bird")))
+        self.assertEqual(self.store.read(self.images[0]), [("bird", 9, 9, 9, 9)])
+        self.assertEqual(self.store.read(self.images[1]), [])
+
+    def test_label_counts(self):
+        # Test the label counts of the images in the database
+        self.store.write(self.snapshot(self.images[0], (1, 2, 3, 4, "cat"), (5, 6, 7, 8, "cat")))
+        self.store.write(self.snapshot(self.images[1]))
+
+        self.assertEqual(self.store.label_counts(self.images), {self.images[0]: {"cat": 2}, self.images[1]: {}})
+
+    def test_import_export(self):
+        # Test annotations survive a round trip through the xml files
+        VocStore().write(self.snapshot(self.images[0], (1, 2, 3, 4, "cat")))
+        self.assertEqual(self.store.import_voc(self.images), 1)
+        os.remove(xml_path_for(self.images[0]))
+
+        self.store.write(self.snapshot(self.images[1], (5, 6, 7, 8, "dog")))
+        self.assertEqual(self.store.export_voc(), 2)
+        self.assertEqual(PascalVocReader(self.images[0]).get_boxes(), [("cat", 1, 2, 3, 4)])
+        self.assertEqual(PascalVocReader(self.images[1]).get_boxes(), [("dog", 5, 6, 7, 8)])
+
+    def test_for_image(self):
+        # Test the store of a folder is chosen by the settings and shared by its images
+        AnnotationStore.use(StoreType.sqlite)
+        store = AnnotationStore.for_image(self.images[0])
+        self.assertIsInstance(store, SqliteStore)
+        self.assertIs(AnnotationStore.for_image(self.images[1]), store)
+
+    def test_incomplete_store(self):
+        # Test a store missing a method fails when it's created instead of when it's used
+        class ReadOnlyStore(AnnotationStore):
+            def read(self, img_path, img_size=(0, 0)):
+                return []
+
+        with self.assertRaises(TypeError):
+            ReadOnlyStore()
+
+if __name__ == '__main__':
+    unittest.main()
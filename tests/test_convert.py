@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+import convert
+from libs.standalones.pascal_voc_io import PascalVocWriter, PascalVocReader
+from libs.standalones.AnnotationStore import SqliteStore
+
+class TestConvert(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.voc = os.path.join(self.dir.name, "voc")
+        os.makedirs(self.voc)
+        for i, labels in enumerate([["dog", "cat"], [], ["cat"]]):
+            writer = PascalVocWriter("voc", f"img{i}.jpg", (200, 100, 3))
+            for label in labels:
+                writer.add_bnd_box(10, 20, 50, 60, label)
+            writer.save(os.path.join(self.voc, f"img{i}.xml"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_yolo(self):
+        # Test the YOLO files use the sorted labels as class ids
+        yolo = os.path.join(self.dir.name, "yolo")
+        self.assertEqual(convert.main([self.voc, "--yolo", yolo, "--workers", "1"]), 0)
+
+        with open(os.path.join(yolo, "classes.txt")) as f:
+            self.assertEqual(f.read(), "cat\ndog\n")
+        with open(os.path.join(yolo, "img0.txt")) as f:
+            self.assertEqual(f.read(), "1 0.150000 0.400000 0.200000 0.400000\n0 0.150000 0.400000 0.200000 0.400000\n")
+        with open(os.path.join(yolo, "img1.txt")) as f:
+            self.assertEqual(f.read(), "")
+
+    def test_coco(self):
+        # Test the COCO file written incrementally is a valid dataset
+        coco = os.path.join(self.dir.name, "coco.json")
+        self.assertEqual(convert.main([self.voc, "--coco", coco, "--workers", "2"]), 0)
+
+        with open(coco) as f:
+            dataset = json.load(f)
+        self.assertEqual([image["file_name"] for image in dataset["images"]], ["img0.jpg", "img1.jpg", "img2.jpg"])
+        self.assertEqual([(a["image_id"], a["category_id"], a["bbox"]) for a in dataset["annotations"]],
+                         [(1, 2, [10, 20, 40, 40]), (1, 1, [10, 20, 40, 40]), (3, 1, [10, 20, 40, 40])])
+        self.assertEqual([c["name"] for c in dataset["categories"]], ["cat", "dog"])
+
+    def test_import_export_voc(self):
+        # Test the xml files go into the database of the folder and come back out of it
+        for i in range(3):
+            open(os.path.join(self.voc, f"img{i}.jpg"), 'w').close()
+        self.assertEqual(convert.main([self.voc, "--import-voc"]), 0)
+        store = SqliteStore(os.path.join(self.voc, SqliteStore.DB_NAME))
+        try:
+            self.assertEqual(store.label_counts([os.path.join(self.voc, "img0.jpg")]),
+                             {os.path.join(self.voc, "img0.jpg"): {"dog": 1, "cat": 1}})
+        finally:
+            store.close()
+
+        for i in range(3):
+            os.remove(os.path.join(self.voc, f"img{i}.xml"))
+        yolo = os.path.join(self.dir.name, "yolo")
+        self.assertEqual(convert.main([self.voc, "--export-voc", "--yolo", yolo, "--workers", "1"]), 0)
+        self.assertEqual(PascalVocReader(os.path.join(self.voc, "img2.xml")).get_boxes(), [("cat", 10, 20, 50, 60)])
+        self.assertEqual(sorted(os.listdir(yolo)), ["classes.txt", "img0.txt", "img1.txt", "img2.txt"])
+
+    def test_import_and_export(self):
+        with self.assertRaises(SystemExit):
+            convert.main([self.voc, "--import-voc", "--export-voc"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+from PyQt5.QtCore import Qt, QEventLoop, QTimer
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.widgets.MenuBar import MenuBar
+from libs.handlers.keyboard.KeyHandler import KeyHandler
+from libs.standalones.Files_Manager import Files_Manager
+from libs.standalones.PersistentData import PersistentData, PersistentDataType
+from libs.standalones.LabelIndex import ImageStatus
+from libs.standalones.pascal_voc_io import PascalVocWriter, xml_path_for
+
+# Kept for the whole run, the global thread pool used by the other tests is destroyed with the application
+app = QApplication.instance() or QApplication([])
+
+class TestFilesManager(unittest.TestCase):
+    def setUp(self):
+        # The settings and the label index are saved relative to the working directory
+        self.dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir.name)
+        self.folder = os.path.join(self.dir.name, "imgs")
+        os.makedirs(self.folder)
+
+        self.images = [self.new_image(f"img{i}.jpg") for i in range(6)]
+        self.annotate(self.images[1], ["cat"])
+        self.annotate(self.images[3], ["cat", "dog"])
+        # Annotated without boxes, still unlabelled
+        self.annotate(self.images[4], [])
+
+        # The menu and the keyboard hooks of the window aren't needed
+        self.patches = [mock.patch.object(MenuBar, 'instance'), mock.patch.object(KeyHandler, 'instance')]
+        for patch in self.patches:
+            patch.start()
+        PersistentData()[PersistentDataType.watch_folder] = False
+        self.fm = Files_Manager()
+
+    def tearDown(self):
+        self.fm.close_folder()
+        self.fm.thumbnails.shutdown()
+        Files_Manager._Files_Manager__instance = None
+        for patch in self.patches:
+            patch.stop()
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def annotate(self, image: str, labels: list[str]) -> None:
+        writer = PascalVocWriter("imgs", os.path.basename(image), (30, 40, 3))
+        for label in labels:
+            writer.add_bnd_box(1, 1, 10, 10, label)
+        writer.save(xml_path_for(image))
+
+    def new_image(self, name: str) -> str:
+        path = os.path.join(self.folder, name)
+        image = QImage(40, 30, QImage.Format_RGB32)
+        image.fill(Qt.gray)
+        image.save(path)
+        return path
+
+    def open_folder(self) -> None:
+        # Waits for the images to be listed and the label index to be built
+        loop = QEventLoop()
+        self.fm.OnStatusChanged.connect(lambda images: not images and loop.quit())
+        QTimer.singleShot(10000, loop.quit)
+        self.fm.load_folder(self.folder)
+        loop.exec()
+
+    def test_next_unlabelled(self):
+        # Test the images with boxes are skipped, starting over from the first image
+        self.open_folder()
+        self.assertEqual(self.fm.cur_img(), self.images[0])
+
+        loaded = [self.fm.next_unlabelled() for _ in range(4)]
+        self.assertEqual(loaded, [self.images[2], self.images[4], self.images[5], self.images[0]])
+        self.assertEqual(self.fm.cur_img(), self.images[0])
+
+        # From an image with boxes, the next one without boxes after it
+        self.fm.load_img(self.images[3])
+        self.assertEqual(self.fm.next_unlabelled(), self.images[4])
+
+    def test_saved(self):
+        # Test a saved image is skipped once it has boxes, and nothing is loaded once every image has them
+        self.open_folder()
+        self.fm.label_index.update(self.images[2], ["dog"])
+        self.assertEqual(self.fm.next_unlabelled(), self.images[4])
+
+        for image in (self.images[0], self.images[4]):
+            self.fm.label_index.update(image, ["cat"])
+        self.assertEqual(self.fm.next_unlabelled(), self.images[5])
+        self.assertIsNone(self.fm.next_unlabelled())
+        self.fm.label_index.update(self.images[5], ["cat"])
+        self.assertIsNone(self.fm.next_unlabelled())
+
+    def test_progress(self):
+        # Test the counts of images with and without boxes follow the saved annotations
+        self.open_folder()
+        self.assertEqual(self.fm.progress(), {"images": 6, "labelled": 2, "unlabelled": 4, "modified": 0})
+
+        self.fm.label_index.update(self.images[0], ["cat"])
+        self.fm.label_index.update(self.images[1], [])
+        self.assertEqual(self.fm.progress(), {"images": 6, "labelled": 2, "unlabelled": 4, "modified": 2})
+        self.fm.label_index.update(self.images[2], ["dog"])
+        self.assertEqual(self.fm.progress(), {"images": 6, "labelled": 3, "unlabelled": 3, "modified": 3})
+
+    def test_added_with_annotation(self):
+        # Test an image added with its annotation, like the watcher does, is indexed as labelled
+        self.open_folder()
+        added = self.new_image("img2b.jpg")
+        self.annotate(added, ["cat", "cat"])
+        unlabelled = self.new_image("img4b.jpg")
+
+        loop = QEventLoop()
+        self.fm.OnStatusChanged.connect(lambda images: loop.quit())
+        QTimer.singleShot(10000, loop.quit)
+        self.fm.add_images([added, unlabelled])
+        loop.exec()
+
+        self.assertEqual(self.fm.status(added), (ImageStatus.labelled, 2, False))
+        self.assertEqual(self.fm.status(unlabelled), (ImageStatus.not_annotated, 0, False))
+        self.assertEqual(self.fm.progress(), {"images": 8, "labelled": 3, "unlabelled": 5, "modified": 0})
+        self.assertEqual(self.fm.imgs("cat"), [self.images[1], added, self.images[3]])
+
+        self.fm.load_img(self.images[1])
+        self.assertEqual(self.fm.next_unlabelled(), self.images[2])
+        self.assertEqual(self.fm.next_unlabelled(), self.images[4])
+        self.assertEqual(self.fm.next_unlabelled(), unlabelled)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import tempfile
+import json
+
+from PyQt5.QtCore import Qt
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.FolderScanner import FolderScanner
+from libs.standalones.Utils import utils
+
+class TestFolderScanner(unittest.TestCase):
+    def setUp(self):
+        # The manifest is saved relative to the working directory, like the other settings
+        self.dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir.name)
+
+        self.folder = os.path.join(self.dir.name, "imgs")
+        os.makedirs(self.folder)
+        for name in ["img10.jpg", "img2.png", "IMG1.jpg", "notes.txt", "img2.xml"]:
+            self.touch(name)
+        self.scanner = FolderScanner()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def touch(self, name: str) -> None:
+        open(os.path.join(self.folder, name), 'w').close()
+
+    def age(self, mtime: int) -> None:
+        # Old enough for the manifest of the folder to be trusted
+        os.utime(self.folder, (mtime, mtime))
+
+    def scan(self) -> list[str]:
+        scanned = []
+        self.scanner.OnScanned.connect(lambda folder, images, keys: scanned.extend(images), Qt.DirectConnection)
+        self.scanner.scan(self.folder)
+        self.scanner.wait()
+        self.scanner.OnScanned.disconnect()
+        return scanned
+
+    def test_natural_order(self):
+        images = self.scan()
+        self.assertEqual([os.path.basename(image) for image in images], ["IMG1.jpg", "img2.png", "img10.jpg"])
+
+        names = [os.path.basename(image) for image in images]
+        utils.natural_sort(names, key=lambda s: s.lower())
+        self.assertEqual(names, ["IMG1.jpg", "img2.png", "img10.jpg"])
+
+    def test_manifest(self):
+        self.age(1000)
+        self.scan()
+        self.assertEqual((self.scanner.listed, self.scanner.reused), (5, 0))
+
+        # The folder didn't change, it isn't listed again
+        self.assertEqual(len(self.scan()), 3)
+        self.assertEqual((self.scanner.listed, self.scanner.reused), (0, 3))
+
+        # A new image changes the mtime of the folder
+        self.touch("img3.jpg")
+        self.age(2000)
+        images = self.scan()
+        self.assertEqual([os.path.basename(image) for image in images], ["IMG1.jpg", "img2.png", "img3.jpg", "img10.jpg"])
+        self.assertEqual((self.scanner.listed, self.scanner.reused), (6, 3))
+
+    def test_old_manifest(self):
+        # A manifest of an older version isn't reused, its entries don't have the same fields
+        self.age(1000)
+        os.makedirs(os.path.dirname(FolderScanner.manifest_path(self.folder)))
+        with open(FolderScanner.manifest_path(self.folder), 'w') as f:
+            f.write(json.dumps({"mtime_ns": os.stat(self.folder).st_mtime_ns, "trusted": True,
+                                "entries": [["IMG1.jpg", 0, 0, "img1"]]}))
+        self.assertEqual(len(self.scan()), 3)
+        self.assertEqual((self.scanner.listed, self.scanner.reused), (5, 0))
+
+    def test_recent_folder(self):
+        # A folder changed right before its scan is listed again, its mtime may not show the next change
+        self.scan()
+        self.scan()
+        self.assertEqual(self.scanner.listed, 5)
+
+if __name__ == '__main__':
+    unittest.main()
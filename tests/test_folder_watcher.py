@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import tempfile
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.FolderWatcher import FolderWatcher
+
+class TestFolderWatcher(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.dir = tempfile.TemporaryDirectory()
+        self.images = [self.touch(f"img{i}.jpg") for i in range(3)]
+
+        self.changes = []
+        self.watcher = FolderWatcher()
+        self.watcher.OnChanged.connect(lambda added, removed: self.changes.append((added, removed)))
+        self.watcher.watch(self.dir.name, self.images)
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.dir.cleanup()
+
+    def touch(self, name: str) -> str:
+        path = os.path.join(self.dir.name, name)
+        open(path, 'w').close()
+        return path
+
+    def wait_changes(self, timeout_ms: int = 3000) -> None:
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.timeout.connect(lambda: self.changes and loop.quit())
+        timer.start(20)
+        QTimer.singleShot(timeout_ms, loop.quit)
+        loop.exec()
+
+    def test_diff(self):
+        # Test many changes are sent once, without the files that aren't images
+        new = [self.touch(f"new{i}.png") for i in range(5)]
+        self.touch("notes.txt")
+        os.remove(self.images[1])
+        self.wait_changes()
+
+        self.assertEqual(self.changes, [(sorted(new), [self.images[1]])])
+
+    def test_stop(self):
+        self.watcher.stop()
+        self.touch("new.jpg")
+        self.wait_changes(FolderWatcher.DEBOUNCE_MS * 2)
+        self.assertEqual(self.changes, [])
+
+    def test_refresh(self):
+        # Test the changes made while not watching are sent when watching again
+        self.watcher.stop()
+        new = self.touch("new.jpg")
+        os.remove(self.images[0])
+        self.watcher.watch(self.dir.name, self.images)
+        self.watcher.refresh()
+        self.wait_changes()
+
+        self.assertEqual(self.changes, [([new], [self.images[0]])])
+
+if __name__ == '__main__':
+    unittest.main()
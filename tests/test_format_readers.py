@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.FormatReaders import FormatReaders, FormatReader, YoloFormat, CocoFormat
+from libs.standalones.pascal_voc_io import PascalVocWriter
+from libs.standalones.yolo_io import read_yolo, write_classes
+
+class TestFormatReaders(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def path(self, *parts: str) -> str:
+        path = os.path.join(self.dir.name, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def write(self, path: str, content: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_read_yolo(self):
+        txt = self.path("img.txt")
+        self.write(txt, "0 0.5 0.5 0.2 0.4\n1 0.05 0.5 0.2 0.2\n7 0.5 0.5 1 1\n")
+        boxes = read_yolo(txt, (200, 100), ["dog", "cat"])
+        self.assertEqual(boxes, [("dog", 80, 30, 120, 70), ("cat", 0, 40, 30, 60), ("7", 0, 0, 200, 100)])
+
+    def test_yolo_labels_folder(self):
+        img = self.path("images", "img.jpg")
+        self.write(self.path("labels", "img.txt"), "1 0.5 0.5 0.5 0.5\n")
+        write_classes(self.path("labels", "classes.txt"), ["dog", "cat"])
+
+        reader = YoloFormat()
+        self.assertTrue(reader.has_annotation(img))
+        self.assertEqual(reader.read(img, (100, 100)), [("cat", 25, 25, 75, 75)])
+        # Without the size of the image the relative coordinates can't be read
+        self.assertEqual(reader.read(img, (0, 0)), [])
+
+    def test_coco_index(self):
+        img = self.path("images", "b.jpg")
+        self.write(self.path("instances.json"), json.dumps({
+            "images": [{"id": 1, "file_name": "a.jpg"}, {"id": 2, "file_name": "images/b.jpg"}],
+            "annotations": [{"id": 1, "image_id": 2, "category_id": 3, "bbox": [10, 20, 30, 40]}],
+            "categories": [{"id": 3, "name": "dog"}]}))
+        self.write(self.path("images", "other.json"), '{"not": "coco"}')
+
+        reader = CocoFormat()
+        self.assertTrue(reader.has_annotation(img))
+        self.assertTrue(reader.has_annotation(self.path("images", "a.jpg")))
+        self.assertFalse(reader.has_annotation(self.path("images", "c.jpg")))
+        self.assertEqual(reader.read(img, (0, 0)), [("dog", 10, 20, 40, 60)])
+        self.assertEqual(reader.read(self.path("images", "a.jpg"), (0, 0)), [])
+
+    def test_coco_edited(self):
+        # Test an edited json file is parsed again, a new one once the cache is cleared
+        img = self.path("a.jpg")
+        json_path = self.path("instances.json")
+        dataset = {"images": [{"id": 1, "file_name": "a.jpg"}],
+                   "annotations": [{"id": 1, "image_id": 1, "category_id": 1, "bbox": [0, 0, 10, 10]}],
+                   "categories": [{"id": 1, "name": "cat"}]}
+        self.write(json_path, json.dumps(dataset))
+        reader = CocoFormat()
+        self.assertEqual(reader.read(img, (0, 0)), [("cat", 0, 0, 10, 10)])
+
+        dataset["categories"][0]["name"] = "dog"
+        self.write(json_path, json.dumps(dataset))
+        os.utime(json_path, ns=(1_000_000_000, 1_000_000_000))
+        self.assertEqual(reader.read(img, (0, 0)), [("dog", 0, 0, 10, 10)])
+
+        os.remove(json_path)
+        dataset["categories"][0]["name"] = "bird"
+        self.write(self.path("other.json"), json.dumps(dataset))
+        reader.clear()
+        self.assertEqual(reader.read(img, (0, 0)), [("bird", 0, 0, 10, 10)])
+
+    def test_incomplete_format(self):
+        # Test a format missing a method fails when it's created instead of when an image is read
+        class NameOnlyFormat(FormatReader):
+            def has_annotation(self, img_path):
+                return False
+
+        with self.assertRaises(TypeError):
+            NameOnlyFormat()
+
+    def test_voc_first(self):
+        img = self.path("img.jpg")
+        self.write(self.path("img.txt"), "0 0.5 0.5 1 1\n")
+        self.assertEqual(FormatReaders.read(img, (10, 10)), [("0", 0, 0, 10, 10)])
+
+        writer = PascalVocWriter("", "img.jpg", (10, 10, 3))
+        writer.add_bnd_box(1, 2, 3, 4, "dog")
+        writer.save(self.path("img.xml"))
+        self.assertEqual(FormatReaders.reader_for(img).name, "voc")
+        self.assertEqual(FormatReaders.read(img, (10, 10)), [("dog", 1, 2, 3, 4)])
+
+    def test_not_annotated(self):
+        self.assertIsNone(FormatReaders.reader_for(self.path("img.jpg")))
+        self.assertEqual(FormatReaders.read(self.path("img.jpg"), (10, 10)), [])
+
+if __name__ == '__main__':
+    unittest.main()
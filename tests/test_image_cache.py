@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from PyQt5.QtGui import QImage
+
+from libs.standalones.ImageCache import ImageCache
+
+def new_image(width: int, height: int) -> QImage:
+    return QImage(width, height, QImage.Format_RGB32)
+
+class TestImageCache(unittest.TestCase):
+    def test_image_bytes(self):
+        # Test the accounting uses width * height * depth
+        t = ImageCache.image_bytes(new_image(100, 50))
+        self.assertEqual(t, 100 * 50 * 4)
+
+    def test_hit_miss(self):
+        # Test the counters of get
+        cache = ImageCache(1)
+        cache.put("a", new_image(10, 10))
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_lru_eviction(self):
+        # Test the least recently used image is evicted when the budget is exceeded
+        # 512x512 RGB32 images are 1MB each
+        cache = ImageCache(2)
+        cache.put("a", new_image(512, 512))
+        cache.put("b", new_image(512, 512))
+        cache.get("a")
+        cache.put("c", new_image(512, 512))
+
+        self.assertEqual("a" in cache, True)
+        self.assertEqual("b" in cache, False)
+        self.assertEqual("c" in cache, True)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.used_bytes(), 2 * 1024 * 1024)
+
+    def test_peek(self):
+        # Test peeking doesn't change the counters or the order of eviction
+        cache = ImageCache(2)
+        cache.put("a", new_image(512, 512))
+        cache.put("b", new_image(512, 512))
+
+        self.assertIsNotNone(cache.peek("a"))
+        self.assertIsNone(cache.peek("c"))
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+        cache.put("c", new_image(512, 512))
+        self.assertEqual("a" in cache, False)
+
+    def test_bigger_than_budget(self):
+        # Test an image bigger than the budget is not stored
+        cache = ImageCache(1)
+        cache.put("a", new_image(1024, 1024))
+
+        self.assertEqual("a" in cache, False)
+        self.assertEqual(cache.used_bytes(), 0)
+
+    def test_replace_and_budget(self):
+        # Test replacing a key doesn't count the old image and shrinking the budget evicts
+        cache = ImageCache(4)
+        cache.put("a", new_image(512, 512))
+        cache.put("a", new_image(512, 512))
+        cache.put("b", new_image(512, 512))
+        self.assertEqual(cache.used_bytes(), 2 * 1024 * 1024)
+
+        cache.set_budget(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual("b" in cache, True)
+
+if __name__ == '__main__':
+    unittest.main()
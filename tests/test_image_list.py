@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.ImageList import ImageList
+from libs.standalones.Utils import utils
+
+class TestImageList(unittest.TestCase):
+    def setUp(self):
+        self.images = ImageList([f"/imgs/img{i}.jpg" for i in (1, 2, 10, 20)])
+
+    def names(self) -> list[str]:
+        return [os.path.basename(path) for path in self.images.paths()]
+
+    def test_index(self):
+        self.assertEqual(self.images.index("/imgs/img10.jpg"), 2)
+        self.assertEqual(self.images.index("/imgs/img3.jpg"), -1)
+        self.assertIn("/imgs/img20.jpg", self.images)
+        self.assertEqual(self.images[1], "/imgs/img2.jpg")
+
+    def test_insert(self):
+        # Test the new images go to their natural position and the indexes follow
+        indexes = self.images.add(["/imgs/img15.jpg", "/imgs/img3.jpg", "/imgs/img10.jpg", "/imgs/IMG0.jpg"])
+        self.assertEqual(indexes, [0, 3, 5])
+        self.assertEqual(self.names(), ["IMG0.jpg", "img1.jpg", "img2.jpg", "img3.jpg", "img10.jpg", "img15.jpg", "img20.jpg"])
+        for i, path in enumerate(self.images.paths()):
+            self.assertEqual(self.images.index(path), i)
+
+    def test_merge(self):
+        # Test many new images are merged in the same order as sorting everything again
+        new = [f"/imgs/img{i}.png" for i in range(0, 300, 3)]
+        self.assertGreaterEqual(len(new), ImageList.MERGE_MIN)
+        indexes = self.images.add(new)
+
+        expected = [f"/imgs/img{i}.jpg" for i in (1, 2, 10, 20)] + new
+        utils.natural_sort(expected, key=lambda s: os.path.basename(s).lower())
+        self.assertEqual(self.images.paths(), expected)
+        self.assertEqual(indexes, [expected.index(path) for path in new])
+        self.assertEqual(self.images.index("/imgs/img20.jpg"), expected.index("/imgs/img20.jpg"))
+
+    def test_remove(self):
+        # Test the removed images return their old indexes and the others are found at their new ones
+        self.assertEqual(self.images.remove(["/imgs/img20.jpg", "/imgs/img1.jpg", "/imgs/img3.jpg"]), [0, 3])
+        self.assertEqual(self.names(), ["img2.jpg", "img10.jpg"])
+        self.assertEqual(self.images.index("/imgs/img10.jpg"), 1)
+        self.assertEqual(self.images.index("/imgs/img1.jpg"), -1)
+
+        self.assertEqual(self.images.add(["/imgs/img1.jpg"]), [0])
+        self.assertEqual(self.images.index("/imgs/img10.jpg"), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from PyQt5.QtCore import QSize, QEventLoop, QTimer
+from PyQt5.QtGui import QImage, QColor
+from PyQt5.QtWidgets import QApplication
+
+from libs.standalones.ImagePrefetcher import ImagePrefetcher, decode_preview
+from libs.canvas.ImagePyramid import ImagePyramid
+
+# Kept for the whole run, the decoded images are sent through the event loop
+app = QApplication.instance() or QApplication([])
+
+def save_image(path: str, width: int, height: int) -> None:
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    image.save(path)
+
+class TestDecodePreview(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_big_jpeg(self):
+        # Test a big JPEG is decoded to fit the size, with the size of the full image
+        path = os.path.join(self.folder, "big.jpg")
+        save_image(path, 4000, 2500)
+
+        preview, size = decode_preview(path, QSize(800, 800))
+        self.assertEqual(size, QSize(4000, 2500))
+        self.assertEqual(preview.size(), QSize(800, 500))
+
+    def test_small_jpeg(self):
+        # Test images decoded fast enough at full resolution don't get a preview
+        path = os.path.join(self.folder, "small.jpg")
+        save_image(path, 1000, 800)
+
+        preview, size = decode_preview(path, QSize(400, 400))
+        self.assertTrue(preview.isNull())
+        self.assertEqual(size, QSize(1000, 800))
+
+    def test_png(self):
+        # Test formats not decoded faster at a reduced resolution don't get a preview
+        path = os.path.join(self.folder, "big.png")
+        save_image(path, 4000, 2500)
+
+        preview, size = decode_preview(path, QSize(800, 800))
+        self.assertTrue(preview.isNull())
+        self.assertEqual(size, QSize(4000, 2500))
+
+    def test_preview_pyramid(self):
+        # Test a preview pyramid has the size of the full image and a single level
+        pyramid = ImagePyramid(QImage(800, 500, QImage.Format_RGB32), QSize(4000, 2500))
+        self.assertTrue(pyramid.is_preview())
+        self.assertEqual(pyramid.size(), QSize(4000, 2500))
+        self.assertEqual(pyramid.level_count(), 1)
+        self.assertEqual(pyramid.level_index(0.1), 0)
+
+        self.assertFalse(ImagePyramid(QImage(800, 500, QImage.Format_RGB32)).is_preview())
+
+class TestImagePrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_decoded_bigger_than_budget(self):
+        # Test an image too big for the cache is still sent to the canvas once decoded
+        path = os.path.join(self.folder, "big.jpg")
+        save_image(path, 1000, 800)
+        prefetcher = ImagePrefetcher(budget_mb=1)
+        decoded = []
+        loop = QEventLoop()
+        prefetcher.OnDecoded.connect(lambda path, image: (decoded.append((path, image.size())), loop.quit()))
+        QTimer.singleShot(5000, loop.quit)
+
+        prefetcher.prefetch([path])
+        loop.exec()
+        self.assertEqual(decoded, [(path, QSize(1000, 800))])
+        self.assertIsNone(prefetcher.cached(path))
+        self.assertEqual((prefetcher.cache.hits, prefetcher.cache.misses), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
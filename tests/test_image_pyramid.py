@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+from PyQt5.QtCore import QSize, QThreadPool
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.canvas.ImagePyramid import ImagePyramid
+
+# Kept for the whole run, the global thread pool used by the other tests is destroyed with the application
+app = QApplication.instance() or QApplication([])
+
+class TestImagePyramid(unittest.TestCase):
+    def new_pyramid(self) -> ImagePyramid:
+        image = QImage(4096, 2048, QImage.Format_RGB32)
+        image.fill(0)
+        return ImagePyramid(image)
+
+    def test_levels(self):
+        # Test the levels go down to the minimum size, each one half the one before
+        pyramid = self.new_pyramid()
+        self.assertEqual(pyramid.level_count(), 5)
+        self.assertEqual(pyramid.level_index(2.0), 0)
+        self.assertEqual(pyramid.level_index(0.3), 1)
+        self.assertEqual(pyramid.level_index(0.01), 4)
+
+        pyramid.build()
+        QThreadPool.globalInstance().waitForDone()
+        self.assertEqual(pyramid.built_levels(), 5)
+        self.assertEqual(pyramid.level(4).size(), QSize(256, 128))
+
+    def test_lazy(self):
+        # Test only the levels up to the scale asked for are built
+        pyramid = self.new_pyramid()
+        self.assertEqual(pyramid.nearest_level(1.0), 0)
+        QThreadPool.globalInstance().waitForDone()
+        self.assertEqual(pyramid.built_levels(), 1)
+
+        # The finer level is drawn until the one asked for is built
+        self.assertEqual(pyramid.nearest_level(0.5), 0)
+        QThreadPool.globalInstance().waitForDone()
+        self.assertEqual(pyramid.built_levels(), 2)
+
+        self.assertEqual(pyramid.nearest_level(0.2), 1)
+        QThreadPool.globalInstance().waitForDone()
+        self.assertEqual(pyramid.built_levels(), 3)
+        self.assertEqual(pyramid.nearest_level(0.2), 2)
+        self.assertEqual(pyramid.level_for(0.2).size(), QSize(1024, 512))
+
+    def test_cancel(self):
+        # Test a cancelled pyramid stops building
+        pyramid = self.new_pyramid()
+        pyramid.cancel()
+        pyramid.build()
+        QThreadPool.globalInstance().waitForDone()
+        self.assertEqual(pyramid.built_levels(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
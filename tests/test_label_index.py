@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.LabelIndex import LabelIndex, ImageStatus
+from libs.standalones.pascal_voc_io import PascalVocWriter, xml_path_for
+
+class TestLabelIndex(unittest.TestCase):
+    def setUp(self):
+        # The cache is saved relative to the working directory, like the other settings
+        self.dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir.name)
+
+        self.images = [os.path.join(self.dir.name, f"img{i}.jpg") for i in range(6)]
+        for i, image in enumerate(self.images[:4]):
+            self.annotate(image, ["cat"] * i + ["dog"] * (i % 2))
+        self.index = LabelIndex()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def annotate(self, image: str, labels: list[str]) -> None:
+        writer = PascalVocWriter("imgs", os.path.basename(image), (100, 100, 3))
+        for label in labels:
+            writer.add_bnd_box(10, 10, 50, 50, label)
+        writer.save(xml_path_for(image))
+
+    def test_filter(self):
+        # Test filtering by label, 'any' and 'none'
+        self.index.build(self.dir.name, self.images)
+        self.index.wait()
+
+        self.assertEqual(self.index.filter(self.images, "cat"), self.images[1:4])
+        self.assertEqual(self.index.filter(self.images, "dog"), [self.images[1], self.images[3]])
+        self.assertEqual(self.index.filter(self.images, "any"), self.images[1:4])
+        self.assertEqual(self.index.filter(self.images, "none"), [self.images[0], *self.images[4:]])
+        self.assertEqual(self.index.labels(), {"cat": 6, "dog": 2})
+
+    def test_filter_not_indexed(self):
+        # Test the images not indexed yet aren't returned instead of waiting for the index
+        self.assertEqual(self.index.filter(self.images, "cat"), [])
+        self.assertEqual(self.index.filter(self.images, "none"), [])
+        self.assertEqual(self.index.labels(), {})
+
+        self.index.update(self.images[4], ["bird"])
+        self.assertEqual(self.index.filter(self.images, "any"), [self.images[4]])
+
+    def test_cache(self):
+        # Test only the changed annotations are read again
+        self.index.build(self.dir.name, self.images)
+        self.index.wait()
+        self.assertEqual((self.index.scanned, self.index.cached), (4, 0))
+
+        self.annotate(self.images[0], ["bird"])
+        self.index.build(self.dir.name, self.images)
+        self.index.wait()
+        self.assertEqual((self.index.scanned, self.index.cached), (1, 3))
+        self.assertEqual(self.index.filter(self.images, "bird"), [self.images[0]])
+
+    def test_parallel(self):
+        # Test the process pool returns the same counts
+        LabelIndex.PARALLEL_MIN_FILES, min_files = 1, LabelIndex.PARALLEL_MIN_FILES
+        try:
+            self.index.build(self.dir.name, self.images)
+            self.assertEqual(self.index.counts(self.images[3]), {"cat": 3, "dog": 1})
+        finally:
+            LabelIndex.PARALLEL_MIN_FILES = min_files
+
+    def test_status(self):
+        # Test annotations without boxes aren't mistaken for missing ones, and saved images are modified
+        self.assertEqual(self.index.status(self.images[0])[0], ImageStatus.unknown)
+        self.index.build(self.dir.name, self.images)
+        self.index.wait()
+
+        self.assertEqual(self.index.status(self.images[0]), (ImageStatus.empty, 0, False))
+        self.assertEqual(self.index.status(self.images[3]), (ImageStatus.labelled, 4, False))
+        self.assertEqual(self.index.status(self.images[5]), (ImageStatus.not_annotated, 0, False))
+
+        self.index.update(self.images[5], ["cat", "cat"])
+        self.assertEqual(self.index.status(self.images[5]), (ImageStatus.labelled, 2, True))
+        self.assertEqual(self.index.modified_count(self.dir.name), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones.pascal_voc_io import PascalVocWriter, PascalVocReader, iter_boxes
+from benchmark_pascal_voc import legacy_xml, new_writer, new_xml
+
+class TestPascalVocWriter(unittest.TestCase):
+    def test_same_output(self):
+        # Test the single pass serializer writes the same bytes as the old one
+        for objects in (0, 1, 100):
+            writer = new_writer(objects)
+            self.assertEqual(new_xml(writer), legacy_xml(writer))
+
+    def test_escaped_and_empty(self):
+        # Test escaped characters and empty texts
+        writer = PascalVocWriter("", "a&b <c>.jpg", (10, 10), local_img_path=None)
+        writer.add_bnd_box(1, 2, 3, 4, "café & \"bar\"")
+        self.assertEqual(new_xml(writer), legacy_xml(writer))
+
+class TestPascalVocReader(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.dir.name, "img.xml")
+        new_writer(3).save(self.xml_path)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_boxes(self):
+        # Test the boxes are read back as tuples and shapes are built from them
+        boxes = [("label0", 0, 0, 20, 80), ("label1", 1, 1, 21, 81), ("label2", 2, 2, 22, 82)]
+        self.assertEqual(list(iter_boxes(self.xml_path)), boxes)
+
+        shapes = PascalVocReader(self.xml_path).get_shapes()
+        self.assertEqual([(shape.name, shape.top_left().x, shape.bot_right().y) for shape in shapes],
+                         [(label, x_min, y_max) for label, x_min, _, _, y_max in boxes])
+
+    def test_find_label(self):
+        # Test label queries
+        reader = PascalVocReader(self.xml_path)
+        self.assertTrue(reader.find_label("label1"))
+        self.assertTrue(reader.find_label("any"))
+        self.assertFalse(reader.find_label("label5"))
+
+    def test_missing_file(self):
+        # Test a missing annotation has no boxes nor labels
+        reader = PascalVocReader(os.path.join(self.dir.name, "missing.jpg"))
+        self.assertEqual(reader.get_shapes(), [])
+        self.assertFalse(reader.find_label("any"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.canvas.Shape import Shape
+from libs.standalones.Vector import Vector2Int
+from tests.shape_helpers import new_shape
+
+# Painting text and patterns needs a GUI application
+app = QApplication.instance() or QApplication([])
+
+def paint(image: QImage, shapes: list[Shape], scale: float, damaged: QRect = None) -> None:
+    # Like CanvasWin.paintEvent, a partial repaint only draws the shapes intersecting the damaged area
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    if damaged is not None:
+        painter.setClipRect(damaged)
+        painter.fillRect(damaged, Qt.white)
+    for shape in shapes:
+        if damaged is None or shape.paint_rect(scale).intersects(damaged):
+            shape.paint(painter, scale)
+    painter.end()
+
+class TestShapeDamage(unittest.TestCase):
+    SIZE = 400
+
+    def new_image(self) -> QImage:
+        image = QImage(TestShapeDamage.SIZE, TestShapeDamage.SIZE, QImage.Format_RGB32)
+        image.fill(Qt.white)
+        return image
+
+    def test_paint_rect(self):
+        # Test nothing is painted outside the paint rect, in any state and at any scale
+        for scale in (0.5, 1.0, 3.0):
+            for state in ("normal", "selected", "fill", "vertex"):
+                shape = new_shape(20, 30, 90, 80)
+                if state == "vertex":
+                    shape.highlighted_vertex = 2
+                elif state != "normal":
+                    setattr(shape, state, True)
+                image = self.new_image()
+                paint(image, [shape], scale)
+
+                rect = shape.paint_rect(scale)
+                for y in range(image.height()):
+                    for x in range(0, image.width(), 2):
+                        if image.pixel(x, y) != 0xffffffff and not rect.contains(x, y):
+                            self.fail(f"{state} shape at scale {scale} painted ({x}, {y}) outside {rect}")
+
+    def test_damaged_repaint(self):
+        # Test repainting the old and new rects of the shapes that changed gives the same image as a full repaint
+        scale = 1.5
+        shapes = [new_shape(10, 10, 80, 60, "a"), new_shape(50, 40, 150, 120, "b"), new_shape(160, 20, 230, 90, "c")]
+        # The shape each change is made to, and the change
+        changes = [
+            (1, lambda: setattr(shapes[1], 'selected', True)),
+            (0, lambda: setattr(shapes[0], 'fill', True)),
+            (2, lambda: setattr(shapes[2], 'highlighted_vertex', 1)),
+            (1, lambda: shapes[1].move(Vector2Int(120, 100), Vector2Int(260, 260))),
+            (2, lambda: shapes[2].move_vertex(Vector2Int(250, 150), 2)),
+            (1, lambda: setattr(shapes[1], 'selected', False)),
+            (0, lambda: setattr(shapes[0], 'fill', False)),
+        ]
+        image = self.new_image()
+        paint(image, shapes, scale)
+        for i, (changed, change) in enumerate(changes):
+            before = shapes[changed].paint_rect(scale)
+            change()
+            paint(image, shapes, scale, before.united(shapes[changed].paint_rect(scale)))
+
+            full = self.new_image()
+            paint(full, shapes, scale)
+            self.assertEqual(image, full, f"change {i}")
+
+class TestShapeRenderCache(unittest.TestCase):
+    def test_reused(self):
+        # Test painting again at the same scale reuses the pens, brushes and rects
+        shape = new_shape(10, 10, 100, 50)
+        render = shape.render_cache(2.0)
+        image = QImage(300, 200, QImage.Format_RGB32)
+        painter = QPainter(image)
+        shape.paint(painter, 2.0)
+        shape.paint(painter, 2.0)
+        painter.end()
+
+        self.assertIs(shape.render_cache(2.0), render)
+        self.assertEqual(render.rect, QRect(20, 20, 181, 81))
+        self.assertTrue(shape.paint_rect(2.0).contains(render.rect))
+
+    def test_invalidated(self):
+        # Test the cache is rebuilt when anything it's made of changes, and only then
+        shape = new_shape(10, 10, 100, 50)
+        changes = [
+            lambda: shape.render_cache(3.0),
+            lambda: shape.move(Vector2Int(20, 20), Vector2Int(500, 500)),
+            lambda: shape.move_vertex(Vector2Int(150, 90), 2),
+            lambda: shape.set_name("renamed"),
+            lambda: setattr(shape, 'selected', True),
+            lambda: setattr(shape, 'fill', True),
+            lambda: setattr(shape, 'highlighted_vertex', 0),
+        ]
+        for i, change in enumerate(changes):
+            render = shape.render_cache(1.0)
+            change()
+            self.assertIsNot(shape.render_cache(1.0), render, f"change {i}")
+
+        render = shape.render_cache(1.0)
+        shape.selected = True
+        shape.highlighted_vertex = 0
+        self.assertIs(shape.render_cache(1.0), render)
+
+    def test_state(self):
+        # Test the cached objects follow the state of the shape
+        shape = new_shape(10, 10, 100, 50)
+        self.assertIsNone(shape.render_cache(1.0).fill_color)
+        self.assertEqual(shape.render_cache(1.0).line_pen.color(), shape.lines_color)
+
+        shape.highlighted_vertex = 1
+        render = shape.render_cache(1.0)
+        self.assertEqual(render.line_pen.color(), shape.highlighted_color)
+        self.assertGreater(render.vertex_rects[1].width(), render.vertex_rects[0].width())
+
+        shape.selected = True
+        self.assertEqual(shape.render_cache(1.0).fill_color, shape.selected_color)
+
+        old_color = shape.lines_color
+        shape.highlighted_vertex = -1
+        shape.set_name("renamed")
+        self.assertNotEqual(shape.render_cache(1.0).line_pen.color(), old_color)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+
+from PyQt5.QtCore import QRect, QSize
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtWidgets import QApplication
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.canvas.ShapeOverlay import ShapeOverlay
+from libs.canvas.ShapeRenderer import ShapeRenderer
+from libs.standalones.Vector import Vector2Int
+from tests.shape_helpers import new_shape
+
+# The layer is a QPixmap, which needs a GUI application
+app = QApplication.instance() or QApplication([])
+
+def painted(overlay: ShapeOverlay, visible: QRect) -> QImage:
+    # The layer drawn in an image of the visible area
+    image = QImage(visible.size(), QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    painter.translate(-visible.topLeft())
+    overlay.paint(painter, visible)
+    painter.end()
+    return image
+
+class TestShapeOverlay(unittest.TestCase):
+    BIG_IMAGE = QSize(6000, 4000)
+
+    def test_big_image(self):
+        # Test the layer of a big image covers the visible area and its margin, not the whole image
+        overlay = ShapeOverlay()
+        visible = QRect(2000, 1000, 800, 600)
+        self.assertTrue(overlay.build([new_shape(2100, 1100, 2200, 1200)], TestShapeOverlay.BIG_IMAGE, 1.0, visible))
+        self.assertTrue(overlay.is_valid(1.0, visible))
+
+        # Panning inside the margin keeps the layer, further away it's rebuilt
+        self.assertTrue(overlay.is_valid(1.0, visible.translated(300, 200)))
+        self.assertFalse(overlay.is_valid(1.0, visible.translated(1000, 0)))
+        self.assertFalse(overlay.is_valid(2.0, visible))
+
+    def test_changes(self):
+        # Test any change to a shape makes the layer stale
+        overlay = ShapeOverlay()
+        shape = new_shape(10, 10, 100, 100)
+        visible = QRect(0, 0, 400, 300)
+        overlay.build([shape], QSize(400, 300), 1.0, visible)
+        self.assertTrue(overlay.is_valid(1.0, visible))
+
+        shape.move_by(Vector2Int(5, 5), Vector2Int(400, 300))
+        self.assertFalse(overlay.is_valid(1.0, visible))
+        overlay.build([shape], QSize(400, 300), 1.0, visible)
+        shape.set_name("renamed")
+        self.assertFalse(overlay.is_valid(1.0, visible))
+
+        overlay.build([shape], QSize(400, 300), 1.0, visible)
+        overlay.invalidate()
+        self.assertFalse(overlay.is_valid(1.0, visible))
+
+    def test_interactive(self):
+        # Test the selected shapes aren't in the layer, they are painted live
+        overlay = ShapeOverlay()
+        shape = new_shape(10, 10, 100, 100)
+        visible = QRect(0, 0, 200, 200)
+        overlay.build([shape], QSize(200, 200), 1.0, visible)
+        self.assertGreater(QColor.fromRgba(painted(overlay, visible).pixel(50, 10)).alpha(), 0)
+
+        shape.selected = True
+        self.assertFalse(overlay.is_valid(1.0, visible))
+        overlay.build([shape], QSize(200, 200), 1.0, visible)
+        self.assertEqual(QColor.fromRgba(painted(overlay, visible).pixel(50, 10)).alpha(), 0)
+
+    def test_same_as_live(self):
+        # Test the layer drawn over a panned area looks like the shapes painted live
+        shapes = [new_shape(100 * i, 70 * i, 100 * i + 150, 70 * i + 120) for i in range(12)]
+        visible = QRect(300, 200, 400, 300)
+        overlay = ShapeOverlay()
+        self.assertTrue(overlay.build(shapes, QSize(1500, 1000), 1.0, visible.translated(-50, -40)))
+        self.assertTrue(overlay.is_valid(1.0, visible))
+
+        live = QImage(visible.size(), QImage.Format_ARGB32)
+        live.fill(0)
+        painter = QPainter(live)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-visible.topLeft())
+        ShapeRenderer.paint(painter, shapes, 1.0)
+        painter.end()
+        self.assertEqual(painted(overlay, visible), live)
+
+if __name__ == '__main__':
+    unittest.main()
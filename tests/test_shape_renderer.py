@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.canvas.Shape import Shape
+from libs.canvas.ShapeRenderer import ShapeRenderer
+from libs.standalones.MyException import InvalidInstantiation
+from tests.shape_helpers import new_shape
+
+# Painting patterns needs a GUI application
+app = QApplication.instance() or QApplication([])
+
+class CountingPainter(QPainter):
+    # Counts the state changes and draw calls made by the renderer
+    def __init__(self, image: QImage):
+        super().__init__(image)
+        self.pens = 0
+        self.draw_rects = 0
+
+    def setPen(self, *args):
+        self.pens += 1
+        super().setPen(*args)
+
+    def drawRects(self, *args):
+        self.draw_rects += 1
+        super().drawRects(*args)
+
+class TestShapeRenderer(unittest.TestCase):
+    def new_image(self) -> QImage:
+        image = QImage(500, 400, QImage.Format_RGB32)
+        image.fill(Qt.white)
+        return image
+
+    def paint_each(self, shapes: list[Shape], scale: float) -> QImage:
+        image = self.new_image()
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        for shape in shapes:
+            shape.paint(painter, scale)
+        painter.end()
+        return image
+
+    def paint_batched(self, shapes: list[Shape], scale: float) -> QImage:
+        image = self.new_image()
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        ShapeRenderer.paint(painter, shapes, scale)
+        painter.end()
+        return image
+
+    def test_same_image(self):
+        # Test shapes that don't overlap look the same batched as painted one by one
+        shapes = [new_shape(10 + 45 * i, 10 + 30 * (i % 3), 40 + 45 * i, 30 + 30 * (i % 3), f"label{i % 3}") for i in range(10)]
+        shapes[4].selected = True
+        shapes[7].highlighted_vertex = 2
+        for scale in (0.5, 1.0):
+            self.assertEqual(self.paint_batched(shapes, scale), self.paint_each(shapes, scale))
+
+    def test_interactive_on_top(self):
+        # Test the selected shapes are painted over the shapes in the normal state
+        selected = new_shape(50, 50, 150, 150, "a")
+        selected.selected = True
+        normal = new_shape(100, 100, 200, 200, "b")
+        batched = self.paint_batched([selected, normal], 1.0)
+        self.assertEqual(batched, self.paint_each([normal, selected], 1.0))
+
+    def test_batches(self):
+        # Test the shapes of each color are drawn with a single pen change and drawRects
+        shapes = [new_shape(5 * i, 5 * i, 5 * i + 40, 5 * i + 40, f"label{i % 3}") for i in range(30)]
+        image = self.new_image()
+        painter = CountingPainter(image)
+        ShapeRenderer.paint(painter, shapes, 1.0)
+        painter.end()
+        self.assertEqual((painter.pens, painter.draw_rects), (6, 3))
+
+    def test_instantiation(self):
+        with self.assertRaises(InvalidInstantiation):
+            ShapeRenderer()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import random
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.canvas.Shape import Shape
+from libs.canvas.SpatialIndex import SpatialIndex
+from libs.canvas.CanvasHelper import CanvasHelper
+from libs.standalones.Vector import Vector2Int
+from tests.shape_helpers import new_shape
+
+class TestSpatialIndex(unittest.TestCase):
+    def test_shapes_at(self):
+        # Test point in box queries keep the insertion order
+        index = SpatialIndex(cell_size=32)
+        a = new_shape(0, 0, 100, 100)
+        b = new_shape(50, 50, 150, 150)
+        c = new_shape(500, 500, 600, 600)
+        index.rebuild([a, b, c])
+
+        self.assertEqual(index.shapes_at(Vector2Int(75, 75)), [a, b])
+        self.assertEqual(index.shapes_at(Vector2Int(25, 25)), [a])
+        self.assertEqual(index.shapes_at(Vector2Int(300, 300)), [])
+
+    def test_shapes_near(self):
+        # Test vertex within radius queries
+        index = SpatialIndex(cell_size=32)
+        a = new_shape(0, 0, 100, 100)
+        b = new_shape(200, 200, 300, 300)
+        index.rebuild([a, b])
+
+        self.assertEqual(index.shapes_near(Vector2Int(103, 98), 9), [a])
+        self.assertEqual(index.shapes_near(Vector2Int(150, 150), 9), [])
+
+    def test_move(self):
+        # Test the index follows Shape.move and Shape.move_vertex
+        index = SpatialIndex(cell_size=32)
+        a = new_shape(0, 0, 100, 100)
+        index.insert(a)
+
+        a.move(Vector2Int(400, 400), Vector2Int(1000, 1000))
+        self.assertEqual(index.shapes_at(Vector2Int(50, 50)), [])
+        self.assertEqual(index.shapes_at(Vector2Int(450, 450)), [a])
+
+        a.move_vertex(Vector2Int(800, 800), 2)
+        self.assertEqual(index.shapes_at(Vector2Int(700, 700)), [a])
+
+    def test_remove(self):
+        # Test removed shapes are not returned nor followed anymore
+        index = SpatialIndex(cell_size=32)
+        a = new_shape(0, 0, 100, 100)
+        index.insert(a)
+        index.remove(a)
+
+        a.move(Vector2Int(10, 10), Vector2Int(1000, 1000))
+        self.assertEqual(index.shapes_at(Vector2Int(50, 50)), [])
+        self.assertEqual(len(index), 0)
+
+    def test_canvas_hit_tests(self):
+        # Test the hit-tests of the canvas find the same shape and vertex through the index as through every shape
+        rng = random.Random(5)
+        shapes = []
+        for _ in range(200):
+            x, y = rng.randrange(0, 900), rng.randrange(0, 900)
+            shapes.append(new_shape(x, y, x + rng.randrange(2, 100), y + rng.randrange(2, 100)))
+        for shape in shapes[::7]:
+            shape.selected = True
+        index = SpatialIndex(cell_size=32)
+        index.rebuild(shapes)
+
+        radius = CanvasHelper.MIN_DIST_HIGHLIGHT + 1
+        for _ in range(300):
+            pos = Vector2Int(rng.randrange(-20, 1020), rng.randrange(-20, 1020))
+            self.assertEqual(CanvasHelper.get_within(pos, index.query(pos, radius)), CanvasHelper.get_within(pos, shapes))
+            self.assertIs(CanvasHelper.get_shape_within(pos, index.shapes_at(pos)), CanvasHelper.get_shape_within(pos, shapes))
+            self.assertEqual(CanvasHelper.get_closest_shape_vertex(pos, index.shapes_near(pos, radius)),
+                             CanvasHelper.get_closest_shape_vertex(pos, shapes))
+
+if __name__ == '__main__':
+    unittest.main()
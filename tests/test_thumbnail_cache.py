@@ -0,0 +1,158 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+from PyQt5.QtCore import Qt, QCoreApplication, QEventLoop, QTimer
+from PyQt5.QtGui import QImage, QColor
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.standalones import ThumbnailCache as thumbnail_module
+from libs.standalones.ThumbnailCache import ThumbnailCache, THUMBNAIL_SIZE, thumbnail_key, thumbnail_path, make_thumbnail
+
+# Kept for the whole run, the global thread pool used by the other tests is destroyed with the application
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestThumbnailCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        # The thumbnails are saved in ./Settings
+        os.chdir(self.dir.name)
+        self.caches: list[ThumbnailCache] = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.shutdown()
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def save_image(self, name: str, width: int, height: int, image_format=QImage.Format_RGB32) -> str:
+        path = os.path.join(self.dir.name, name)
+        image = QImage(width, height, image_format)
+        image.fill(QColor(200, 100, 50) if image_format == QImage.Format_RGB32 else Qt.transparent)
+        image.save(path)
+        return path
+
+    def new_cache(self) -> ThumbnailCache:
+        cache = ThumbnailCache()
+        self.caches.append(cache)
+        return cache
+
+    def wait(self, cache: ThumbnailCache, timeout_ms: int = 20000) -> None:
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.timeout.connect(lambda: cache.pending() == 0 and loop.quit())
+        timer.start(20)
+        QTimer.singleShot(timeout_ms, loop.quit)
+        loop.exec()
+
+    def test_key(self):
+        # Test an edited image gets a new thumbnail
+        path = self.save_image("a.jpg", 40, 30)
+        key = thumbnail_key(path)
+        self.assertEqual(key, thumbnail_key(path))
+
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        self.assertNotEqual(key, thumbnail_key(path))
+        self.assertIsNone(thumbnail_key(os.path.join(self.dir.name, "missing.jpg")))
+
+    def test_make_thumbnail(self):
+        # Test the thumbnails fit in the size and transparent images are drawn over white
+        thumb_path = os.path.join(self.dir.name, "thumbs", "a.jpg")
+        self.assertTrue(make_thumbnail(self.save_image("a.jpg", 400, 300), thumb_path, THUMBNAIL_SIZE))
+        self.assertEqual(QImage(thumb_path).size().width(), THUMBNAIL_SIZE)
+        self.assertEqual(QImage(thumb_path).size().height(), THUMBNAIL_SIZE * 3 // 4)
+
+        self.assertTrue(make_thumbnail(self.save_image("b.png", 100, 200, QImage.Format_ARGB32), thumb_path, THUMBNAIL_SIZE))
+        thumbnail = QImage(thumb_path)
+        self.assertEqual(thumbnail.height(), THUMBNAIL_SIZE)
+        self.assertGreater(QColor(thumbnail.pixel(10, 10)).lightness(), 240)
+
+        self.assertFalse(make_thumbnail(os.path.join(self.dir.name, "missing.jpg"), thumb_path, THUMBNAIL_SIZE))
+
+    def test_generate_and_reuse(self):
+        # Test the thumbnails are generated once, then read from the disk
+        paths = [self.save_image(f"img{i}.jpg", 400, 300) for i in range(3)]
+        cache = self.new_cache()
+        ready = []
+        cache.OnThumbnail.connect(ready.append)
+
+        self.assertEqual([cache.get(path) for path in paths], [None] * 3)
+        self.wait(cache)
+        self.assertEqual(sorted(ready), paths)
+        self.assertEqual(cache.generated, 3)
+        self.assertEqual(cache.get(paths[0]).width(), THUMBNAIL_SIZE)
+
+        # Read in the background, like the generated ones
+        cache = self.new_cache()
+        self.assertIsNone(cache.get(paths[1]))
+        self.wait(cache)
+        self.assertIsNotNone(cache.get(paths[1]))
+        self.assertEqual((cache.generated, cache.loaded, cache.pending()), (0, 1, 0))
+
+    def test_key_memoized(self):
+        # Test the image is only stat'ed again once the folder watcher reports it
+        path = self.save_image("a.jpg", 400, 300)
+        cache = self.new_cache()
+        cache.get(path)
+        self.wait(cache)
+
+        with mock.patch.object(thumbnail_module, 'thumbnail_key', side_effect=thumbnail_key) as key:
+            for _ in range(10):
+                self.assertIsNotNone(cache.get(path))
+            self.assertEqual(key.call_count, 0)
+
+            cache.forget([path])
+            self.assertIsNone(cache.get(path))
+            self.wait(cache)
+            self.assertEqual(key.call_count, 1)
+        self.assertIsNotNone(cache.get(path))
+
+    def test_failures(self):
+        # Test only unreadable images aren't tried again, a thumbnail that couldn't be saved is
+        unreadable = os.path.join(self.dir.name, "broken.jpg")
+        with open(unreadable, 'w') as f:
+            f.write("not an image")
+        path = self.save_image("a.jpg", 400, 300)
+        # A file where the folder of the thumbnail goes, like a full disk it can't be saved
+        blocker = os.path.dirname(thumbnail_path(thumbnail_key(path)))
+        os.makedirs(os.path.dirname(blocker), exist_ok=True)
+        open(blocker, 'w').close()
+
+        cache = self.new_cache()
+        cache.get(unreadable)
+        cache.get(path)
+        self.wait(cache)
+        self.assertEqual(cache.generated, 0)
+
+        os.remove(blocker)
+        cache.get(unreadable)
+        cache.get(path)
+        self.wait(cache)
+        self.assertEqual(cache.pending(), 0)
+        self.assertIsNone(cache.get(unreadable))
+        self.assertIsNotNone(cache.get(path))
+        self.assertEqual(cache.generated, 1)
+
+    def test_keep(self):
+        # Test the thumbnails no longer needed aren't generated
+        paths = [self.save_image(f"img{i}.jpg", 400, 300) for i in range(20)]
+        cache = self.new_cache()
+        for path in paths:
+            cache.get(path)
+        cache.keep(paths[:1])
+        self.wait(cache)
+
+        self.assertIsNotNone(cache.get(paths[0]))
+        # The ones already started by a process are finished
+        self.assertLess(cache.generated, len(paths))
+
+if __name__ == '__main__':
+    unittest.main()
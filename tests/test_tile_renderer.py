@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtWidgets import QApplication
+
+# Get the absolute path of the parent directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the parent directory to the system path
+sys.path.append(parent_dir)
+
+from libs.canvas.ImagePyramid import ImagePyramid
+from libs.canvas.TileRenderer import TileRenderer
+
+# Kept for the whole run, the global thread pool used by the other tests is destroyed with the application
+app = QApplication.instance() or QApplication([])
+
+class TestTileRenderer(unittest.TestCase):
+    def paint(self, renderer: TileRenderer) -> QImage:
+        # Draws a red 2048x1024 image at scale 1, 8 full tiles
+        image = QImage(2048, 1024, QImage.Format_RGB32)
+        image.fill(QColor(255, 0, 0))
+        renderer.set_pyramid(ImagePyramid(image))
+
+        target = QImage(image.size(), QImage.Format_RGB32)
+        target.fill(0)
+        painter = QPainter(target)
+        renderer.paint(painter, target.rect(), target.rect(), 1.0)
+        painter.end()
+        QThreadPool.globalInstance().waitForDone()
+        return target
+
+    def test_budget(self):
+        # Each full tile uses 1MB, only the 2 last drawn ones are kept
+        renderer = TileRenderer(2)
+        painted = self.paint(renderer)
+        self.assertEqual(painted.pixelColor(2047, 1023), QColor(255, 0, 0))
+        self.assertEqual(renderer.used_bytes(), 2 * 1024 * 1024)
+
+        renderer.clear()
+        self.assertEqual(renderer.used_bytes(), 0)
+
+    def test_over_budget(self):
+        # Tiles bigger than the whole budget are still drawn, without being kept
+        renderer = TileRenderer(0.5)
+        painted = self.paint(renderer)
+        self.assertEqual(painted.pixelColor(2047, 1023), QColor(255, 0, 0))
+        self.assertEqual(renderer.used_bytes(), 0)
+
+if __name__ == '__main__':
+    unittest.main()